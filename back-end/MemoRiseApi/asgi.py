@@ -3,6 +3,10 @@ ASGI config for MemoRiseApi project.
 
 It exposes the ASGI callable as a module-level variable named ``application``.
 
+Served by the "asgi" process in the procfile (gunicorn + uvicorn workers)
+with ASYNC_VIEWS=True, so study, review and the AI endpoints run as async
+views and one worker can hold many slow LLM calls open at once.
+
 For more information on this file, see
 https://docs.djangoproject.com/en/5.2/howto/deployment/asgi/
 """
@@ -14,16 +14,64 @@ from pathlib import Path
 from datetime import timedelta
 from decouple import config
 
+from .database import database_config
+
 
 # Build paths inside the project like this: BASE_DIR / 'subdir'.
 BASE_DIR = Path(__file__).resolve().parent.parent
 
 OPENAI_API_KEY = OPENAI_API_KEY = config("OPENAI_API_KEY", default="")
 
+# 🤖 AI generation: pluggable LLM client and background job workers
+AI_LLM_CLIENT = config("AI_LLM_CLIENT", default="core.services.ai_service.OpenAIChatClient")
+AI_JOB_WORKERS = config("AI_JOB_WORKERS", default=4, cast=int)   # threads per process
+AI_JOBS_EAGER = config("AI_JOBS_EAGER", default=False, cast=bool)  # run jobs inline (tests/dev)
+AI_CHUNK_MAX_TOKENS = config("AI_CHUNK_MAX_TOKENS", default=1500, cast=int)  # long texts are split
+AI_MAX_CHUNKS = config("AI_MAX_CHUNKS", default=40, cast=int)                # LLM calls per text, at most
+AI_MAX_CONCURRENCY = config("AI_MAX_CONCURRENCY", default=4, cast=int)       # in-flight LLM calls per process
+
+# 🌐 OpenAI HTTP client (core/services/ai_http.py): one pooled connection
+# pool per process, timeouts per attempt (seconds), retries with exponential
+# backoff on 429/5xx/network errors, and a circuit breaker that fails fast
+# once AI_BREAKER_FAILURE_RATE of the attempts in the window failed.
+OPENAI_BASE_URL = config("OPENAI_BASE_URL", default="") or None  # None: the SDK's default
+AI_HTTP_CONNECT_TIMEOUT = config("AI_HTTP_CONNECT_TIMEOUT", default=5, cast=float)
+AI_HTTP_READ_TIMEOUT = config("AI_HTTP_READ_TIMEOUT", default=60, cast=float)
+AI_HTTP_WRITE_TIMEOUT = config("AI_HTTP_WRITE_TIMEOUT", default=10, cast=float)
+AI_HTTP_POOL_TIMEOUT = config("AI_HTTP_POOL_TIMEOUT", default=5, cast=float)    # wait for a free connection
+AI_HTTP_MAX_CONNECTIONS = config("AI_HTTP_MAX_CONNECTIONS", default=20, cast=int)
+AI_HTTP_MAX_KEEPALIVE = config("AI_HTTP_MAX_KEEPALIVE", default=10, cast=int)
+AI_HTTP_MAX_RETRIES = config("AI_HTTP_MAX_RETRIES", default=2, cast=int)
+AI_HTTP_BACKOFF_BASE = config("AI_HTTP_BACKOFF_BASE", default=0.5, cast=float)  # 0.5 s, 1 s, 2 s... plus jitter
+AI_HTTP_BACKOFF_MAX = config("AI_HTTP_BACKOFF_MAX", default=8, cast=float)
+AI_BREAKER_WINDOW_SECONDS = config("AI_BREAKER_WINDOW_SECONDS", default=30, cast=float)
+AI_BREAKER_MIN_REQUESTS = config("AI_BREAKER_MIN_REQUESTS", default=10, cast=int)
+AI_BREAKER_FAILURE_RATE = config("AI_BREAKER_FAILURE_RATE", default=0.5, cast=float)
+AI_BREAKER_COOLDOWN_SECONDS = config("AI_BREAKER_COOLDOWN_SECONDS", default=30, cast=float)
+
+# ⚡ ASGI profile (procfile "asgi"): serve study, review and the AI stream
+# with the async views in core/async_views.py
+ASYNC_VIEWS = config("ASYNC_VIEWS", default=False, cast=bool)
+
+# 🗃️ AI response cache (in-process LRU + database tier)
+AI_CACHE_ENABLED = config("AI_CACHE_ENABLED", default=True, cast=bool)
+AI_CACHE_TTL = config("AI_CACHE_TTL", default=7 * 24 * 3600, cast=int)            # seconds
+AI_CACHE_MEMORY_SIZE = config("AI_CACHE_MEMORY_SIZE", default=256, cast=int)      # entries per process
+AI_CACHE_DB_MAX_ENTRIES = config("AI_CACHE_DB_MAX_ENTRIES", default=10000, cast=int)
+
 #Configuring Media urls to store media files
 MEDIA_URL = "/media/"
 MEDIA_ROOT = BASE_DIR / "media"
 
+# 🖼️ Profile pictures: upload limits and WebP thumbnails rendered in a thread pool
+PROFILE_PICTURE_MAX_BYTES = config("PROFILE_PICTURE_MAX_BYTES", default=10 * 1024 * 1024, cast=int)
+PROFILE_PICTURE_MIN_DIMENSION = config("PROFILE_PICTURE_MIN_DIMENSION", default=32, cast=int)      # px
+PROFILE_PICTURE_MAX_DIMENSION = config("PROFILE_PICTURE_MAX_DIMENSION", default=8000, cast=int)    # px
+PROFILE_THUMBNAIL_SIZES = (64, 256)                                                                # square, px
+PROFILE_THUMBNAIL_QUALITY = config("PROFILE_THUMBNAIL_QUALITY", default=80, cast=int)
+PROFILE_THUMBNAIL_WORKERS = config("PROFILE_THUMBNAIL_WORKERS", default=2, cast=int)               # threads per process
+PROFILE_THUMBNAILS_EAGER = config("PROFILE_THUMBNAILS_EAGER", default=False, cast=bool)            # inline (tests/dev)
+
 # Quick-start development settings - unsuitable for production
 # See https://docs.djangoproject.com/en/5.2/howto/deployment/checklist/
 
@@ -48,12 +96,15 @@ INSTALLED_APPS = [
     'django.contrib.messages',
     'django.contrib.staticfiles',
     'rest_framework',
+    'rest_framework_simplejwt.token_blacklist',
     'drf_spectacular',
     'corsheaders',
     'core'
 ]
 
 MIDDLEWARE = [
+    'core.middleware.RequestMetricsMiddleware',  # 📈 first, so it times everything below
+    'core.middleware.StaticFilesMiddleware',     # 📦 /static/ and /media/ without the rest of the stack
     'corsheaders.middleware.CorsMiddleware',
     'django.middleware.security.SecurityMiddleware',
     'django.contrib.sessions.middleware.SessionMiddleware',
@@ -81,7 +132,8 @@ REST_FRAMEWORK = {
     'DEFAULT_SCHEMA_CLASS': 'drf_spectacular.openapi.AutoSchema',
     
      "DEFAULT_AUTHENTICATION_CLASSES": (
-        "rest_framework_simplejwt.authentication.JWTAuthentication",
+        # 🔑 request.user built from the token claims (no user query per request)
+        "core.authentication.ClaimsJWTAuthentication",
     ),
      "DEFAULT_PERMISSION_CLASSES": (
         "rest_framework.permissions.IsAuthenticated",
@@ -94,8 +146,22 @@ SIMPLE_JWT = {
     "ROTATE_REFRESH_TOKENS": True,                   # genera un nuevo refresh al refrescar
     "BLACKLIST_AFTER_ROTATION": True,                 # invalida el viejo refresh si se rota
     "AUTH_HEADER_TYPES": ("Bearer",),                 # autorización con "Bearer <token>"
+    "TOKEN_REFRESH_SERIALIZER": "core.serializer.CustomTokenRefreshSerializer",  # 🚫 blacklist con caché en memoria
 }
 
+# 👤 Tokens without user claims (issued before they existed) look the user up
+# through a per-process cache kept this many seconds. 0 disables the cache.
+JWT_USER_CACHE_TTL = config("JWT_USER_CACHE_TTL", default=60, cast=int)
+
+# 🚫 Refresh token blacklist front (core/services/token_blacklist.py): a
+# per-process Bloom filter of blacklisted JTIs, synced with the table at most
+# every TOKEN_BLACKLIST_SYNC_SECONDS (0 = on every refresh), and an LRU of the
+# outstanding token ids this process issued. Prune with `manage.py prune_tokens`.
+TOKEN_BLACKLIST_SYNC_SECONDS = config("TOKEN_BLACKLIST_SYNC_SECONDS", default=5, cast=float)
+TOKEN_BLACKLIST_BLOOM_CAPACITY = config("TOKEN_BLACKLIST_BLOOM_CAPACITY", default=100_000, cast=int)
+TOKEN_BLACKLIST_BLOOM_ERROR_RATE = config("TOKEN_BLACKLIST_BLOOM_ERROR_RATE", default=0.001, cast=float)
+TOKEN_BLACKLIST_LRU_SIZE = config("TOKEN_BLACKLIST_LRU_SIZE", default=10_000, cast=int)
+
 SPECTACULAR_SETTINGS = {
     'TITLE': 'MemoRise API',
     'DESCRIPTION': 'API for MemoRise project',
@@ -103,6 +169,35 @@ SPECTACULAR_SETTINGS = {
     'SERVE_INCLUDE_SCHEMA': False,
 }
 
+# 📘 /api/schema/ is generated once per code version (core/schema.py) and kept
+# in memory and in OPENAPI_SCHEMA_DIR; `manage.py build_schema` prebuilds it.
+# CODE_VERSION (e.g. the git commit) names the version; without it the
+# project sources are hashed.
+CODE_VERSION = config("CODE_VERSION", default=config("RAILWAY_GIT_COMMIT_SHA", default=""))
+OPENAPI_SCHEMA_DIR = config("OPENAPI_SCHEMA_DIR", default=str(BASE_DIR / "openapi"))
+
+# 🚀 Start-up budget: p95 of a fresh process from spawn to its first response,
+# checked by `manage.py benchmark` (core/boot.py). `manage.py importtime`
+# shows where the import time goes.
+BOOT_BUDGET_MS = config("BOOT_BUDGET_MS", default=1500, cast=float)
+
+# 📊 Read deck list counters from the materialized DeckCounter table
+# instead of counting flashcards on every request
+DECK_COUNTERS_MATERIALIZED = config("DECK_COUNTERS_MATERIALIZED", default=False, cast=bool)
+
+# 🔄 Delta sync: how long deletions are remembered. Clients that have not
+# synced for longer get a full snapshot instead of a delta.
+SYNC_TOMBSTONE_RETENTION_DAYS = config("SYNC_TOMBSTONE_RETENTION_DAYS", default=30, cast=int)
+# Full snapshots are sent in pages of this many flashcards
+SYNC_SNAPSHOT_PAGE_SIZE = config("SYNC_SNAPSHOT_PAGE_SIZE", default=1000, cast=int)
+
+# 📈 Request metrics: Prometheus text at /metrics and a Server-Timing header.
+# /metrics needs "Authorization: Bearer <METRICS_TOKEN>" (or a staff JWT).
+METRICS_ENABLED = config("METRICS_ENABLED", default=True, cast=bool)
+METRICS_SERVER_TIMING = config("METRICS_SERVER_TIMING", default=True, cast=bool)
+METRICS_SLOW_QUERY_MS = config("METRICS_SLOW_QUERY_MS", default=200, cast=float)  # logged as core.metrics.slow_query
+METRICS_TOKEN = config("METRICS_TOKEN", default="")
+
 ROOT_URLCONF = 'MemoRiseApi.urls'
 
 TEMPLATES = [
@@ -126,13 +221,16 @@ WSGI_APPLICATION = 'MemoRiseApi.wsgi.application'
 # Database
 # https://docs.djangoproject.com/en/5.2/ref/settings/#databases
 
+# 🐘 PostgreSQL (DATABASE_URL or DB_ENGINE=postgres, pooled) or SQLite.
+# See MemoRiseApi/database.py for every DB_* variable.
 DATABASES = {
-    'default': {
-        'ENGINE': 'django.db.backends.sqlite3',
-        'NAME': BASE_DIR / 'db.sqlite3',
-    }
+    'default': database_config(BASE_DIR)
 }
 
+# 🪶 SQLite only: WAL, synchronous=NORMAL and busy_timeout on every connection
+SQLITE_PRAGMAS_ENABLED = config("SQLITE_PRAGMAS_ENABLED", default=True, cast=bool)
+SQLITE_BUSY_TIMEOUT = config("SQLITE_BUSY_TIMEOUT", default=5.0, cast=float)  # seconds
+
 
 # Password validation
 # https://docs.djangoproject.com/en/5.2/ref/settings/#auth-password-validators
@@ -171,6 +269,18 @@ USE_TZ = True
 STATIC_URL = 'static/'
 STATIC_ROOT = BASE_DIR / "staticfiles"
 
+# 📦 Static and media served by the app itself (core/files.py): collectstatic
+# writes content-hashed names plus .br/.gz variants (core/storage.py), hashed
+# names are cached as immutable, media supports range requests
+STORAGES = {
+    "default": {"BACKEND": "django.core.files.storage.FileSystemStorage"},
+    "staticfiles": {"BACKEND": "core.storage.CompressedManifestStaticFilesStorage"},
+}
+SERVE_STATIC = config("SERVE_STATIC", default=True, cast=bool)
+SERVE_MEDIA = config("SERVE_MEDIA", default=True, cast=bool)
+STATIC_MAX_AGE = config("STATIC_MAX_AGE", default=60, cast=int)     # seconds, names without a hash
+MEDIA_MAX_AGE = config("MEDIA_MAX_AGE", default=3600, cast=int)     # seconds, names without a hash
+
 
 # Default primary key field type
 # https://docs.djangoproject.com/en/5.2/ref/settings/#default-auto-field
@@ -7,28 +7,27 @@ from django.contrib import admin
 from django.urls import path,include
 from django.conf import settings
 from django.conf.urls.static import static
-from drf_spectacular.views import (
-    SpectacularAPIView,
-    SpectacularSwaggerView,
-)
+from drf_spectacular.views import SpectacularSwaggerView
 from rest_framework_simplejwt.views import (
     TokenRefreshView,
     TokenVerifyView
 )
 
-from core.views import CustomTokenObtainPairView
+from core.views import CachedSchemaView, CustomTokenObtainPairView, MetricsView
 
 
 urlpatterns = [
     path('admin/', admin.site.urls),
     path('api/',include('core.urls')),
 
-    path("api/schema/", SpectacularAPIView.as_view(), name="schema"),
+    path("api/schema/", CachedSchemaView.as_view(), name="schema"),
     path("api/schema/swagger-ui/", SpectacularSwaggerView.as_view(url_name="schema"), name="swagger-ui"),
 
     path("api/token/", CustomTokenObtainPairView.as_view(), name="token_obtain_pair"),
     path("api/token/refresh/", TokenRefreshView.as_view(), name="token_refresh"),
     path("api/token/verify/", TokenVerifyView.as_view(), name="token_verify"),
+
+    path("metrics", MetricsView.as_view(), name="metrics"),
 ]
 
 if settings.DEBUG:
@@ -4,3 +4,23 @@ from django.apps import AppConfig
 class CoreConfig(AppConfig):
     default_auto_field = 'django.db.models.BigAutoField'
     name = 'core'
+
+    def ready(self):
+        from django.conf import settings
+        from django.db.backends.signals import connection_created
+        from django.db.models.signals import post_delete, post_init, post_save
+        from .db import configure_sqlite
+        from .metrics import install_query_timer
+        from .models import Deck, Flashcard
+        from .services import deck_counters
+
+        connection_created.connect(configure_sqlite, dispatch_uid="core.configure_sqlite")
+
+        # 🔢 Materialized deck counters follow every model save/delete
+        post_save.connect(deck_counters.deck_created, sender=Deck, dispatch_uid="core.deck_counters.deck")
+        post_init.connect(deck_counters.flashcard_loaded, sender=Flashcard, dispatch_uid="core.deck_counters.init")
+        post_save.connect(deck_counters.flashcard_saved, sender=Flashcard, dispatch_uid="core.deck_counters.save")
+        post_delete.connect(deck_counters.flashcard_deleted, sender=Flashcard, dispatch_uid="core.deck_counters.delete")
+
+        if settings.METRICS_ENABLED:
+            connection_created.connect(install_query_timer, dispatch_uid="core.install_query_timer")
@@ -0,0 +1,16 @@
+"""
+Async views mounted ahead of the DRF router when settings.ASYNC_VIEWS is on
+(the ASGI profile). Same paths and names as the sync endpoints they replace,
+plus ai/flashcards/generate/, which has no sync counterpart: under WSGI every
+call would run in a throwaway event loop (async_to_sync).
+"""
+from django.urls import path
+
+from . import async_views
+
+urlpatterns = [
+    path('flashcards/study/', async_views.study_cards, name='flashcard-study-cards'),
+    path('flashcards/<int:pk>/review/', async_views.review, name='flashcard-review'),
+    path('ai/flashcards/stream/', async_views.stream_flashcards, name='ai-flashcards-stream'),
+    path('ai/flashcards/generate/', async_views.generate_flashcards, name='ai-flashcards-generate'),
+]
@@ -0,0 +1,194 @@
+"""
+Async (ASGI) versions of the I/O-bound endpoints.
+
+Under the ASGI profile (uvicorn workers, ASYNC_VIEWS=True) these views
+replace the DRF ones at the same URLs with the same request/response
+contract (see core/async_urls.py). They await the LLM through AsyncOpenAI
+and use the async ORM, so one process keeps serving CRUD traffic while many
+slow AI requests are waiting. DRF has no async views, so authentication,
+validation errors and 4xx bodies are reproduced here by hand.
+"""
+import json
+
+from asgiref.sync import sync_to_async
+from django.db import transaction
+from django.http import JsonResponse, StreamingHttpResponse
+from django.utils import timezone
+from django.views.decorators.csrf import csrf_exempt
+from django.views.decorators.http import require_GET, require_POST
+from rest_framework.exceptions import APIException, ValidationError
+
+from .authentication import ClaimsJWTAuthentication
+from .models import Flashcard
+from .pagination import DueQueueKeyset
+from .scheduling import apply_review
+from .serializer import AIGenerationRequestSerializer, FlashCardSerializer, FlashcardReviewSerializer
+from .services.ai_service import (
+    AIServiceUnavailable,
+    CircuitOpenError,
+    InvalidAIResponse,
+    agenerate_flashcards,
+    astream_flashcards,
+)
+from .services.flashcards import bulk_create_flashcards, due_queue, save_review
+from .services.forecast import invalidate_forecast
+
+
+class _Reject(Exception):
+    """Short-circuits a view with a DRF-style error response."""
+
+    def __init__(self, detail, status):
+        self.response = JsonResponse(detail if isinstance(detail, dict) else {"detail": detail}, status=status)
+
+
+async def _authenticate(request):
+    """
+    JWT auth as in DRF; 401 when the token is missing or invalid. Sets
+    request.user for serializers that read it from their context.
+    """
+    try:
+        result = await sync_to_async(ClaimsJWTAuthentication().authenticate)(request)
+    except APIException as exc:
+        raise _Reject(exc.detail, exc.status_code)
+    if result is None:
+        raise _Reject("Authentication credentials were not provided.", 401)
+    request.user = result[0]
+    return result[0]
+
+
+def _json_body(request):
+    try:
+        body = json.loads(request.body or b"{}")
+    except ValueError:
+        raise _Reject("JSON parse error.", 400)
+    if not isinstance(body, dict):
+        raise _Reject("Expected a JSON object.", 400)
+    return body
+
+
+def _validate(serializer):
+    if not serializer.is_valid():
+        raise _Reject(serializer.errors, 400)
+    return serializer.validated_data
+
+
+def _view(method_check):
+    """csrf_exempt (JWT, no cookies) + method check + _Reject handling."""
+
+    def decorator(view):
+        async def wrapper(request, *args, **kwargs):
+            try:
+                return await view(request, *args, **kwargs)
+            except _Reject as reject:
+                return reject.response
+            except ValidationError as exc:
+                return JsonResponse(exc.detail, status=400, safe=False)
+
+        wrapper.__name__ = view.__name__
+        wrapper.__doc__ = view.__doc__
+        return csrf_exempt(method_check(wrapper))
+
+    return decorator
+
+
+@_view(require_GET)
+async def study_cards(request):
+    """Async FlashCardViewSet.study_cards: ?deck, ?limit, ?cursor."""
+    user = await _authenticate(request)
+    queue = due_queue(user, timezone.now(), request.GET.get("deck"))
+    cards, next_cursor = await DueQueueKeyset().apaginate(queue, request)
+    return JsonResponse({"results": FlashCardSerializer(cards, many=True).data, "next": next_cursor})
+
+
+@_view(require_POST)
+async def review(request, pk):
+    """Async FlashCardViewSet.review: {"answer": "again" | "good" | "easy"}."""
+    user = await _authenticate(request)
+    answer = _validate(FlashcardReviewSerializer(data=_json_body(request)))["answer"]
+
+    try:
+        flashcard = await Flashcard.objects.filter(user=user).aget(pk=pk)
+    except Flashcard.DoesNotExist:
+        raise _Reject("No Flashcard matches the given query.", 404)
+
+    apply_review(flashcard, answer, timezone.now())
+    await sync_to_async(save_review)(flashcard)
+    return JsonResponse(FlashCardSerializer(flashcard).data)
+
+
+def _save_generated(deck, cards):
+    with transaction.atomic():
+        return bulk_create_flashcards(deck, cards)
+
+
+@_view(require_POST)
+async def generate_flashcards(request):
+    """
+    Generates flashcards and answers when they are ready (no job polling).
+    Body: {"text", "count"?, "deck"?}. With "deck", the cards are saved into
+    it with one bulk insert and returned with their ids (201).
+    Response: {"flashcards", "saved"?, "cached", "chunks"}.
+    """
+    await _authenticate(request)
+    # The "deck" field looks the deck up, so validate off the event loop
+    serializer = AIGenerationRequestSerializer(data=_json_body(request), context={"request": request})
+    data = await sync_to_async(_validate)(serializer)
+    deck = data.get("deck")
+
+    try:
+        generation = await agenerate_flashcards(data["text"], data["count"])
+    except InvalidAIResponse as exc:
+        return JsonResponse({"error": "Invalid AI response", "raw": exc.raw}, status=502)
+    except AIServiceUnavailable as exc:
+        response = JsonResponse({"error": str(exc)}, status=503)
+        if isinstance(exc, CircuitOpenError):
+            response["Retry-After"] = str(max(int(exc.retry_after), 1))
+        return response
+
+    payload = {"flashcards": generation.flashcards, "cached": generation.cached, "chunks": generation.chunks}
+    if deck is None:
+        return JsonResponse(payload)
+
+    created = await sync_to_async(_save_generated)(deck, generation.flashcards)
+    payload["flashcards"] = [{"id": card.id, "front": card.front, "back": card.back} for card in created]
+    payload["saved"] = [card.id for card in created]
+    return JsonResponse(payload, status=201)
+
+
+def _ndjson(event):
+    return json.dumps(event, ensure_ascii=False) + "\n"
+
+
+async def _stream_events(user, text, count, deck=None):
+    created = []
+    emitted = 0
+    try:
+        async for kind, payload in astream_flashcards(text, count):
+            if kind == "error":
+                yield _ndjson({"type": "error", "raw": payload})
+                continue
+            if deck is not None:
+                flashcard = await Flashcard.objects.acreate(deck=deck, **payload)
+                created.append(flashcard)
+                payload = {"id": flashcard.id, **payload}
+            emitted += 1
+            yield _ndjson({"type": "card", "card": payload})
+    except Exception as exc:
+        yield _ndjson({"type": "error", "message": f"AI service error: {exc}"})
+    finally:
+        if created:
+            await sync_to_async(invalidate_forecast)(user.id)
+    yield _ndjson({"type": "done", "count": emitted, "saved": len(created)})
+
+
+@_view(require_POST)
+async def stream_flashcards(request):
+    """Async AIStreamFlashcardsView (same NDJSON events)."""
+    user = await _authenticate(request)
+    serializer = AIGenerationRequestSerializer(data=_json_body(request), context={"request": request})
+    data = await sync_to_async(_validate)(serializer)
+
+    response = StreamingHttpResponse(_stream_events(user, **data), content_type="application/x-ndjson")
+    response["Cache-Control"] = "no-cache"
+    response["X-Accel-Buffering"] = "no"
+    return response
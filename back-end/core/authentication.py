@@ -0,0 +1,144 @@
+"""
+JWT authentication without a user query per request.
+
+CustomTokenObtainPairSerializer embeds the user's id, email, is_active and
+base_ease_factor in every token (copied into refreshed access tokens too).
+`ClaimsJWTAuthentication` builds `request.user` from those claims with
+`User.from_db`: a real User instance whose other fields are deferred, so
+ORM filters and FK assignments work as usual and a view that reads e.g.
+`username` loads it from the database on first access.
+
+Tokens issued before the claims existed fall back to a database lookup
+through a short per-process cache (JWT_USER_CACHE_TTL seconds, 0 disables).
+
+Refresh tokens are `BlacklistRefreshToken`s, which keep the outstanding and
+blacklisted lists through core.services.token_blacklist.
+"""
+import threading
+import time
+from decimal import Decimal, InvalidOperation
+
+from django.conf import settings
+from django.db.models.signals import post_delete, post_save
+from django.dispatch import receiver
+from django.utils.translation import gettext_lazy as _
+from rest_framework_simplejwt.authentication import JWTAuthentication
+from rest_framework_simplejwt.exceptions import AuthenticationFailed, InvalidToken, TokenError
+from rest_framework_simplejwt.settings import api_settings
+from rest_framework_simplejwt.tokens import BlacklistMixin, RefreshToken
+
+from .models import User
+from .services import token_blacklist
+
+
+def add_user_claims(token, user):
+    """Called by CustomTokenObtainPairSerializer.get_token."""
+    token["email"] = user.email
+    token["is_active"] = user.is_active
+    token["base_ease_factor"] = str(user.base_ease_factor)
+    return token
+
+
+def user_from_claims(validated_token):
+    """User with id + claimed fields loaded (the rest deferred), or None if the token has no claims."""
+    try:
+        loaded = {
+            "id": int(validated_token[api_settings.USER_ID_CLAIM]),
+            "email": str(validated_token["email"]),
+            "is_active": bool(validated_token["is_active"]),
+            "base_ease_factor": Decimal(validated_token["base_ease_factor"]),
+        }
+    except (KeyError, TypeError, ValueError, InvalidOperation):
+        return None
+    # from_db expects the values in model field order; missing ones are deferred
+    field_names = [field.attname for field in User._meta.concrete_fields if field.attname in loaded]
+    return User.from_db("default", field_names, [loaded[name] for name in field_names])
+
+
+class UserCache:
+    """Per-process TTL cache of full User rows, keyed by id."""
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self._rows = {}
+
+    def get(self, user_id):
+        with self._lock:
+            entry = self._rows.get(user_id)
+            if entry is None or entry[0] < time.monotonic():
+                self._rows.pop(user_id, None)
+                return None
+            field_names, values = entry[1]
+        return User.from_db("default", field_names, values)
+
+    def put(self, user):
+        field_names = tuple(field.attname for field in User._meta.concrete_fields)
+        values = tuple(getattr(user, name) for name in field_names)
+        with self._lock:
+            self._rows[user.pk] = (time.monotonic() + settings.JWT_USER_CACHE_TTL, (field_names, values))
+
+    def discard(self, user_id):
+        with self._lock:
+            self._rows.pop(user_id, None)
+
+    def clear(self):
+        with self._lock:
+            self._rows.clear()
+
+
+user_cache = UserCache()
+
+
+@receiver(post_save, sender=User)
+@receiver(post_delete, sender=User)
+def _forget_cached_user(sender, instance, **kwargs):
+    # Other processes keep their copy until it expires (JWT_USER_CACHE_TTL)
+    user_cache.discard(instance.pk)
+
+
+class ClaimsJWTAuthentication(JWTAuthentication):
+    """JWTAuthentication that trusts the token's user claims instead of querying the user."""
+
+    def get_user(self, validated_token):
+        user = user_from_claims(validated_token)
+        if user is None:
+            user = self._cached_user(validated_token)
+        if not user.is_active:
+            raise AuthenticationFailed("User is inactive", code="user_inactive")
+        return user
+
+    def _cached_user(self, validated_token):
+        if not settings.JWT_USER_CACHE_TTL:
+            return super().get_user(validated_token)
+        try:
+            user_id = int(validated_token[api_settings.USER_ID_CLAIM])
+        except (KeyError, TypeError, ValueError):
+            raise InvalidToken("Token contained no recognizable user identification")
+        user = user_cache.get(user_id)
+        if user is None:
+            user = super().get_user(validated_token)
+            user_cache.put(user)
+        return user
+
+
+class BlacklistRefreshToken(RefreshToken):
+    """RefreshToken checked against the in-memory blacklist front (no user lookups)."""
+
+    def check_blacklist(self):
+        if token_blacklist.index.is_blacklisted(self[api_settings.JTI_CLAIM]):
+            raise TokenError(_("Token is blacklisted"))
+
+    def blacklist(self):
+        # Two refreshes racing with the same token: only the first one wins
+        if not token_blacklist.blacklist(self):
+            raise TokenError(_("Token is blacklisted"))
+
+    def outstand(self):
+        return token_blacklist.outstand(self)
+
+    @classmethod
+    def for_user(cls, user):
+        # Token.for_user, skipping BlacklistMixin's OutstandingToken insert
+        token = super(BlacklistMixin, cls).for_user(user)
+        token.outstand()
+        return token
@@ -0,0 +1,239 @@
+"""
+API benchmark runner.
+
+Drives the real URL/middleware/auth stack in-process with the DRF test
+client against the configured database (DB_ENGINE/DATABASE_URL pick SQLite
+or PostgreSQL; seed it first with `manage.py seed`), measuring wall time
+and query count of every request.
+Results are p50/p95/mean latency and the median query count per scenario,
+and can be compared with a stored baseline JSON: query counts must not grow
+and p95 may not exceed the baseline by more than the tolerance.
+
+The "boot" row times fresh processes from spawn to their first response
+(core/boot.py); its p95 must also stay within settings.BOOT_BUDGET_MS.
+"""
+import json
+import platform
+import statistics
+import time
+from pathlib import Path
+
+import django
+from django.conf import settings
+from django.db import connection
+from django.test.utils import CaptureQueriesContext, override_settings
+from django.urls import reverse
+from rest_framework.test import APIClient
+
+from . import boot
+from .models import Deck, Flashcard
+from .services import seed
+
+BASELINE_DIR = Path(settings.BASE_DIR) / "benchmarks"
+
+# p95 differences under this many ms are noise, whatever the ratio
+MIN_REGRESSION_MS = 2.0
+
+
+class BenchmarkError(Exception):
+    pass
+
+
+class Context:
+    """Seeded user, authenticated client and the objects scenarios act on."""
+
+    def __init__(self, user, password, iterations):
+        self.user = user
+        self.password = password
+        self.client = APIClient()
+        response = self.client.post(
+            reverse("token_obtain_pair"), {"email": user.email, "password": password}, format="json"
+        )
+        if response.status_code != 200:
+            raise BenchmarkError(f"Could not log in as {user.email}: {response.status_code}")
+        self.client.credentials(HTTP_AUTHORIZATION=f"Bearer {response.json()['access']}")
+
+        self.deck = Deck.objects.filter(user=user).order_by("id").first()
+        if self.deck is None:
+            raise BenchmarkError(f"{user.email} has no decks.")
+        self._review_ids = list(
+            Flashcard.objects.filter(user=user).order_by("id").values_list("id", flat=True)[:iterations]
+        )
+        self._next_review = 0
+
+    def next_review_id(self):
+        card_id = self._review_ids[self._next_review % len(self._review_ids)]
+        self._next_review += 1
+        return card_id
+
+
+def _study(ctx):
+    return ctx.client.get(reverse("flashcard-study-cards"), {"limit": 50})
+
+
+def _review(ctx):
+    return ctx.client.post(
+        reverse("flashcard-review", args=[ctx.next_review_id()]), {"answer": "good"}, format="json"
+    )
+
+
+def _deck_list(ctx):
+    return ctx.client.get(reverse("deck-list"))
+
+
+def _deck_flashcards(ctx):
+    return ctx.client.get(reverse("deck-flashcards", args=[ctx.deck.id]))
+
+
+def _login(ctx):
+    return APIClient().post(
+        reverse("token_obtain_pair"), {"email": ctx.user.email, "password": ctx.password}, format="json"
+    )
+
+
+SCENARIOS = {
+    "study_cards": _study,
+    "review": _review,
+    "deck_list": _deck_list,
+    "deck_flashcards": _deck_flashcards,
+    "jwt_login": _login,
+}
+
+
+def percentile(values, fraction):
+    """Linear-interpolated percentile of a non-empty list."""
+    ordered = sorted(values)
+    position = (len(ordered) - 1) * fraction
+    low = int(position)
+    high = min(low + 1, len(ordered) - 1)
+    return ordered[low] + (ordered[high] - ordered[low]) * (position - low)
+
+
+def measure(scenario, ctx, iterations, warmup):
+    for _ in range(warmup):
+        scenario(ctx)
+
+    timings = []
+    queries = []
+    for _ in range(iterations):
+        with CaptureQueriesContext(connection) as captured:
+            start = time.perf_counter()
+            response = scenario(ctx)
+            elapsed = time.perf_counter() - start
+        if response.status_code >= 400:
+            raise BenchmarkError(f"{scenario.__name__} answered {response.status_code}")
+        timings.append(elapsed * 1000)
+        queries.append(len(captured))
+
+    return {
+        "p50_ms": round(percentile(timings, 0.50), 3),
+        "p95_ms": round(percentile(timings, 0.95), 3),
+        "mean_ms": round(statistics.fmean(timings), 3),
+        "queries": int(statistics.median(queries)),
+    }
+
+
+def measure_boot(runs):
+    timings = []
+    for _ in range(runs):
+        try:
+            result = boot.time_boot()
+        except RuntimeError as exc:
+            raise BenchmarkError(f"boot failed: {exc}")
+        if result["status"] >= 500:
+            raise BenchmarkError(f"boot answered {result['status']}")
+        timings.append(result["total_ms"])
+
+    return {
+        "p50_ms": round(percentile(timings, 0.50), 3),
+        "p95_ms": round(percentile(timings, 0.95), 3),
+        "mean_ms": round(statistics.fmean(timings), 3),
+        "runs": runs,
+    }
+
+
+def dataset():
+    users = seed.seeded_users()
+    return {
+        "users": users.count(),
+        "decks": Deck.objects.filter(user__in=users).count(),
+        "flashcards": Flashcard.objects.filter(user__in=users).count(),
+    }
+
+
+def run(names=None, iterations=50, warmup=5, password=seed.DEFAULT_PASSWORD, boot_runs=0):
+    """Runs the scenarios as the first seeded user (and `boot_runs` boots) and returns the results dict."""
+    names = list(names or SCENARIOS)
+    unknown = set(names) - set(SCENARIOS)
+    if unknown:
+        raise BenchmarkError(f"Unknown scenarios: {', '.join(sorted(unknown))}")
+
+    user = seed.seeded_users().order_by("id").first()
+    if user is None:
+        raise BenchmarkError("No seeded data. Run `manage.py seed` first.")
+
+    # The test client talks to "testserver"
+    with override_settings(ALLOWED_HOSTS=[*settings.ALLOWED_HOSTS, "testserver"]):
+        ctx = Context(user, password, iterations + warmup)
+        results = {name: measure(SCENARIOS[name], ctx, iterations, warmup) for name in names}
+
+    results = {
+        "meta": {
+            "iterations": iterations,
+            "database": connection.vendor,
+            "python": platform.python_version(),
+            "django": django.get_version(),
+            "dataset": dataset(),
+        },
+        "scenarios": results,
+    }
+    if boot_runs:
+        results["boot"] = measure_boot(boot_runs)
+    return results
+
+
+def compare(results, baseline, tolerance=0.25):
+    """Returns a list of human-readable regressions (empty when none)."""
+    regressions = []
+    for name, current in results["scenarios"].items():
+        previous = baseline.get("scenarios", {}).get(name)
+        if previous is None:
+            continue
+        if current["queries"] > previous["queries"]:
+            regressions.append(f"{name}: {current['queries']} queries (baseline {previous['queries']})")
+        limit = max(previous["p95_ms"] * (1 + tolerance), previous["p95_ms"] + MIN_REGRESSION_MS)
+        if current["p95_ms"] > limit:
+            regressions.append(
+                f"{name}: p95 {current['p95_ms']:.1f} ms (baseline {previous['p95_ms']:.1f} ms, limit {limit:.1f} ms)"
+            )
+
+    current = results.get("boot")
+    if current is not None:
+        if current["p95_ms"] > settings.BOOT_BUDGET_MS:
+            regressions.append(f"boot: p95 {current['p95_ms']:.1f} ms (budget {settings.BOOT_BUDGET_MS:.1f} ms)")
+        previous = baseline.get("boot")
+        if previous is not None:
+            limit = max(previous["p95_ms"] * (1 + tolerance), previous["p95_ms"] + MIN_REGRESSION_MS)
+            if current["p95_ms"] > limit:
+                regressions.append(
+                    f"boot: p95 {current['p95_ms']:.1f} ms (baseline {previous['p95_ms']:.1f} ms, limit {limit:.1f} ms)"
+                )
+    return regressions
+
+
+def default_baseline():
+    """Baselines are kept per database backend (baseline.sqlite.json, baseline.postgresql.json)."""
+    return BASELINE_DIR / f"baseline.{connection.vendor}.json"
+
+
+def load_baseline(path):
+    with open(path, encoding="utf-8") as file:
+        return json.load(file)
+
+
+def save_baseline(results, path):
+    path = Path(path)
+    path.parent.mkdir(parents=True, exist_ok=True)
+    with open(path, "w", encoding="utf-8") as file:
+        json.dump(results, file, indent=2, sort_keys=True)
+        file.write("\n")
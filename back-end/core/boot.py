@@ -0,0 +1,168 @@
+"""
+Process start-up: import-time profile, warm-up and boot time.
+
+- `import_profile` runs a fresh interpreter with `-X importtime` on the WSGI
+  application plus the URLconf (what a worker imports before its first
+  response) and digests the report (manage.py importtime).
+- `warm` is called by gunicorn.conf.py in the master when preload_app is on:
+  it imports every view and loads a prebuilt OpenAPI schema before the
+  workers are forked, then freezes the GC so the workers keep sharing those
+  pages instead of copying them on the first collection.
+- `time_boot` spawns a fresh process and measures the time from spawn to
+  its first response (the "boot" row of manage.py benchmark, checked
+  against BOOT_BUDGET_MS).
+"""
+import gc
+import json
+import os
+import re
+import subprocess
+import sys
+import time
+from pathlib import Path
+
+BOOT_PATH = "/api/decks/"  # full middleware/auth/DRF stack, no database (401)
+IMPORTTIME_LINE = re.compile(r"^import time:\s+(\d+) \|\s+(\d+) \| (\s*)(\S+)")
+
+
+def _project_dir():
+    from django.conf import settings
+
+    return Path(settings.BASE_DIR)
+
+
+def _interpreter_env():
+    env = dict(os.environ)
+    env.setdefault("DJANGO_SETTINGS_MODULE", "MemoRiseApi.settings")
+    return env
+
+
+def parse_importtime(text):
+    """[{"module", "self_us", "cumulative_us", "depth"}] in report order."""
+    rows = []
+    for line in text.splitlines():
+        match = IMPORTTIME_LINE.match(line)
+        if match:
+            self_us, cumulative_us, indent, module = match.groups()
+            rows.append({
+                "module": module,
+                "self_us": int(self_us),
+                "cumulative_us": int(cumulative_us),
+                "depth": len(indent) // 2,
+            })
+    return rows
+
+
+def summarize(rows, top=20):
+    """Total import time, slowest modules (cumulative) and heaviest top-level packages (self)."""
+    packages = {}
+    for row in rows:
+        package = row["module"].split(".")[0]
+        packages[package] = packages.get(package, 0) + row["self_us"]
+    return {
+        "total_ms": round(sum(row["cumulative_us"] for row in rows if row["depth"] == 0) / 1000, 1),
+        "modules": len(rows),
+        "slowest": [
+            {"module": row["module"], "cumulative_ms": round(row["cumulative_us"] / 1000, 1),
+             "self_ms": round(row["self_us"] / 1000, 1)}
+            for row in sorted(rows, key=lambda row: row["cumulative_us"], reverse=True)[:top]
+        ],
+        "packages": [
+            {"package": package, "self_ms": round(total / 1000, 1)}
+            for package, total in sorted(packages.items(), key=lambda item: item[1], reverse=True)[:top]
+        ],
+    }
+
+
+def import_profile(module=None):
+    """Import-time rows of `module` (the WSGI application by default) and the URLconf."""
+    from django.conf import settings
+
+    module = module or settings.WSGI_APPLICATION.rsplit(".", 1)[0]
+    code = f"import {module}; from django.urls import get_resolver; get_resolver().url_patterns"
+    result = subprocess.run(
+        [sys.executable, "-X", "importtime", "-c", code],
+        cwd=_project_dir(), env=_interpreter_env(), capture_output=True, text=True,
+    )
+    if result.returncode != 0:
+        raise RuntimeError(result.stderr.strip().splitlines()[-1] if result.stderr.strip() else "import failed")
+    return parse_importtime(result.stderr)
+
+
+def first_request(application, path=BOOT_PATH):
+    """Sends one GET through a WSGI application and returns the status code."""
+    from wsgiref.util import setup_testing_defaults
+
+    from django.conf import settings
+
+    host = next((host for host in settings.ALLOWED_HOSTS if host != "*"), "localhost")
+    environ = {"PATH_INFO": path, "HTTP_HOST": f"boot{host}" if host.startswith(".") else host}
+    setup_testing_defaults(environ)
+    status = []
+    body = application(environ, lambda code, headers, exc_info=None: status.append(code))
+    try:
+        for _ in body:
+            pass
+    finally:
+        getattr(body, "close", lambda: None)()
+    return int(status[0].split()[0])
+
+
+def _boot_child(spawned_at, path):
+    """Entry point of the process spawned by time_boot."""
+    started = time.perf_counter()
+    from django.conf import settings
+    from django.utils.module_loading import import_string
+
+    application = import_string(settings.WSGI_APPLICATION)
+    loaded = time.perf_counter()
+    status = first_request(application, path)
+    done = time.perf_counter()
+    print(json.dumps({
+        "total_ms": (time.time() - spawned_at) * 1000,
+        "setup_ms": (loaded - started) * 1000,
+        "first_request_ms": (done - loaded) * 1000,
+        "status": status,
+    }))
+
+
+def time_boot(path=BOOT_PATH):
+    """{"total_ms", "setup_ms", "first_request_ms", "status"} of one fresh process."""
+    code = f"from core.boot import _boot_child; _boot_child({time.time()!r}, {path!r})"
+    result = subprocess.run(
+        [sys.executable, "-c", code],
+        cwd=_project_dir(), env=_interpreter_env(), capture_output=True, text=True,
+    )
+    if result.returncode != 0:
+        raise RuntimeError(result.stderr.strip().splitlines()[-1] if result.stderr.strip() else "boot failed")
+    return json.loads(result.stdout.strip().splitlines()[-1])
+
+
+def warm():
+    """Imports and loads what every worker needs, in the gunicorn master (preload_app)."""
+    from django.db import connections
+    from django.urls import get_resolver
+
+    from . import schema
+
+    get_resolver().url_patterns  # imports every view, serializer and service
+    if schema.schema_path(schema.code_version()).exists():
+        schema.cache.schema()
+    # Workers must open their own connections
+    connections.close_all()
+    # Keep the warmed objects out of the collector: a GC pass in a worker
+    # would otherwise write to (and un-share) every page holding them
+    gc.collect()
+    gc.freeze()
+
+
+def after_fork():
+    """Per-worker reset, from gunicorn's post_fork."""
+    from django.db import connections
+
+    from .services import ai_jobs, profile_pictures
+
+    connections.close_all()
+    # Thread pools do not survive a fork; let each worker create its own
+    ai_jobs._executor = None
+    profile_pictures._executor = None
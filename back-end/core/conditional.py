@@ -0,0 +1,76 @@
+"""
+Conditional GET support (ETag / Last-Modified) for list endpoints.
+
+The validators are computed from cheap aggregates (max updated_at and row
+count) instead of from the rendered body, so an unchanged collection is
+answered with a 304 after a single aggregate query, without loading or
+serializing any rows.
+"""
+import hashlib
+
+from django.db.models import Count, Max
+from django.utils.http import http_date, parse_etags, quote_etag
+from rest_framework import status
+from rest_framework.response import Response
+
+
+def build_etag(request, *parts):
+    """Strong ETag over the aggregates, the user and the full query string."""
+    raw = "|".join(str(part) for part in (request.user.pk, request.get_full_path(), *parts))
+    return quote_etag(hashlib.sha1(raw.encode()).hexdigest())
+
+
+def etag_matches(request, etag):
+    header = request.headers.get("If-None-Match")
+    if not header:
+        return False
+    return header.strip() == "*" or etag in parse_etags(header)
+
+
+def collection_state(queryset):
+    """(max updated_at, count) of a queryset, in one query."""
+    state = queryset.order_by().aggregate(last_modified=Max("updated_at"), count=Count("id"))
+    return state["last_modified"], state["count"]
+
+
+def conditional_list(request, states, build_response):
+    """
+    states: list of (last_modified, count, ...) tuples describing everything
+    the response depends on. Returns a 304 when the client's ETag still
+    matches, otherwise `build_response()` with ETag/Last-Modified set.
+
+    The count is part of the ETag because deletions do not move max(updated_at);
+    for the same reason If-Modified-Since alone is never trusted for a 304.
+    """
+    etag = build_etag(request, *states)
+    timestamps = [state[0] for state in states if state[0] is not None]
+    headers = {"ETag": etag, "Cache-Control": "private, no-cache", "Vary": "Authorization"}
+    if timestamps:
+        headers["Last-Modified"] = http_date(max(timestamps).timestamp())
+
+    if etag_matches(request, etag):
+        return Response(status=status.HTTP_304_NOT_MODIFIED, headers=headers)
+
+    response = build_response()
+    for name, value in headers.items():
+        response[name] = value
+    return response
+
+
+class ConditionalListMixin:
+    """
+    ViewSet mixin: list() answers 304 Not Modified while the filtered
+    queryset is unchanged. Override `get_list_states` when the response
+    depends on more than the listed rows.
+    """
+
+    def get_list_states(self, queryset):
+        return [collection_state(queryset)]
+
+    def list(self, request, *args, **kwargs):
+        queryset = self.filter_queryset(self.get_queryset())
+        return conditional_list(
+            request,
+            self.get_list_states(queryset),
+            lambda: super(ConditionalListMixin, self).list(request, *args, **kwargs),
+        )
@@ -0,0 +1,19 @@
+from django.conf import settings
+
+# Applied to every new SQLite connection (see CoreConfig.ready)
+SQLITE_PRAGMAS = (
+    # Readers no longer block the writer (and vice versa); persists in the file
+    "PRAGMA journal_mode=WAL",
+    # Safe with WAL and avoids an fsync on every commit
+    "PRAGMA synchronous=NORMAL",
+)
+
+
+def configure_sqlite(sender, connection, **kwargs):
+    """connection_created handler: WAL, busy_timeout and synchronous for SQLite."""
+    if connection.vendor != "sqlite" or not settings.SQLITE_PRAGMAS_ENABLED:
+        return
+    with connection.cursor() as cursor:
+        for pragma in SQLITE_PRAGMAS:
+            cursor.execute(pragma)
+        cursor.execute(f"PRAGMA busy_timeout={int(settings.SQLITE_BUSY_TIMEOUT * 1000)}")
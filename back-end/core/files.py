@@ -0,0 +1,206 @@
+"""
+Static and media file serving inside the Django process (no CDN or nginx).
+
+`StaticFilesMiddleware` (core/middleware.py) answers STATIC_URL and MEDIA_URL
+requests with `serve` before the rest of the middleware stack runs:
+
+- static files come from STATIC_ROOT as written by collectstatic: the
+  precompressed .br/.gz sibling is sent when the client accepts it
+  (core/storage.py), and file lookups are cached per process since the
+  directory only changes on deploy.
+- media files come from MEDIA_ROOT and support single byte ranges (206),
+  so large files can be resumed or seeked.
+- names carrying a content hash (manifest names, hashed profile pictures)
+  are cached for a year as immutable; others for STATIC_MAX_AGE /
+  MEDIA_MAX_AGE seconds. Every response has an ETag and Last-Modified and
+  conditional requests get a 304.
+"""
+import mimetypes
+import os
+import re
+import stat
+from functools import lru_cache
+
+from django.core.exceptions import SuspiciousFileOperation
+from django.http import FileResponse, Http404, HttpResponse, HttpResponseNotAllowed, HttpResponseNotModified
+from django.utils._os import safe_join
+from django.utils.http import http_date, parse_http_date_safe
+
+IMMUTABLE = "public, max-age=31536000, immutable"
+# name.<12 hex>.ext (ManifestStaticFilesStorage) or <32 hex>[-size].ext (profile pictures)
+HASHED_NAME = re.compile(r"(\.[0-9a-f]{12}\.[^/.]+|(^|/)[0-9a-f]{32}(-\d+)?\.[^/.]+)$")
+ENCODINGS = (("br", ".br"), ("gzip", ".gz"))
+RANGE = re.compile(r"^bytes=(\d*)-(\d*)$")
+BLOCK_SIZE = 64 * 1024
+
+
+class _Stat:
+    __slots__ = ("path", "size", "mtime")
+
+    def __init__(self, path, size, mtime):
+        self.path = path
+        self.size = size
+        self.mtime = mtime
+
+    @property
+    def etag(self):
+        return f'"{int(self.mtime):x}-{self.size:x}"'
+
+
+def _stat(path):
+    try:
+        result = os.stat(path)
+    except (OSError, ValueError):
+        return None
+    if not stat.S_ISREG(result.st_mode):
+        return None
+    return _Stat(path, result.st_size, result.st_mtime)
+
+
+def _resolve(root, path, compressed):
+    """(file, {encoding: variant file}) or None when there is no such file."""
+    try:
+        full_path = safe_join(root, path)
+    except SuspiciousFileOperation:  # outside the root
+        return None
+    file = _stat(full_path)
+    if file is None:
+        return None
+    variants = {}
+    if compressed:
+        for encoding, suffix in ENCODINGS:
+            variant = _stat(full_path + suffix)
+            if variant is not None:
+                variants[encoding] = variant
+    return file, variants
+
+
+_resolve_static = lru_cache(maxsize=4096)(_resolve)
+
+
+def clear_cache():
+    _resolve_static.cache_clear()
+
+
+def _accepted_encodings(request):
+    accepted = set()
+    for item in request.headers.get("Accept-Encoding", "").split(","):
+        coding, *params = (part.strip() for part in item.split(";"))
+        quality = next((param[2:] for param in params if param.startswith("q=")), "1")
+        try:
+            if float(quality) > 0:
+                accepted.add(coding.lower())
+        except ValueError:
+            pass
+    return accepted
+
+
+def _not_modified(request, file):
+    if_none_match = request.headers.get("If-None-Match")
+    if if_none_match is not None:
+        tags = {tag.strip().removeprefix("W/") for tag in if_none_match.split(",")}
+        return "*" in tags or file.etag in tags
+    since = parse_http_date_safe(request.headers.get("If-Modified-Since", ""))
+    return since is not None and int(file.mtime) <= since
+
+
+def _byte_range(request, file):
+    """(start, end) inclusive, None for the whole file, or False if unsatisfiable."""
+    header = request.headers.get("Range")
+    if not header:
+        return None
+    if_range = request.headers.get("If-Range")
+    if if_range and if_range != file.etag and parse_http_date_safe(if_range) != int(file.mtime):
+        return None  # the client's copy is outdated: send everything
+    match = RANGE.match(header.replace(" ", ""))
+    if match is None:
+        return None  # multiple or malformed ranges: serving the whole file is allowed
+    first, last = match.groups()
+    if first:
+        start = int(first)
+        end = min(int(last), file.size - 1) if last else file.size - 1
+    elif last:
+        start, end = max(file.size - int(last), 0), file.size - 1
+    else:
+        return None
+    if start > end or start >= file.size:
+        return False
+    return start, end
+
+
+class _RangeFile:
+    """File-like view of [start, end] of a file, for FileResponse."""
+
+    def __init__(self, path, start, end):
+        self._file = open(path, "rb")
+        self._file.seek(start)
+        self._remaining = end - start + 1
+
+    def read(self, size=-1):
+        if size < 0 or size > self._remaining:
+            size = self._remaining
+        data = self._file.read(size)
+        self._remaining -= len(data)
+        return data
+
+    def close(self):
+        self._file.close()
+
+
+def serve(request, root, path, *, static, max_age, ranges=True):
+    """Response for `path` under `root`, or raises Http404."""
+    if request.method not in ("GET", "HEAD"):
+        return HttpResponseNotAllowed(["GET", "HEAD"])
+
+    resolved = _resolve_static(str(root), path, True) if static else _resolve(str(root), path, False)
+    if resolved is None:
+        raise Http404(path)
+    file, variants = resolved
+
+    byte_range = _byte_range(request, file) if ranges else None
+    encoding = None
+    if variants and byte_range is None:
+        accepted = _accepted_encodings(request)
+        encoding = next((name for name, _ in ENCODINGS if name in variants and name in accepted), None)
+    served = variants[encoding] if encoding else file
+
+    headers = {
+        "Cache-Control": IMMUTABLE if HASHED_NAME.search(path) else f"public, max-age={max_age}",
+        "ETag": served.etag,
+        "Last-Modified": http_date(served.mtime),
+        # Media are user uploads: never let a browser sniff them into HTML
+        "X-Content-Type-Options": "nosniff",
+    }
+    if variants:
+        headers["Vary"] = "Accept-Encoding"
+    if ranges:
+        headers["Accept-Ranges"] = "bytes"
+
+    if _not_modified(request, served):
+        response = HttpResponseNotModified()
+    elif byte_range is False:
+        response = HttpResponse(status=416)
+        headers["Content-Range"] = f"bytes */{file.size}"
+    else:
+        content_type = mimetypes.guess_type(path)[0] or "application/octet-stream"
+        if request.method == "HEAD":
+            start, end = byte_range or (0, served.size - 1)
+            response = HttpResponse(content_type=content_type, status=206 if byte_range else 200)
+            response["Content-Length"] = str(end - start + 1)
+            if byte_range:
+                headers["Content-Range"] = f"bytes {start}-{end}/{file.size}"
+        elif byte_range is None:
+            response = FileResponse(open(served.path, "rb"), content_type=content_type)
+            response.block_size = BLOCK_SIZE
+        else:
+            start, end = byte_range
+            response = FileResponse(_RangeFile(file.path, start, end), content_type=content_type, status=206)
+            response.block_size = BLOCK_SIZE
+            headers["Content-Range"] = f"bytes {start}-{end}/{file.size}"
+            headers["Content-Length"] = str(end - start + 1)
+        if encoding:
+            headers["Content-Encoding"] = encoding
+
+    for name, value in headers.items():
+        response[name] = value
+    return response
@@ -0,0 +1,83 @@
+from django.conf import settings
+from django.core.management.base import BaseCommand, CommandError
+
+from core import benchmark
+
+
+class Command(BaseCommand):
+    help = (
+        "Benchmarks study_cards, review, deck listing, deck flashcards and JWT login "
+        "(p50/p95 latency and query counts) against data from `manage.py seed`, and the "
+        "time from process start to first response, "
+        "and compares them with the stored baseline. Review answers modify the seeded cards."
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument("--scenario", action="append", choices=sorted(benchmark.SCENARIOS),
+                            help="Run only this scenario (repeatable).")
+        parser.add_argument("--iterations", type=int, default=50)
+        parser.add_argument("--warmup", type=int, default=5)
+        parser.add_argument("--boot-runs", type=int, default=5,
+                            help="Fresh processes to time from start to first response (0 skips).")
+        parser.add_argument("--password", default=None, help="Password of the seeded users.")
+        parser.add_argument("--baseline", default=None,
+                            help="Baseline JSON (default: benchmarks/baseline.<database vendor>.json).")
+        parser.add_argument("--tolerance", type=float, default=0.25, help="Allowed p95 slowdown (0.25 = 25%%).")
+        parser.add_argument("--save-baseline", action="store_true", help="Store these results as the new baseline.")
+        parser.add_argument("--no-compare", action="store_true")
+
+    def handle(self, *args, **options):
+        if options["iterations"] < 1:
+            raise CommandError("--iterations must be >= 1.")
+        if options["boot_runs"] < 0:
+            raise CommandError("--boot-runs must be >= 0.")
+
+        kwargs = {"password": options["password"]} if options["password"] else {}
+        try:
+            results = benchmark.run(
+                options["scenario"], options["iterations"], options["warmup"], boot_runs=options["boot_runs"], **kwargs
+            )
+        except benchmark.BenchmarkError as exc:
+            raise CommandError(str(exc))
+
+        options["baseline"] = options["baseline"] or str(benchmark.default_baseline())
+        dataset = results["meta"]["dataset"]
+        self.stdout.write(
+            f"{dataset['users']} users, {dataset['decks']} decks, {dataset['flashcards']} flashcards "
+            f"({results['meta']['database']}, {options['iterations']} iterations)\n"
+        )
+        self.stdout.write(f"{'scenario':<18}{'p50 ms':>10}{'p95 ms':>10}{'mean ms':>10}{'queries':>9}")
+        for name, row in results["scenarios"].items():
+            self.stdout.write(
+                f"{name:<18}{row['p50_ms']:>10.2f}{row['p95_ms']:>10.2f}{row['mean_ms']:>10.2f}{row['queries']:>9}"
+            )
+        if "boot" in results:
+            row = results["boot"]
+            self.stdout.write(
+                f"{'boot':<18}{row['p50_ms']:>10.2f}{row['p95_ms']:>10.2f}{row['mean_ms']:>10.2f}{'-':>9}"
+                f"  (budget {settings.BOOT_BUDGET_MS:.0f} ms)"
+            )
+
+        if options["save_baseline"]:
+            benchmark.save_baseline(results, options["baseline"])
+            self.stdout.write(self.style.SUCCESS(f"Baseline saved to {options['baseline']}"))
+            return
+
+        if options["no_compare"]:
+            return
+        try:
+            baseline = benchmark.load_baseline(options["baseline"])
+        except FileNotFoundError:
+            self.stdout.write(self.style.WARNING(f"No baseline at {options['baseline']}; use --save-baseline."))
+            return
+
+        if baseline["meta"].get("database") != results["meta"]["database"]:
+            self.stdout.write(self.style.WARNING("Baseline was recorded on another database backend."))
+        if baseline["meta"].get("dataset") != dataset:
+            self.stdout.write(self.style.WARNING("Dataset differs from the baseline's; latencies may not compare."))
+        regressions = benchmark.compare(results, baseline, options["tolerance"])
+        if regressions:
+            for regression in regressions:
+                self.stderr.write(f"REGRESSION {regression}")
+            raise CommandError(f"{len(regressions)} benchmark regression(s).")
+        self.stdout.write(self.style.SUCCESS("No regressions against the baseline."))
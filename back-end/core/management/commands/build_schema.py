@@ -0,0 +1,19 @@
+from django.core.management.base import BaseCommand
+
+from core import schema
+
+
+class Command(BaseCommand):
+    help = "Generates the OpenAPI schema of this code version into OPENAPI_SCHEMA_DIR (served by /api/schema/)."
+
+    def add_arguments(self, parser):
+        parser.add_argument("--force", action="store_true", help="Regenerate even if this version is stored.")
+
+    def handle(self, *args, **options):
+        version = schema.code_version()
+        path = schema.schema_path(version)
+        if path.exists() and not options["force"]:
+            self.stdout.write(f"Schema {version} is up to date ({path}).")
+            return
+        path = schema.write(schema.generate(), version)
+        self.stdout.write(self.style.SUCCESS(f"Schema {version} written to {path}."))
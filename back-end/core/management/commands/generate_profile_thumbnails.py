@@ -0,0 +1,19 @@
+from django.core.management.base import BaseCommand
+
+from core.models import User
+from core.services.profile_pictures import generate_thumbnails
+
+
+class Command(BaseCommand):
+    help = "Renders the missing profile picture thumbnails (pictures uploaded before them, or through the admin)."
+
+    def handle(self, *args, **options):
+        users = User.objects.exclude(profile_picture="").exclude(profile_picture__isnull=True)
+        done = 0
+        for user_id, picture in users.filter(profile_thumbnails={}).values_list("id", "profile_picture").iterator():
+            try:
+                generate_thumbnails(user_id, picture)
+                done += 1
+            except OSError as exc:
+                self.stderr.write(f"{picture}: {exc}")
+        self.stdout.write(self.style.SUCCESS(f"Generated thumbnails for {done} users."))
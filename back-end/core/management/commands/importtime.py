@@ -0,0 +1,35 @@
+import json
+
+from django.core.management.base import BaseCommand, CommandError
+
+from core import boot
+
+
+class Command(BaseCommand):
+    help = (
+        "Imports the WSGI application and the URLconf in a fresh interpreter with `python -X importtime` "
+        "and reports the total, the slowest modules and the heaviest packages."
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument("--module", default=None, help="Module to import (default: the WSGI application's).")
+        parser.add_argument("--top", type=int, default=20, help="Rows per table.")
+        parser.add_argument("--json", action="store_true", help="Print the digest as JSON.")
+
+    def handle(self, *args, **options):
+        try:
+            report = boot.summarize(boot.import_profile(options["module"]), options["top"])
+        except RuntimeError as exc:
+            raise CommandError(f"Import failed: {exc}")
+
+        if options["json"]:
+            self.stdout.write(json.dumps(report, indent=2))
+            return
+
+        self.stdout.write(f"{report['modules']} modules imported in {report['total_ms']:.1f} ms\n")
+        self.stdout.write(f"{'module':<56}{'cumulative ms':>15}{'self ms':>10}")
+        for row in report["slowest"]:
+            self.stdout.write(f"{row['module']:<56}{row['cumulative_ms']:>15.1f}{row['self_ms']:>10.1f}")
+        self.stdout.write(f"\n{'package':<56}{'self ms':>15}")
+        for row in report["packages"]:
+            self.stdout.write(f"{row['package']:<56}{row['self_ms']:>15.1f}")
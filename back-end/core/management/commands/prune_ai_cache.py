@@ -0,0 +1,11 @@
+from django.core.management.base import BaseCommand
+
+from core.services import ai_cache
+
+
+class Command(BaseCommand):
+    help = "Deletes expired AI cache rows and the least recently used ones over AI_CACHE_DB_MAX_ENTRIES."
+
+    def handle(self, *args, **options):
+        removed = ai_cache.prune()
+        self.stdout.write(self.style.SUCCESS(f"Removed {removed} cached responses."))
@@ -0,0 +1,14 @@
+from django.core.management.base import BaseCommand
+
+from core.services.token_blacklist import prune_expired
+
+
+class Command(BaseCommand):
+    help = "Deletes expired outstanding and blacklisted refresh tokens."
+
+    def add_arguments(self, parser):
+        parser.add_argument("--batch-size", type=int, default=5000)
+
+    def handle(self, *args, **options):
+        removed = prune_expired(batch_size=options["batch_size"])
+        self.stdout.write(self.style.SUCCESS(f"Removed {removed} expired tokens."))
@@ -0,0 +1,18 @@
+from django.core.management.base import BaseCommand
+
+from core.models import Deck
+from core.services import deck_counters
+
+
+class Command(BaseCommand):
+    help = "Recomputes the materialized DeckCounter rows from the flashcards table."
+
+    def add_arguments(self, parser):
+        parser.add_argument("--batch-size", type=int, default=500)
+
+    def handle(self, *args, **options):
+        batch_size = options["batch_size"]
+        deck_ids = list(Deck.objects.order_by("id").values_list("id", flat=True))
+        for start in range(0, len(deck_ids), batch_size):
+            deck_counters.rebuild(deck_ids[start:start + batch_size])
+        self.stdout.write(self.style.SUCCESS(f"Rebuilt counters for {len(deck_ids)} decks."))
@@ -0,0 +1,33 @@
+import time
+
+from django.core.management.base import BaseCommand
+
+from core.services import ai_jobs
+
+
+class Command(BaseCommand):
+    help = (
+        "Processes pending AI generation jobs from the database queue, requeueing jobs "
+        "left running by dead workers (procfile `worker` process: --loop)."
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument("--loop", action="store_true", help="Keep polling for new jobs.")
+        parser.add_argument("--interval", type=float, default=2.0, help="Polling interval in seconds.")
+
+    def handle(self, *args, **options):
+        processed = 0
+        while True:
+            requeued = ai_jobs.requeue_stale()
+            if requeued:
+                self.stdout.write(f"Requeued {requeued} stale jobs.")
+            job = ai_jobs.run_next()
+            if job is not None:
+                processed += 1
+                self.stdout.write(f"Job {job.id}: {job.status}")
+                continue
+            if not options["loop"]:
+                break
+            time.sleep(options["interval"])
+
+        self.stdout.write(self.style.SUCCESS(f"Processed {processed} jobs."))
@@ -0,0 +1,33 @@
+from django.core.management.base import BaseCommand, CommandError
+
+from core.services import seed
+
+
+class Command(BaseCommand):
+    help = (
+        "Seeds USERS × DECKS × CARDS synthetic flashcards (bench<N>@memorise.test users) "
+        "with realistic status and due-date distributions, for benchmarks and load tests."
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument("--users", type=int, default=10)
+        parser.add_argument("--decks", type=int, default=5, help="Decks per user.")
+        parser.add_argument("--cards", type=int, default=200, help="Flashcards per deck.")
+        parser.add_argument("--seed", type=int, default=0, help="Random seed (same seed, same data).")
+        parser.add_argument("--password", default=seed.DEFAULT_PASSWORD)
+        parser.add_argument("--reset", action="store_true", help="Delete previously seeded users first.")
+
+    def handle(self, *args, **options):
+        if min(options["users"], options["decks"], options["cards"]) < 0:
+            raise CommandError("--users, --decks and --cards must be >= 0.")
+
+        if options["reset"]:
+            seed.clear()
+        elif seed.seeded_users().exists():
+            raise CommandError("Seeded users already exist; use --reset to replace them.")
+
+        users, decks, cards = seed.seed(
+            options["users"], options["decks"], options["cards"],
+            random_seed=options["seed"], password=options["password"],
+        )
+        self.stdout.write(self.style.SUCCESS(f"Seeded {users} users, {decks} decks and {cards} flashcards."))
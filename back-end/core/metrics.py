@@ -0,0 +1,233 @@
+"""
+Per-request instrumentation: wall time, DB queries, DB time and serializer time.
+
+`RequestMetricsMiddleware` (core/middleware.py) opens a `RequestTimings` for
+every request; the DB execute wrapper (`query_timer`) and the project's
+serializers (`TimedSerializerMixin`) add to it. Finished requests
+are aggregated per route (URL name) in `registry`, which `/metrics` renders
+in the Prometheus text format.
+
+Like the AI cache stats, the numbers are per process and each gunicorn
+worker answers /metrics with its own. Every sample carries a
+worker="<pid>" label (`worker_label`), so scrapes that land on different
+workers stay separate series instead of looking like counter resets; add
+them up in Prometheus with `sum without (worker) (...)`. A restarted worker
+gets a new pid, and so starts new series.
+"""
+import contextvars
+import logging
+import os
+import threading
+import time
+from collections import defaultdict
+
+from django.conf import settings
+
+slow_query_logger = logging.getLogger("core.metrics.slow_query")
+
+DURATION_BUCKETS = (0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0)
+
+_current = contextvars.ContextVar("request_timings", default=None)
+
+
+class RequestTimings:
+    """Counters of the request being served."""
+
+    def __init__(self):
+        self.start = time.perf_counter()
+        self.db_queries = 0
+        self.db_time = 0.0
+        self.serializer_time = 0.0
+        self.slow_queries = 0
+        self.route = "unmatched"
+        self._serializer_depth = 0
+
+    @property
+    def elapsed(self):
+        return time.perf_counter() - self.start
+
+    def activate(self):
+        return _current.set(self)
+
+    @staticmethod
+    def deactivate(token):
+        _current.reset(token)
+
+    def server_timing(self, total):
+        """Value of the Server-Timing response header (durations in ms)."""
+        return (
+            f"app;dur={total * 1000:.1f}, "
+            f'db;dur={self.db_time * 1000:.1f};desc="{self.db_queries} queries", '
+            f"serializer;dur={self.serializer_time * 1000:.1f}"
+        )
+
+
+def current():
+    return _current.get()
+
+
+def query_timer(execute, sql, params, many, context):
+    """
+    Execute wrapper installed on every DB connection (install_query_timer)
+    that counts and times queries for the current request. The request is
+    found through a context variable, so queries made by async views (which
+    run in asgiref's sync thread, on another connection) are counted too.
+    """
+    timings = _current.get()
+    if timings is None:
+        return execute(sql, params, many, context)
+    start = time.perf_counter()
+    try:
+        return execute(sql, params, many, context)
+    finally:
+        duration = time.perf_counter() - start
+        timings.db_queries += 1
+        timings.db_time += duration
+        if duration * 1000 >= settings.METRICS_SLOW_QUERY_MS:
+            timings.slow_queries += 1
+            slow_query_logger.warning(
+                "Slow query (%.1f ms) on %s: %s", duration * 1000, timings.route, sql
+            )
+
+
+def install_query_timer(sender, connection, **kwargs):
+    """connection_created handler (see CoreConfig.ready)."""
+    if query_timer not in connection.execute_wrappers:
+        connection.execute_wrappers.append(query_timer)
+
+
+class _Route:
+    __slots__ = ("requests", "buckets", "duration", "db_queries", "db_time", "serializer_time", "slow_queries")
+
+    def __init__(self):
+        self.requests = defaultdict(int)  # status code -> count
+        self.buckets = [0] * len(DURATION_BUCKETS)
+        self.duration = 0.0
+        self.db_queries = 0
+        self.db_time = 0.0
+        self.serializer_time = 0.0
+        self.slow_queries = 0
+
+
+class MetricsRegistry:
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self.reset()
+
+    def reset(self):
+        with self._lock:
+            self._routes = defaultdict(_Route)
+
+    def observe(self, method, status, timings, duration):
+        with self._lock:
+            route = self._routes[(timings.route, method)]
+            route.requests[status] += 1
+            for i, bound in enumerate(DURATION_BUCKETS):
+                if duration <= bound:
+                    route.buckets[i] += 1
+            route.duration += duration
+            route.db_queries += timings.db_queries
+            route.db_time += timings.db_time
+            route.serializer_time += timings.serializer_time
+            route.slow_queries += timings.slow_queries
+
+    def snapshot(self):
+        """{(route, method): {"requests": {status: n}, "count", "duration", ...}}."""
+        with self._lock:
+            return {
+                key: {
+                    "requests": dict(route.requests),
+                    "count": sum(route.requests.values()),
+                    "buckets": list(route.buckets),
+                    "duration": route.duration,
+                    "db_queries": route.db_queries,
+                    "db_time": route.db_time,
+                    "serializer_time": route.serializer_time,
+                    "slow_queries": route.slow_queries,
+                }
+                for key, route in self._routes.items()
+            }
+
+    def render_prometheus(self):
+        lines = []
+
+        def family(name, kind, help_text):
+            lines.append(f"# HELP {name} {help_text}")
+            lines.append(f"# TYPE {name} {kind}")
+
+        routes = sorted(self.snapshot().items())
+
+        family("memorise_http_requests_total", "counter", "Requests served, by route, method and status.")
+        for (route, method), data in routes:
+            for status_code, count in sorted(data["requests"].items()):
+                lines.append(
+                    f'memorise_http_requests_total{{{_labels(route, method)},status="{status_code}"}} {count}'
+                )
+
+        family("memorise_http_request_duration_seconds", "histogram", "Wall time per request.")
+        for (route, method), data in routes:
+            labels = _labels(route, method)
+            for bound, count in zip(DURATION_BUCKETS, data["buckets"]):
+                lines.append(f'memorise_http_request_duration_seconds_bucket{{{labels},le="{bound}"}} {count}')
+            lines.append(f'memorise_http_request_duration_seconds_bucket{{{labels},le="+Inf"}} {data["count"]}')
+            lines.append(f'memorise_http_request_duration_seconds_sum{{{labels}}} {data["duration"]:.6f}')
+            lines.append(f'memorise_http_request_duration_seconds_count{{{labels}}} {data["count"]}')
+
+        for name, key, help_text, fmt in (
+            ("memorise_db_queries_total", "db_queries", "Database queries executed.", "{}"),
+            ("memorise_db_query_seconds_total", "db_time", "Time spent in database queries.", "{:.6f}"),
+            ("memorise_serializer_seconds_total", "serializer_time", "Time spent validating and serializing.", "{:.6f}"),
+            ("memorise_db_slow_queries_total", "slow_queries", "Queries above METRICS_SLOW_QUERY_MS.", "{}"),
+        ):
+            family(name, "counter", help_text)
+            for (route, method), data in routes:
+                lines.append(f"{name}{{{_labels(route, method)}}} {fmt.format(data[key])}")
+
+        return "\n".join(lines) + "\n"
+
+
+def _escape(value):
+    return str(value).replace("\\", "\\\\").replace('"', '\\"').replace("\n", "\\n")
+
+
+def worker_label():
+    """Label of the process whose counters are rendered (see the module docstring)."""
+    # Read at render time: workers are forked from a preloaded master
+    return f'worker="{os.getpid()}"'
+
+
+def _labels(route, method):
+    return f'route="{_escape(route)}",method="{_escape(method)}",{worker_label()}'
+
+
+registry = MetricsRegistry()
+
+
+class TimedSerializerMixin:
+    """
+    Adds validation (run_validation) and output (to_representation) of the
+    serializer to the current request's serializer time. Mixed into the
+    project's serializers (core/serializer.py); with many=True the list
+    serializer calls these per item. Nested calls are counted once.
+    """
+
+    def run_validation(self, *args, **kwargs):
+        return _timed(super().run_validation, *args, **kwargs)
+
+    def to_representation(self, *args, **kwargs):
+        return _timed(super().to_representation, *args, **kwargs)
+
+
+def _timed(method, *args, **kwargs):
+    timings = _current.get()
+    if timings is None or timings._serializer_depth:
+        # No request, or nested inside an already timed call
+        return method(*args, **kwargs)
+    timings._serializer_depth += 1
+    start = time.perf_counter()
+    try:
+        return method(*args, **kwargs)
+    finally:
+        timings._serializer_depth -= 1
+        timings.serializer_time += time.perf_counter() - start
@@ -0,0 +1,158 @@
+from urllib.parse import urlsplit
+
+from asgiref.sync import iscoroutinefunction, markcoroutinefunction, sync_to_async
+from django.conf import settings
+from django.http import Http404
+
+from . import files, metrics
+
+
+class RequestMetricsMiddleware:
+    """
+    Records route, wall time, DB query count/time and serializer time of
+    every request into metrics.registry, and reports them to the client in
+    a Server-Timing header. Goes first in MIDDLEWARE so the timings cover
+    the rest of the stack. Works natively under WSGI and ASGI.
+
+    Streaming responses (NDJSON, exports, files) are recorded when their
+    body has been sent or the client went away, and the queries made while
+    producing it count towards the request; their Server-Timing header can
+    only cover the time to the headers.
+    """
+    sync_capable = True
+    async_capable = True
+
+    def __init__(self, get_response):
+        self.get_response = get_response
+        self.is_async = iscoroutinefunction(get_response)
+        if self.is_async:
+            markcoroutinefunction(self)
+
+    def __call__(self, request):
+        if self.is_async:
+            return self.__acall__(request)
+        if not settings.METRICS_ENABLED:
+            return self.get_response(request)
+
+        timings = metrics.RequestTimings()
+        token = timings.activate()
+        try:
+            response = self.get_response(request)
+        finally:
+            metrics.RequestTimings.deactivate(token)
+        return self._record(request, response, timings)
+
+    async def __acall__(self, request):
+        if not settings.METRICS_ENABLED:
+            return await self.get_response(request)
+
+        timings = metrics.RequestTimings()
+        token = timings.activate()
+        try:
+            response = await self.get_response(request)
+        finally:
+            metrics.RequestTimings.deactivate(token)
+        return self._record(request, response, timings)
+
+    def _record(self, request, response, timings):
+        if settings.METRICS_SERVER_TIMING:
+            response["Server-Timing"] = timings.server_timing(timings.elapsed)
+        if not response.streaming:
+            metrics.registry.observe(request.method, response.status_code, timings, timings.elapsed)
+            return response
+
+        def observe():
+            metrics.registry.observe(request.method, response.status_code, timings, timings.elapsed)
+
+        if response.is_async:
+            response.streaming_content = _astream(response.streaming_content, timings, observe)
+        else:
+            response.streaming_content = _stream(response.streaming_content, timings, observe)
+        return response
+
+    def process_view(self, request, view_func, view_args, view_kwargs):
+        # Known once the URL is resolved; used as the metrics label
+        timings = metrics.current()
+        if timings is not None:
+            match = request.resolver_match
+            timings.route = match.view_name or match.route
+        return None
+
+
+def _stream(content, timings, observe):
+    """Iterates `content` with `timings` active, then calls observe()."""
+    content = iter(content)
+    try:
+        while True:
+            token = timings.activate()
+            try:
+                chunk = next(content)
+            except StopIteration:
+                return
+            finally:
+                metrics.RequestTimings.deactivate(token)
+            yield chunk
+    finally:
+        # Also runs when the server closes the response early (client gone)
+        observe()
+
+
+async def _astream(content, timings, observe):
+    """_stream() for async iterators."""
+    content = aiter(content)
+    try:
+        while True:
+            token = timings.activate()
+            try:
+                chunk = await anext(content)
+            except StopAsyncIteration:
+                return
+            finally:
+                metrics.RequestTimings.deactivate(token)
+            yield chunk
+    finally:
+        observe()
+
+
+class StaticFilesMiddleware:
+    """
+    Serves STATIC_URL from STATIC_ROOT and MEDIA_URL from MEDIA_ROOT
+    (core/files.py) without going through sessions, auth or URL routing.
+    Goes right after RequestMetricsMiddleware; missing files fall through to
+    the URLconf (the DEBUG media route, or a 404).
+    """
+    sync_capable = True
+    async_capable = True
+
+    def __init__(self, get_response):
+        self.get_response = get_response
+        self.is_async = iscoroutinefunction(get_response)
+        if self.is_async:
+            markcoroutinefunction(self)
+        self.mounts = []
+        if settings.SERVE_STATIC and settings.STATIC_ROOT:
+            self.mounts.append((urlsplit(settings.STATIC_URL).path, settings.STATIC_ROOT, True, settings.STATIC_MAX_AGE))
+        if settings.SERVE_MEDIA and settings.MEDIA_ROOT:
+            self.mounts.append((urlsplit(settings.MEDIA_URL).path, settings.MEDIA_ROOT, False, settings.MEDIA_MAX_AGE))
+
+    def _serve(self, request):
+        for prefix, root, static, max_age in self.mounts:
+            if request.path_info.startswith(prefix):
+                timings = metrics.current()
+                if timings is not None:
+                    timings.route = "static" if static else "media"
+                try:
+                    return files.serve(request, root, request.path_info[len(prefix):], static=static, max_age=max_age)
+                except Http404:
+                    return None
+        return None
+
+    def __call__(self, request):
+        if self.is_async:
+            return self.__acall__(request)
+        return self._serve(request) or self.get_response(request)
+
+    async def __acall__(self, request):
+        if not any(request.path_info.startswith(mount[0]) for mount in self.mounts):
+            return await self.get_response(request)
+        return await sync_to_async(self._serve)(request) or await self.get_response(request)
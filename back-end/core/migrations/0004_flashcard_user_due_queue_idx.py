@@ -0,0 +1,38 @@
+import django.db.models.deletion
+from django.conf import settings
+from django.db import migrations, models
+from django.db.models import OuterRef, Subquery
+
+
+def backfill_flashcard_user(apps, schema_editor):
+    Deck = apps.get_model("core", "Deck")
+    Flashcard = apps.get_model("core", "Flashcard")
+    Flashcard.objects.filter(user__isnull=True).update(
+        user_id=Subquery(Deck.objects.filter(pk=OuterRef("deck_id")).values("user_id")[:1])
+    )
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('core', '0003_flashcard'),
+        migrations.swappable_dependency(settings.AUTH_USER_MODEL),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='flashcard',
+            name='user',
+            field=models.ForeignKey(editable=False, null=True, on_delete=django.db.models.deletion.CASCADE, related_name='flashcards', to=settings.AUTH_USER_MODEL),
+        ),
+        migrations.RunPython(backfill_flashcard_user, migrations.RunPython.noop),
+        migrations.AlterField(
+            model_name='flashcard',
+            name='user',
+            field=models.ForeignKey(editable=False, on_delete=django.db.models.deletion.CASCADE, related_name='flashcards', to=settings.AUTH_USER_MODEL),
+        ),
+        migrations.AddIndex(
+            model_name='flashcard',
+            index=models.Index(fields=['user', 'status', 'due_date'], name='flashcard_due_queue_idx'),
+        ),
+    ]
@@ -0,0 +1,47 @@
+# Generated by Django 5.2.6 on 2026-10-18 17:39
+
+import django.db.models.deletion
+from django.db import migrations, models
+from django.db.models import Count, Q
+
+
+def backfill_deck_counters(apps, schema_editor):
+    Deck = apps.get_model("core", "Deck")
+    DeckCounter = apps.get_model("core", "DeckCounter")
+    decks = Deck.objects.annotate(
+        total=Count("flashcards"),
+        **{
+            status: Count("flashcards", filter=Q(flashcards__status=status))
+            for status in ("new", "learning", "review", "lapsed")
+        },
+    ).values("id", "total", "new", "learning", "review", "lapsed")
+    DeckCounter.objects.bulk_create(
+        [DeckCounter(deck_id=deck.pop("id"), **deck) for deck in decks],
+        batch_size=1000,
+    )
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('core', '0004_flashcard_user_due_queue_idx'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='DeckCounter',
+            fields=[
+                ('deck', models.OneToOneField(on_delete=django.db.models.deletion.CASCADE, primary_key=True, related_name='counters', serialize=False, to='core.deck')),
+                ('total', models.IntegerField(default=0)),
+                ('new', models.IntegerField(default=0)),
+                ('learning', models.IntegerField(default=0)),
+                ('review', models.IntegerField(default=0)),
+                ('lapsed', models.IntegerField(default=0)),
+            ],
+        ),
+        migrations.AddIndex(
+            model_name='flashcard',
+            index=models.Index(fields=['deck', 'status', 'due_date'], name='flashcard_deck_due_idx'),
+        ),
+        migrations.RunPython(backfill_deck_counters, migrations.RunPython.noop),
+    ]
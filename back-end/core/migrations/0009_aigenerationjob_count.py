@@ -0,0 +1,18 @@
+# Generated by Django 5.2.6 on 2026-10-18 17:48
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('core', '0008_airesponsecache'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='aigenerationjob',
+            name='count',
+            field=models.PositiveSmallIntegerField(default=3),
+        ),
+    ]
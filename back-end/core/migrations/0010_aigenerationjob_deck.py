@@ -0,0 +1,19 @@
+# Generated by Django 5.2.6 on 2026-10-18 17:53
+
+import django.db.models.deletion
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('core', '0009_aigenerationjob_count'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='aigenerationjob',
+            name='deck',
+            field=models.ForeignKey(blank=True, null=True, on_delete=django.db.models.deletion.SET_NULL, related_name='ai_jobs', to='core.deck'),
+        ),
+    ]
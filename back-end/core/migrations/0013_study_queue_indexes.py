@@ -0,0 +1,25 @@
+# Generated by Django 5.2.6 on 2026-10-18 19:26
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('core', '0012_forecastversion'),
+    ]
+
+    operations = [
+        migrations.RemoveIndex(
+            model_name='flashcard',
+            name='flashcard_due_queue_idx',
+        ),
+        migrations.AddIndex(
+            model_name='flashcard',
+            index=models.Index(fields=['user', 'status', 'id'], name='flashcard_new_queue_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='flashcard',
+            index=models.Index(fields=['user', 'status', 'due_date', 'id'], name='flashcard_due_queue_idx'),
+        ),
+    ]
@@ -0,0 +1,18 @@
+# Generated by Django 5.2.6 on 2026-10-18 19:52
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('core', '0013_study_queue_indexes'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='deckcounter',
+            name='updated_at',
+            field=models.DateTimeField(auto_now=True),
+        ),
+    ]
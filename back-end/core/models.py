@@ -4,6 +4,7 @@ from django.utils import timezone
 from decimal import Decimal
 from django.core.validators import MinValueValidator, MaxValueValidator
 from django.conf import settings
+import uuid
 
 #Custom UserManager
 class UserManager(BaseUserManager):
@@ -40,6 +41,8 @@ class User(AbstractBaseUser,PermissionsMixin):
         blank=True,
         null=True
     )
+    # 🖼️ {"<size>": storage name} of the WebP thumbnails (core/services/profile_pictures.py)
+    profile_thumbnails = models.JSONField(default=dict, blank=True, editable=False)
 
     base_ease_factor = models.DecimalField(
         max_digits=3,
@@ -122,6 +125,8 @@ class Flashcard(models.Model):
 
     Fields:
     - deck: Foreign key to the Deck this flashcard belongs to.
+    - user: Owner of the deck, denormalized so the study queue can be
+      filtered and indexed without joining through Deck.
     - front: Text for the question/prompt.
     - back: Text for the answer/solution.
     - created_at / updated_at: Auto-managed timestamps.
@@ -146,6 +151,14 @@ class Flashcard(models.Model):
         related_name="flashcards"
     )
 
+    # 👤 Denormalized deck owner (always equal to deck.user)
+    user = models.ForeignKey(
+        settings.AUTH_USER_MODEL,
+        on_delete=models.CASCADE,
+        related_name="flashcards",
+        editable=False
+    )
+
     front = models.TextField(null=False)   # Question / prompt
     back = models.TextField(null=False)    # Answer / solution
 
@@ -174,5 +187,169 @@ class Flashcard(models.Model):
         default=Status.NEW
     )
 
+    class Meta:
+        indexes = [
+            # Cover the study queue (services.flashcards.due_queue), one range per part:
+            # WHERE user = ? AND status = 'new' ORDER BY id
+            models.Index(fields=["user", "status", "id"], name="flashcard_new_queue_idx"),
+            # WHERE user = ? AND status = ? AND due_date <= ? ORDER BY due_date, id
+            models.Index(fields=["user", "status", "due_date", "id"], name="flashcard_due_queue_idx"),
+            # Covers per-deck "due now" counts
+            models.Index(fields=["deck", "status", "due_date"], name="flashcard_deck_due_idx"),
+        ]
+
+    def save(self, *args, **kwargs):
+        # Keep the denormalized owner in sync with the deck
+        deck_field = self._meta.get_field("deck")
+        if self.deck_id is not None and (self.user_id is None or deck_field.is_cached(self)):
+            self.user_id = self.deck.user_id
+        super().save(*args, **kwargs)
+
+    def __str__(self):
+        return f"{self.front[:30]}..."
+
+
+class DeckCounter(models.Model):
+    """
+    Materialized per-deck card counts by status.
+
+    Created with the deck and maintained incrementally through model signals
+    (see core/services/deck_counters.py) whenever flashcards are created,
+    reviewed, moved or deleted, so the deck list can
+    read counts in O(decks) instead of counting every card. "Due now" depends
+    on the current time, so it is never materialized.
+    """
+    deck = models.OneToOneField(
+        "Deck",
+        on_delete=models.CASCADE,
+        primary_key=True,
+        related_name="counters"
+    )
+
+    total = models.IntegerField(default=0)
+    new = models.IntegerField(default=0)
+    learning = models.IntegerField(default=0)
+    review = models.IntegerField(default=0)
+    lapsed = models.IntegerField(default=0)
+    # Moves with the counts, so delta sync knows to re-send the deck
+    updated_at = models.DateTimeField(auto_now=True)
+
+    def __str__(self):
+        return f"Counters for deck {self.deck_id}"
+
+
+class ForecastVersion(models.Model):
+    """
+    Version of a user's workload forecast, bumped whenever their cards change
+    (core/services/forecast.py). Every worker reads it, so a review written
+    through one worker invalidates the forecasts cached by all of them.
+    """
+    user = models.OneToOneField(
+        "User",
+        on_delete=models.CASCADE,
+        primary_key=True,
+        related_name="forecast_version"
+    )
+
+    version = models.PositiveBigIntegerField(default=0)
+
+    def __str__(self):
+        return f"Forecast version {self.version} of user {self.user_id}"
+
+
+class Tombstone(models.Model):
+    """
+    Records a deleted deck or flashcard so delta sync clients
+    (GET /api/sync/) can drop it from their local cache.
+    """
+
+    class Kind(models.TextChoices):
+        DECK = "deck", "Deck"
+        FLASHCARD = "flashcard", "Flashcard"
+
+    user = models.ForeignKey(
+        settings.AUTH_USER_MODEL,
+        on_delete=models.CASCADE,
+        related_name="tombstones"
+    )
+    kind = models.CharField(max_length=20, choices=Kind.choices)
+    object_id = models.BigIntegerField()
+    deleted_at = models.DateTimeField(default=timezone.now)
+
+    class Meta:
+        indexes = [
+            models.Index(fields=["user", "deleted_at"], name="tombstone_sync_idx"),
+        ]
+
+    def __str__(self):
+        return f"{self.kind} {self.object_id} deleted"
+
+
+class AIGenerationJob(models.Model):
+    """
+    Queued AI flashcard generation request.
+
+    The table doubles as the job queue: the POST endpoint inserts a PENDING
+    row and a worker thread claims it (PENDING -> RUNNING with a conditional
+    UPDATE), calls the LLM and stores the cards or the error. When `deck` is
+    set, the cards are also inserted into that deck.
+    """
+
+    class Status(models.TextChoices):
+        PENDING = "pending", "Pending"
+        RUNNING = "running", "Running"
+        SUCCEEDED = "succeeded", "Succeeded"
+        FAILED = "failed", "Failed"
+
+    id = models.UUIDField(primary_key=True, default=uuid.uuid4, editable=False)
+
+    user = models.ForeignKey(
+        settings.AUTH_USER_MODEL,
+        on_delete=models.CASCADE,
+        related_name="ai_jobs"
+    )
+
+    # Optional target deck: the generated cards are saved into it
+    deck = models.ForeignKey(
+        "Deck",
+        on_delete=models.SET_NULL,
+        null=True,
+        blank=True,
+        related_name="ai_jobs"
+    )
+
+    text = models.TextField()
+    count = models.PositiveSmallIntegerField(default=3)  # requested number of cards
+    status = models.CharField(max_length=20, choices=Status.choices, default=Status.PENDING)
+    result = models.JSONField(null=True, blank=True)
+    error = models.TextField(blank=True, default="")
+
+    created_at = models.DateTimeField(auto_now_add=True)
+    started_at = models.DateTimeField(null=True, blank=True)
+    finished_at = models.DateTimeField(null=True, blank=True)
+
+    class Meta:
+        indexes = [
+            # Workers pick the oldest pending job
+            models.Index(fields=["status", "created_at"], name="ai_job_queue_idx"),
+        ]
+
+    def __str__(self):
+        return f"AI job {self.id} ({self.status})"
+
+
+class AIResponseCache(models.Model):
+    """
+    Persistent tier of the AI response cache (see core/services/ai_cache.py).
+    `key` is a SHA-256 of the normalized text, model, prompt version and temperature.
+    """
+    key = models.CharField(max_length=64, primary_key=True)
+    response = models.TextField()
+
+    created_at = models.DateTimeField(auto_now_add=True)
+    last_used_at = models.DateTimeField(default=timezone.now, db_index=True)
+    expires_at = models.DateTimeField(db_index=True)
+    hits = models.IntegerField(default=0)
+
     def __str__(self):
-        return f"{self.front[:30]}..."
\ No newline at end of file
+        return self.key
@@ -0,0 +1,117 @@
+import base64
+import heapq
+import itertools
+import json
+
+from django.db.models import Q
+from django.utils.dateparse import parse_datetime
+from rest_framework.exceptions import ValidationError
+from rest_framework.pagination import CursorPagination
+
+from .models import Flashcard
+
+
+class UpdatedAtCursorPagination(CursorPagination):
+    """
+    Cursor pagination for the flashcard lists, ordered by (updated_at, id),
+    so pages stay stable while cards are being edited.
+    """
+
+    ordering = ("updated_at", "id")
+    page_size = 100
+    page_size_query_param = "page_size"
+    max_page_size = 500
+
+
+class DueQueueKeyset:
+    """
+    Keyset (seek) pagination over the study queue of services.flashcards.due_queue:
+    new cards by id, then the due learning/review cards by (due_date, id).
+
+    One ORDER BY over "new OR due" matches no index, so every batch would
+    sort the user's whole queue. Each part is read on its own instead, in the
+    order of its index and limited to one batch, and the two due parts are
+    merged here: a batch costs at most three index range scans. The cursor is
+    an opaque base64 token holding the (due_date, id) of the last card of a
+    batch; due_date is null while the batch ended among the new cards.
+    """
+
+    default_limit = 50
+    max_limit = 200
+
+    @staticmethod
+    def params(request):
+        # DRF Request (query_params) or plain HttpRequest (async views)
+        return getattr(request, "query_params", request.GET)
+
+    def get_limit(self, request):
+        raw = self.params(request).get("limit")
+        if raw is None:
+            return self.default_limit
+        try:
+            limit = int(raw)
+        except ValueError:
+            raise ValidationError({"limit": "Must be an integer."})
+        return max(1, min(limit, self.max_limit))
+
+    def encode_cursor(self, card):
+        payload = {
+            "d": None if card.status == Flashcard.Status.NEW else card.due_date.isoformat(),
+            "id": card.id,
+        }
+        return base64.urlsafe_b64encode(json.dumps(payload).encode()).decode()
+
+    def decode_cursor(self, token):
+        try:
+            payload = json.loads(base64.urlsafe_b64decode(token.encode()))
+            due_date = parse_datetime(payload["d"]) if payload["d"] else None
+            return due_date, int(payload["id"])
+        except (ValueError, KeyError, TypeError):
+            raise ValidationError({"cursor": "Invalid cursor."})
+
+    def page_querysets(self, queue, request):
+        """
+        (new, [due...], limit): querysets of up to limit + 1 cards after the
+        cursor, one per part of the queue; `new` is None once the cursor is
+        past the new cards.
+        """
+        new, due = queue
+        limit = self.get_limit(request)
+        token = self.params(request).get("cursor")
+        due_date, last_id = self.decode_cursor(token) if token else (None, None)
+
+        if due_date is None:
+            if last_id is not None:
+                new = new.filter(id__gt=last_id)
+            new = new.order_by("id")[:limit + 1]
+            after = Q()
+        else:
+            new = None
+            after = Q(due_date__gt=due_date) | Q(due_date=due_date, id__gt=last_id)
+        due = [part.filter(after).order_by("due_date", "id")[:limit + 1] for part in due]
+        return new, due, limit
+
+    def split(self, new, due, limit):
+        """(first `limit` cards of the read parts, next cursor or None)."""
+        due = heapq.merge(*due, key=lambda card: (card.due_date, card.id))
+        cards = list(itertools.islice(itertools.chain(new, due), limit + 1))
+        next_cursor = None
+        if len(cards) > limit:
+            cards = cards[:limit]
+            next_cursor = self.encode_cursor(cards[-1])
+        return cards, next_cursor
+
+    def paginate(self, queue, request):
+        """
+        Returns (cards, next_cursor). Reads limit + 1 rows per part to know
+        whether another batch exists without a COUNT query.
+        """
+        new, due, limit = self.page_querysets(queue, request)
+        new = list(new) if new is not None else []
+        return self.split(new, [list(part) for part in due], limit)
+
+    async def apaginate(self, queue, request):
+        """paginate() with the async ORM."""
+        new, due, limit = self.page_querysets(queue, request)
+        new = [card async for card in new] if new is not None else []
+        return self.split(new, [[card async for card in part] for part in due], limit)
@@ -0,0 +1,11 @@
+from .engine import (
+    AGAIN,
+    ANSWERS,
+    EASY,
+    GOOD,
+    CardState,
+    ScheduledStates,
+    next_state,
+    next_states,
+)
+from .cards import apply_review, apply_reviews, state_from_card
@@ -0,0 +1,75 @@
+"""
+Bridge between the pure engine and Flashcard instances.
+"""
+from collections import defaultdict
+from datetime import timedelta
+from decimal import Decimal
+
+from .engine import next_state, next_states
+
+
+def state_from_card(flashcard):
+    return (
+        flashcard.interval,
+        float(flashcard.ease_factor),
+        flashcard.streak,
+        flashcard.lapses,
+        flashcard.status,
+    )
+
+
+def _to_decimal(ease_factor):
+    return Decimal(f"{float(ease_factor):.2f}")
+
+
+def _store(flashcard, interval, ease_factor, streak, lapses, status, due_in_minutes, now):
+    flashcard.interval = int(interval)
+    flashcard.ease_factor = _to_decimal(ease_factor)
+    flashcard.streak = int(streak)
+    flashcard.lapses = int(lapses)
+    flashcard.status = str(status)
+    flashcard.due_date = now + timedelta(minutes=int(due_in_minutes))
+    flashcard.last_reviewed = now
+
+
+def apply_review(flashcard, answer, now):
+    """
+    Applies one answer ("again" | "good" | "easy") to the flashcard in memory,
+    without saving it.
+    """
+    new, due_in = next_state(state_from_card(flashcard), answer)
+    _store(flashcard, *new, due_in, now)
+    return flashcard
+
+
+def apply_reviews(reviews):
+    """
+    Applies many (flashcard, answer, reviewed_at) reviews in memory with the
+    batch engine, without saving.
+
+    A card reviewed several times is processed in successive rounds (first
+    answer of every card, then the second, ...) so answers stay in order.
+    """
+    rounds = defaultdict(list)
+    seen = defaultdict(int)
+    for review in reviews:
+        flashcard = review[0]
+        rounds[seen[id(flashcard)]].append(review)
+        seen[id(flashcard)] += 1
+
+    for position in sorted(rounds):
+        batch = rounds[position]
+        states = [state_from_card(flashcard) for flashcard, _, _ in batch]
+        result = next_states(*zip(*states), [answer for _, answer, _ in batch])
+        for i, (flashcard, _, now) in enumerate(batch):
+            _store(
+                flashcard,
+                result.interval[i],
+                result.ease_factor[i],
+                result.streak[i],
+                result.lapses[i],
+                result.status[i],
+                result.due_in_minutes[i],
+                now,
+            )
+    return [flashcard for flashcard, _, _ in reviews]
@@ -0,0 +1,132 @@
+"""
+Pure spaced-repetition engine.
+
+Works on plain values (no models, no Decimal) so the same rules can be used by
+the review endpoints, batch ingestion, forecasts and rescheduling jobs.
+
+A card state is (interval, ease_factor, streak, lapses, status):
+- interval: days until the next review
+- ease_factor: growth multiplier, kept at 2 decimals
+- streak / lapses: consecutive correct answers / times forgotten
+- status: "new" | "learning" | "review" | "lapsed"
+
+`next_state` handles one card; `next_states` handles thousands of cards in one
+call with NumPy.
+"""
+from typing import NamedTuple, Sequence
+
+import numpy as np
+
+AGAIN = "again"
+GOOD = "good"
+EASY = "easy"
+ANSWERS = (AGAIN, GOOD, EASY)
+
+# Default algorithm parameters (the historical MemoRise rules)
+MIN_EASE = 1.3
+AGAIN_EASE_PENALTY = 0.2
+GOOD_EASE_BONUS = 0.05
+GOOD_MAX_EASE = 2.5
+EASY_EASE_BONUS = 0.15
+EASY_MAX_EASE = 3.0
+EASY_INTERVAL_BONUS = 1.5
+AGAIN_DELAY_MINUTES = 10
+MINUTES_PER_DAY = 24 * 60
+
+
+class CardState(NamedTuple):
+    interval: int
+    ease_factor: float
+    streak: int
+    lapses: int
+    status: str
+
+
+class ScheduledStates(NamedTuple):
+    """Column-oriented result of `next_states` (NumPy arrays)."""
+    interval: Sequence
+    ease_factor: Sequence
+    streak: Sequence
+    lapses: Sequence
+    status: Sequence
+    due_in_minutes: Sequence
+
+
+def next_state(state, answer):
+    """
+    Returns (CardState, due_in_minutes) after answering `answer` on `state`.
+    """
+    interval, ease, streak, lapses, status = state
+
+    if answer == AGAIN:
+        new = CardState(
+            interval=1,
+            ease_factor=round(max(MIN_EASE, ease - AGAIN_EASE_PENALTY), 2),
+            streak=0,
+            lapses=lapses + 1,
+            status="learning",
+        )
+        return new, AGAIN_DELAY_MINUTES
+
+    if answer == GOOD:
+        new_interval = max(1, int(interval * ease))
+        new_ease = min(GOOD_MAX_EASE, ease + GOOD_EASE_BONUS)
+    elif answer == EASY:
+        new_interval = max(1, int(interval * ease * EASY_INTERVAL_BONUS))
+        new_ease = min(EASY_MAX_EASE, ease + EASY_EASE_BONUS)
+    else:
+        raise ValueError(f"Unknown answer: {answer!r}")
+
+    new = CardState(
+        interval=new_interval,
+        ease_factor=round(new_ease, 2),
+        streak=streak + 1,
+        lapses=lapses,
+        status="review",
+    )
+    return new, new_interval * MINUTES_PER_DAY
+
+
+def next_states(intervals, ease_factors, streaks, lapses, statuses, answers):
+    """
+    Batch version of `next_state` over parallel sequences (one entry per card).
+
+    Returns a ScheduledStates whose columns are NumPy arrays, with the same
+    values `next_state` gives card by card.
+    """
+    interval = np.asarray(intervals, dtype=np.int64)
+    ease = np.asarray(ease_factors, dtype=np.float64)
+    streak = np.asarray(streaks, dtype=np.int64)
+    lapse = np.asarray(lapses, dtype=np.int64)
+    answer = np.asarray(answers, dtype=object)
+
+    again = answer == AGAIN
+    good = answer == GOOD
+    easy = answer == EASY
+    if not (again | good | easy).all():
+        unknown = answer[~(again | good | easy)][0]
+        raise ValueError(f"Unknown answer: {unknown!r}")
+
+    # Same operation order as next_state so float results match bit for bit
+    good_interval = np.maximum(1, np.trunc(interval * ease).astype(np.int64))
+    easy_interval = np.maximum(1, np.trunc(interval * ease * EASY_INTERVAL_BONUS).astype(np.int64))
+    new_interval = np.where(again, 1, np.where(good, good_interval, easy_interval))
+
+    new_ease = np.where(
+        again,
+        np.maximum(MIN_EASE, ease - AGAIN_EASE_PENALTY),
+        np.where(
+            good,
+            np.minimum(GOOD_MAX_EASE, ease + GOOD_EASE_BONUS),
+            np.minimum(EASY_MAX_EASE, ease + EASY_EASE_BONUS),
+        ),
+    ).round(2)
+
+    return ScheduledStates(
+        interval=new_interval,
+        ease_factor=new_ease,
+        streak=np.where(again, 0, streak + 1),
+        lapses=np.where(again, lapse + 1, lapse),
+        status=np.where(again, "learning", "review").astype(object),
+        due_in_minutes=np.where(again, AGAIN_DELAY_MINUTES, new_interval * MINUTES_PER_DAY),
+    )
@@ -0,0 +1,134 @@
+"""
+OpenAPI schema, generated once per code version.
+
+drf-spectacular introspects every view and serializer to build the schema,
+which is far too slow to repeat on each Swagger UI load or client codegen
+run. `cache` keeps the generated document in memory and in
+OPENAPI_SCHEMA_DIR/openapi-<version>.json, where `manage.py build_schema`
+can also write it at deploy time, plus each rendering (YAML/JSON) with its
+ETag. The version is CODE_VERSION (e.g. the git commit) when configured,
+otherwise a hash of the project sources and of the Django, DRF and
+drf-spectacular versions, so any code change rebuilds the schema and nothing
+else does.
+"""
+import hashlib
+import json
+import logging
+import os
+import threading
+from functools import lru_cache
+from pathlib import Path
+
+import django
+import drf_spectacular
+import rest_framework
+from django.apps import apps
+from django.conf import settings
+from drf_spectacular.contrib.rest_framework_simplejwt import SimpleJWTScheme
+from drf_spectacular.renderers import OpenApiJsonRenderer
+from drf_spectacular.settings import spectacular_settings
+
+logger = logging.getLogger(__name__)
+
+PACKAGES = (django, rest_framework, drf_spectacular)
+
+
+class ClaimsJWTScheme(SimpleJWTScheme):
+    """Documents ClaimsJWTAuthentication as the usual Bearer JWT scheme."""
+    target_class = "core.authentication.ClaimsJWTAuthentication"
+
+
+@lru_cache(maxsize=None)
+def code_version():
+    if settings.CODE_VERSION:
+        return settings.CODE_VERSION[:40]
+    digest = hashlib.sha256()
+    for package in PACKAGES:
+        digest.update(f"{package.__name__}={package.__version__}\n".encode())
+
+    base = Path(settings.BASE_DIR).resolve()
+    roots = {base / settings.ROOT_URLCONF.split(".")[0]}
+    roots.update(Path(app.path) for app in apps.get_app_configs() if Path(app.path).is_relative_to(base))
+    for root in sorted(roots):
+        for path in sorted(root.rglob("*.py")):
+            if "tests" in path.relative_to(root).parts:
+                continue
+            digest.update(str(path.relative_to(base)).encode())
+            digest.update(path.read_bytes())
+    return digest.hexdigest()[:16]
+
+
+def schema_path(version):
+    return Path(settings.OPENAPI_SCHEMA_DIR) / f"openapi-{version}.json"
+
+
+def generate():
+    """The schema as plain JSON data (what SpectacularAPIView would serve)."""
+    generator = spectacular_settings.DEFAULT_GENERATOR_CLASS()
+    schema = generator.get_schema(request=None, public=True)
+    # Round trip through the renderer: drops lazy strings and other non-JSON types
+    return json.loads(OpenApiJsonRenderer().render(schema))
+
+
+def write(schema, version):
+    """Stores the schema for `version` and removes the files of older versions."""
+    path = schema_path(version)
+    path.parent.mkdir(parents=True, exist_ok=True)
+    temporary = path.with_suffix(f".{os.getpid()}.tmp")
+    temporary.write_text(json.dumps(schema), encoding="utf-8")
+    os.replace(temporary, path)
+    for old in path.parent.glob("openapi-*.json"):
+        if old != path:
+            old.unlink(missing_ok=True)
+    return path
+
+
+def load(version):
+    try:
+        return json.loads(schema_path(version).read_text(encoding="utf-8"))
+    except (OSError, ValueError):
+        return None
+
+
+class SchemaCache:
+    """Per-process schema and renderings of the current code version."""
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self.clear()
+
+    def clear(self):
+        self._version = None
+        self._schema = None
+        self._rendered = {}  # media type -> (etag, body)
+
+    def schema(self):
+        version = code_version()
+        # One thread generates, the others wait for its result
+        with self._lock:
+            if self._version != version:
+                schema = load(version)
+                if schema is None:
+                    schema = generate()
+                    try:
+                        write(schema, version)
+                    except OSError:
+                        logger.warning("Could not store the OpenAPI schema in %s", settings.OPENAPI_SCHEMA_DIR)
+                self._version, self._schema, self._rendered = version, schema, {}
+            return self._schema
+
+    def rendered(self, renderer):
+        """(etag, body) of the schema rendered by a drf-spectacular renderer."""
+        schema = self.schema()
+        with self._lock:
+            entry = self._rendered.get(renderer.media_type)
+            if entry is None:
+                body = renderer.render(schema, renderer.media_type, {})
+                if isinstance(body, str):
+                    body = body.encode("utf-8")
+                entry = (f'"{self._version}-{hashlib.sha256(body).hexdigest()[:16]}"', body)
+                self._rendered[renderer.media_type] = entry
+            return entry
+
+
+cache = SchemaCache()
@@ -1,17 +1,29 @@
 from rest_framework import serializers
-from .models import User,Deck,Flashcard
+from .models import User,Deck,Flashcard,AIGenerationJob
+from .services.forecast import FORECAST_MODES, MAX_FORECAST_DAYS
+from .services.ai_service import DEFAULT_CARD_COUNT, MAX_CARD_COUNT, MAX_TEXT_CHARS
+from .services import profile_pictures
+
+from rest_framework_simplejwt.serializers import TokenObtainPairSerializer, TokenRefreshSerializer
+from .authentication import BlacklistRefreshToken, add_user_claims
+from .metrics import TimedSerializerMixin
 
-from rest_framework_simplejwt.serializers import TokenObtainPairSerializer
 from rest_framework.exceptions import PermissionDenied
+from django.utils import timezone
 
 
 #Creating a user serializer
-class PublicUserSerializer(serializers.ModelSerializer):
+class PublicUserSerializer(TimedSerializerMixin, serializers.ModelSerializer):
     confirm_password = serializers.CharField(write_only=True, required=True)
+    # 🖼️ {"original", "64", "256"}: thumbnails appear once generated
+    profile_picture_urls = serializers.SerializerMethodField()
 
     class Meta:
         model = User
-        fields = ['id', 'email', 'password', 'confirm_password' ,'username', 'profile_picture', 'base_ease_factor']
+        fields = [
+            'id', 'email', 'password', 'confirm_password', 'username',
+            'profile_picture', 'profile_picture_urls', 'base_ease_factor',
+        ]
         extra_kwargs = {
             'email': {'required': True},
             'username': {'required': True},
@@ -46,20 +58,44 @@ class PublicUserSerializer(serializers.ModelSerializer):
         return data
 
 
+    def validate_profile_picture(self, value):
+        if value:
+            profile_pictures.validate(value)
+        return value
+
+    def get_profile_picture_urls(self, user) -> dict[str, str]:
+        request = self.context.get("request")
+        urls = profile_pictures.picture_urls(user)
+        if request is None:
+            return urls
+        return {size: request.build_absolute_uri(url) for size, url in urls.items()}
+
     #We need override to use Django create_user method to hash the password
     def create(self, validated_data):
         validated_data.pop("confirm_password")
         email = validated_data.pop("email")
         password = validated_data.pop("password")
+        picture = validated_data.pop("profile_picture", None)
+        if picture:
+            # Stored under a content-hashed name; thumbnails are rendered after commit
+            validated_data["profile_picture"] = profile_pictures.store(picture)
         user = User.objects.create_user(
             email=email,
             password=password,
             **validated_data
         )
+        if picture:
+            profile_pictures.schedule_thumbnails(user)
         return user
     
-class CustomTokenObtainPairSerializer(TokenObtainPairSerializer):
+class CustomTokenObtainPairSerializer(TimedSerializerMixin, TokenObtainPairSerializer):
     username_field = "email"   # now it expects email
+    token_class = BlacklistRefreshToken
+
+    @classmethod
+    def get_token(cls, user):
+        # 🔑 Claims read by ClaimsJWTAuthentication instead of querying the user
+        return add_user_claims(super().get_token(user), user)
 
     def validate(self, attrs):
         data = super().validate(attrs)
@@ -69,10 +105,25 @@ class CustomTokenObtainPairSerializer(TokenObtainPairSerializer):
         }
         return data
 
-class DeckSerializer(serializers.ModelSerializer):
+
+class CustomTokenRefreshSerializer(TimedSerializerMixin, TokenRefreshSerializer):
+    # 🔄 Rotation blacklists through the in-memory front (SIMPLE_JWT["TOKEN_REFRESH_SERIALIZER"])
+    token_class = BlacklistRefreshToken
+
+class DeckSerializer(TimedSerializerMixin, serializers.ModelSerializer):
+    # 📊 Card counters, annotated by DeckViewSet.get_queryset (0 when absent, e.g. on create)
+    total = serializers.IntegerField(read_only=True, default=0)
+    new = serializers.IntegerField(read_only=True, default=0)
+    due_now = serializers.IntegerField(read_only=True, default=0)
+    learning = serializers.IntegerField(read_only=True, default=0)
+    lapsed = serializers.IntegerField(read_only=True, default=0)
+
     class Meta:
         model = Deck
-        fields = ["id", "title", "description", "color", "created_at", "updated_at"]
+        fields = [
+            "id", "title", "description", "color", "created_at", "updated_at",
+            "total", "new", "due_now", "learning", "lapsed",
+        ]
         read_only_fields = ["id","created_at","updated_at"]
     
     def create(self, validated_data):
@@ -84,7 +135,28 @@ class DeckSerializer(serializers.ModelSerializer):
         
         return super().create(validated_data)
     
-class FlashCardSerializer(serializers.ModelSerializer):
+class SparseFieldsMixin:
+    """
+    Lets GET requests ask for a subset of fields: ?fields=id,front,status.
+    Unknown names are ignored and "id" is always kept.
+    """
+
+    def __init__(self, *args, **kwargs):
+        super().__init__(*args, **kwargs)
+        request = self.context.get("request")
+        if request is None or request.method != "GET":
+            return
+
+        raw = request.query_params.get("fields")
+        if not raw:
+            return
+
+        wanted = {name.strip() for name in raw.split(",") if name.strip()} | {"id"}
+        for name in set(self.fields) - wanted:
+            self.fields.pop(name)
+
+
+class FlashCardSerializer(TimedSerializerMixin, SparseFieldsMixin, serializers.ModelSerializer):
     class Meta:
         model = Flashcard
         fields = [
@@ -125,10 +197,109 @@ class FlashCardSerializer(serializers.ModelSerializer):
 
         deck = validated_data["deck"]
 
-        if deck.user != user:
+        # Compare ids: deck.user would lazily load the owner row
+        if deck.user_id != user.id:
             raise PermissionDenied("You cannot add flashcards to this deck.")
 
         return super().create(validated_data)
     
-class FlashcardReviewSerializer(serializers.Serializer):
-    answer = serializers.ChoiceField(choices=["again", "good", "easy"])
\ No newline at end of file
+class FlashcardReviewSerializer(TimedSerializerMixin, serializers.Serializer):
+    answer = serializers.ChoiceField(choices=["again", "good", "easy"])
+
+class PerItemListSerializer(serializers.ListSerializer):
+    """
+    List serializer for batch endpoints.
+
+    Unlike the default ListSerializer, an invalid item does not reject the
+    whole batch: every item is validated on its own and `validated_data`
+    becomes a list of {"data": ..., "errors": ...} entries in request order.
+    """
+    max_items = 500
+    item_name = "item"
+
+    def to_internal_value(self, data):
+        if not isinstance(data, list):
+            raise serializers.ValidationError(f"Expected a list of {self.item_name}s.")
+        if not data:
+            raise serializers.ValidationError(f"At least one {self.item_name} is required.")
+        if len(data) > self.max_items:
+            raise serializers.ValidationError(f"At most {self.max_items} {self.item_name}s per batch.")
+
+        items = []
+        for item in data:
+            try:
+                items.append({"data": self.child.run_validation(item), "errors": None})
+            except serializers.ValidationError as exc:
+                items.append({"data": None, "errors": exc.detail})
+        return items
+
+
+class FlashcardReviewListSerializer(PerItemListSerializer):
+    """List variant used by the batch review endpoint."""
+    item_name = "review"
+
+
+class FlashcardReviewItemSerializer(FlashcardReviewSerializer):
+    """
+    One answer of an offline/batched study session:
+    {"id": <flashcard id>, "answer": "again" | "good" | "easy", "reviewed_at": <optional datetime>}
+    """
+    id = serializers.IntegerField()
+    reviewed_at = serializers.DateTimeField(required=False)
+
+    class Meta:
+        list_serializer_class = FlashcardReviewListSerializer
+
+    def validate_reviewed_at(self, value):
+        if value > timezone.now():
+            raise serializers.ValidationError("reviewed_at cannot be in the future.")
+        return value
+
+
+class ForecastQuerySerializer(TimedSerializerMixin, serializers.Serializer):
+    """
+    Query params of GET /api/flashcards/forecast/:
+    ?days=<1..365>&deck=<id>&mode=due|simulate
+    """
+    days = serializers.IntegerField(min_value=1, max_value=MAX_FORECAST_DAYS, default=30)
+    deck = serializers.IntegerField(required=False)
+    mode = serializers.ChoiceField(choices=FORECAST_MODES, default="due")
+
+
+class OwnedDeckField(serializers.PrimaryKeyRelatedField):
+    """Id of one of the requesting user's decks (context["request"].user)."""
+
+    def get_queryset(self):
+        return super().get_queryset().filter(user=self.context["request"].user)
+
+
+class AIGenerationRequestSerializer(TimedSerializerMixin, serializers.Serializer):
+    """
+    Body of POST /api/ai/flashcards/: {"text": "...", "count": 3, "deck"?: id}.
+    Long texts are split into chunks server-side; "deck" (validated as a Deck
+    of the requesting user) is where the cards get saved.
+    """
+    text = serializers.CharField(max_length=MAX_TEXT_CHARS, trim_whitespace=True)
+    count = serializers.IntegerField(min_value=1, max_value=MAX_CARD_COUNT, default=DEFAULT_CARD_COUNT)
+    deck = OwnedDeckField(queryset=Deck.objects.all(), required=False, allow_null=True)
+
+
+class AIGenerationJobSerializer(TimedSerializerMixin, serializers.ModelSerializer):
+    class Meta:
+        model = AIGenerationJob
+        fields = ["id", "status", "count", "deck", "result", "error", "created_at", "started_at", "finished_at"]
+        read_only_fields = fields
+
+
+class FlashcardImportListSerializer(PerItemListSerializer):
+    max_items = 1000
+    item_name = "row"
+
+
+class FlashcardImportRowSerializer(TimedSerializerMixin, serializers.Serializer):
+    """One imported row: {"front": "...", "back": "..."}."""
+    front = serializers.CharField(max_length=10_000)
+    back = serializers.CharField(max_length=10_000)
+
+    class Meta:
+        list_serializer_class = FlashcardImportListSerializer
@@ -0,0 +1,170 @@
+"""
+Content-addressed cache for LLM responses.
+
+The key is a SHA-256 of the normalized user text, the model name, the prompt
+version and the temperature, so the same notes pasted twice (or a retry after
+a timeout) never pay for a second completion, while any prompt or model change
+misses naturally.
+
+Two tiers:
+- memory: a per-process LRU with TTL (settings.AI_CACHE_MEMORY_SIZE entries)
+- database: AIResponseCache rows shared by every worker, with TTL; the least
+  recently used rows beyond AI_CACHE_DB_MAX_ENTRIES are dropped by `prune`.
+
+Only responses that parse into flashcards are stored.
+"""
+import hashlib
+import threading
+import time
+import unicodedata
+from collections import OrderedDict
+from datetime import timedelta
+
+from django.conf import settings
+from django.db.models import F
+from django.utils import timezone
+
+from ..models import AIResponseCache
+
+
+def normalize_text(text):
+    """NFC + collapsed whitespace, so cosmetic differences share a key."""
+    return " ".join(unicodedata.normalize("NFC", text).split())
+
+
+def cache_key(text, model, prompt_version, temperature):
+    raw = "\x1f".join([normalize_text(text), model, str(prompt_version), f"{temperature:.3f}"])
+    return hashlib.sha256(raw.encode("utf-8")).hexdigest()
+
+
+class LRUCache:
+    """Thread-safe in-process LRU cache with a per-entry TTL."""
+
+    def __init__(self, maxsize, ttl):
+        self.maxsize = maxsize
+        self.ttl = ttl
+        self._data = OrderedDict()
+        self._lock = threading.Lock()
+
+    def get(self, key):
+        with self._lock:
+            entry = self._data.get(key)
+            if entry is None:
+                return None
+            expires_at, value = entry
+            if expires_at <= time.monotonic():
+                del self._data[key]
+                return None
+            self._data.move_to_end(key)
+            return value
+
+    def set(self, key, value):
+        """Stores the value and returns how many entries were evicted."""
+        with self._lock:
+            self._data[key] = (time.monotonic() + self.ttl, value)
+            self._data.move_to_end(key)
+            evicted = 0
+            while len(self._data) > self.maxsize:
+                self._data.popitem(last=False)
+                evicted += 1
+            return evicted
+
+    def clear(self):
+        with self._lock:
+            self._data.clear()
+
+    def __len__(self):
+        return len(self._data)
+
+
+class CacheStats:
+    FIELDS = ("memory_hits", "db_hits", "misses", "stores", "evictions")
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self.reset()
+
+    def incr(self, name, amount=1):
+        with self._lock:
+            self._counts[name] += amount
+
+    def reset(self):
+        with self._lock:
+            self._counts = dict.fromkeys(self.FIELDS, 0)
+
+    def snapshot(self):
+        with self._lock:
+            counts = dict(self._counts)
+        lookups = counts["memory_hits"] + counts["db_hits"] + counts["misses"]
+        counts["hit_ratio"] = round((lookups - counts["misses"]) / lookups, 4) if lookups else 0.0
+        counts["memory_entries"] = len(_memory())
+        return counts
+
+
+stats = CacheStats()
+_memory_cache = None
+_memory_lock = threading.Lock()
+
+
+def _memory():
+    global _memory_cache
+    with _memory_lock:
+        if _memory_cache is None:
+            _memory_cache = LRUCache(settings.AI_CACHE_MEMORY_SIZE, settings.AI_CACHE_TTL)
+        return _memory_cache
+
+
+def enabled():
+    return settings.AI_CACHE_ENABLED
+
+
+def lookup(key):
+    """Returns the cached response for the key, or None."""
+    memory = _memory()
+    value = memory.get(key)
+    if value is not None:
+        stats.incr("memory_hits")
+        return value
+
+    now = timezone.now()
+    entry = AIResponseCache.objects.filter(key=key, expires_at__gt=now).values_list("response", flat=True).first()
+    if entry is None:
+        stats.incr("misses")
+        return None
+
+    AIResponseCache.objects.filter(key=key).update(last_used_at=now, hits=F("hits") + 1)
+    stats.incr("db_hits")
+    stats.incr("evictions", memory.set(key, entry))
+    return entry
+
+
+def store(key, response):
+    now = timezone.now()
+    AIResponseCache.objects.update_or_create(
+        key=key,
+        defaults={
+            "response": response,
+            "last_used_at": now,
+            "expires_at": now + timedelta(seconds=settings.AI_CACHE_TTL),
+        },
+    )
+    stats.incr("stores")
+    stats.incr("evictions", _memory().set(key, response))
+
+
+def clear_memory():
+    _memory().clear()
+
+
+def prune():
+    """Deletes expired rows, then the least recently used rows over the size limit."""
+    removed = AIResponseCache.objects.filter(expires_at__lte=timezone.now()).delete()[0]
+
+    overflow = AIResponseCache.objects.order_by("-last_used_at").values_list("key", flat=True)[
+        settings.AI_CACHE_DB_MAX_ENTRIES:
+    ]
+    keys = list(overflow)
+    for start in range(0, len(keys), 1000):
+        removed += AIResponseCache.objects.filter(key__in=keys[start:start + 1000]).delete()[0]
+    stats.incr("evictions", removed)
+    return removed
@@ -0,0 +1,345 @@
+"""
+HTTP layer of the OpenAI integration.
+
+OpenAIChatClient (ai_service.py) hands the SDK an httpx client built here,
+with the SDK's own retries turned off:
+
+- a bounded connection pool (AI_HTTP_MAX_CONNECTIONS) reused by every call
+  of the process, and connect/read/write/pool timeouts, so a slow model
+  service costs each worker at most AI_HTTP_READ_TIMEOUT per attempt;
+- `ResilientTransport` / `AsyncResilientTransport` retry 429, 5xx and
+  network errors up to AI_HTTP_MAX_RETRIES times with exponential backoff
+  and full jitter (honouring Retry-After);
+- `breaker` counts the failed attempts of the last AI_BREAKER_WINDOW_SECONDS
+  and opens once AI_BREAKER_FAILURE_RATE of at least AI_BREAKER_MIN_REQUESTS
+  attempts failed: calls then fail fast with ai_service.CircuitOpenError for
+  AI_BREAKER_COOLDOWN_SECONDS, after which a single probe decides whether
+  it closes again;
+- `stats` keeps attempt latency, outcomes, retries and breaker state,
+  rendered with the request metrics at /metrics.
+
+Like the other metrics, the breaker and stats are per process; their samples
+carry the same worker="<pid>" label as core.metrics. This module
+imports httpx, so import it lazily from code that runs at start-up.
+"""
+import asyncio
+import random
+import threading
+import time
+from collections import deque
+from email.utils import parsedate_to_datetime
+
+import httpx
+from django.conf import settings
+
+from ..metrics import worker_label
+from .ai_service import CircuitOpenError
+
+RETRY_STATUSES = frozenset({408, 429, 500, 502, 503, 504})
+LATENCY_BUCKETS = (0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0, 30.0, 60.0)
+
+
+class CircuitBreaker:
+    CLOSED, HALF_OPEN, OPEN = "closed", "half_open", "open"
+
+    def __init__(self, clock=time.monotonic):
+        self._clock = clock
+        self._lock = threading.Lock()
+        self.reset()
+
+    def reset(self):
+        with self._lock:
+            self._outcomes = deque()  # (time, failed) of the attempts in the window
+            self._failures = 0
+            self._state = self.CLOSED
+            self._opened_at = 0.0
+            self._probe_started = None  # set while the half-open probe is in flight
+            self.opened = 0  # times the circuit opened
+
+    @property
+    def state(self):
+        with self._lock:
+            return self._state
+
+    def _retry_after(self, now):
+        return max(self._opened_at + settings.AI_BREAKER_COOLDOWN_SECONDS - now, 0.0)
+
+    def _probing(self, now):
+        # A probe that never reported back (cancelled, crashed) expires after a cool-down
+        return self._probe_started is not None and now - self._probe_started < settings.AI_BREAKER_COOLDOWN_SECONDS
+
+    def check(self):
+        """Raises CircuitOpenError while calls should not be attempted (does not take the probe)."""
+        with self._lock:
+            now = self._clock()
+            if self._state == self.OPEN and self._retry_after(now) > 0:
+                raise CircuitOpenError(self._retry_after(now))
+            if self._state == self.HALF_OPEN and self._probing(now):
+                raise CircuitOpenError(settings.AI_BREAKER_COOLDOWN_SECONDS)
+
+    def acquire(self):
+        """Called before each attempt; after the cool-down only one probe goes through."""
+        with self._lock:
+            now = self._clock()
+            if self._state == self.OPEN:
+                if self._retry_after(now) > 0:
+                    raise CircuitOpenError(self._retry_after(now))
+                self._state = self.HALF_OPEN
+            if self._state == self.HALF_OPEN:
+                if self._probing(now):
+                    raise CircuitOpenError(settings.AI_BREAKER_COOLDOWN_SECONDS)
+                self._probe_started = now
+
+    def record(self, failed):
+        with self._lock:
+            now = self._clock()
+            if self._state == self.HALF_OPEN:
+                self._probe_started = None
+                if failed:
+                    self._open(now)
+                else:
+                    self._state = self.CLOSED
+                    self._outcomes.clear()
+                    self._failures = 0
+                return
+            if self._state == self.OPEN:
+                return  # attempts started before the circuit opened
+
+            self._outcomes.append((now, failed))
+            self._failures += failed
+            horizon = now - settings.AI_BREAKER_WINDOW_SECONDS
+            while self._outcomes and self._outcomes[0][0] < horizon:
+                self._failures -= self._outcomes.popleft()[1]
+            attempts = len(self._outcomes)
+            if (
+                failed
+                and attempts >= settings.AI_BREAKER_MIN_REQUESTS
+                and self._failures / attempts >= settings.AI_BREAKER_FAILURE_RATE
+            ):
+                self._open(now)
+
+    def _open(self, now):
+        self._state = self.OPEN
+        self._opened_at = now
+        self._outcomes.clear()
+        self._failures = 0
+        self.opened += 1
+
+
+class ClientStats:
+    """Per-attempt counters of the model service calls."""
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self.reset()
+
+    def reset(self):
+        with self._lock:
+            self._attempts = {}  # outcome ("200", "503", "timeout", "error") -> count
+            self._buckets = [0] * len(LATENCY_BUCKETS)
+            self._count = 0
+            self._duration = 0.0
+            self._retries = 0
+            self._rejected = 0
+
+    def observe(self, outcome, duration):
+        with self._lock:
+            self._attempts[outcome] = self._attempts.get(outcome, 0) + 1
+            for i, bound in enumerate(LATENCY_BUCKETS):
+                if duration <= bound:
+                    self._buckets[i] += 1
+            self._count += 1
+            self._duration += duration
+
+    def retry(self):
+        with self._lock:
+            self._retries += 1
+
+    def reject(self):
+        with self._lock:
+            self._rejected += 1
+
+    def snapshot(self):
+        with self._lock:
+            return {
+                "attempts": dict(self._attempts),
+                "buckets": list(self._buckets),
+                "count": self._count,
+                "duration": self._duration,
+                "retries": self._retries,
+                "rejected": self._rejected,
+                "circuit_state": breaker.state,
+                "circuit_opened": breaker.opened,
+            }
+
+    def render_prometheus(self):
+        data = self.snapshot()
+        worker = worker_label()
+        lines = [
+            "# HELP memorise_llm_attempts_total HTTP attempts to the model service, by outcome.",
+            "# TYPE memorise_llm_attempts_total counter",
+        ]
+        for outcome, count in sorted(data["attempts"].items()):
+            lines.append(f'memorise_llm_attempts_total{{outcome="{outcome}",{worker}}} {count}')
+        lines += [
+            "# HELP memorise_llm_attempt_duration_seconds Time to the response headers of each attempt.",
+            "# TYPE memorise_llm_attempt_duration_seconds histogram",
+        ]
+        for bound, count in zip(LATENCY_BUCKETS, data["buckets"]):
+            lines.append(f'memorise_llm_attempt_duration_seconds_bucket{{le="{bound}",{worker}}} {count}')
+        lines += [
+            f'memorise_llm_attempt_duration_seconds_bucket{{le="+Inf",{worker}}} {data["count"]}',
+            f"memorise_llm_attempt_duration_seconds_sum{{{worker}}} {data['duration']:.6f}",
+            f"memorise_llm_attempt_duration_seconds_count{{{worker}}} {data['count']}",
+            "# HELP memorise_llm_retries_total Attempts retried after a 429, 5xx or network error.",
+            "# TYPE memorise_llm_retries_total counter",
+            f"memorise_llm_retries_total{{{worker}}} {data['retries']}",
+            "# HELP memorise_llm_rejected_total Calls failed fast by the open circuit breaker.",
+            "# TYPE memorise_llm_rejected_total counter",
+            f"memorise_llm_rejected_total{{{worker}}} {data['rejected']}",
+            "# HELP memorise_llm_circuit_state Circuit breaker state (0 closed, 1 half open, 2 open).",
+            "# TYPE memorise_llm_circuit_state gauge",
+            f"memorise_llm_circuit_state{{{worker}}} {STATE_VALUES[data['circuit_state']]}",
+            "# HELP memorise_llm_circuit_opened_total Times the circuit breaker opened.",
+            "# TYPE memorise_llm_circuit_opened_total counter",
+            f"memorise_llm_circuit_opened_total{{{worker}}} {data['circuit_opened']}",
+        ]
+        return "\n".join(lines) + "\n"
+
+
+STATE_VALUES = {CircuitBreaker.CLOSED: 0, CircuitBreaker.HALF_OPEN: 1, CircuitBreaker.OPEN: 2}
+
+breaker = CircuitBreaker()
+stats = ClientStats()
+
+
+def backoff(retry, response=None):
+    """Seconds to wait before retry number `retry` (0-based)."""
+    cap = settings.AI_HTTP_BACKOFF_MAX
+    retry_after = response is not None and response.headers.get("Retry-After")
+    if retry_after:
+        try:
+            return min(max(float(retry_after), 0.0), cap)
+        except ValueError:
+            try:
+                return min(max(parsedate_to_datetime(retry_after).timestamp() - time.time(), 0.0), cap)
+            except (TypeError, ValueError):
+                pass
+    # Full jitter: concurrent clients don't retry in lockstep
+    return random.uniform(0, min(cap, settings.AI_HTTP_BACKOFF_BASE * 2 ** retry))
+
+
+class _Attempts:
+    """Retry bookkeeping shared by the sync and async transports."""
+
+    def __init__(self):
+        self.retry = 0
+
+    def start(self):
+        try:
+            breaker.acquire()
+        except CircuitOpenError:
+            stats.reject()
+            raise
+        return time.perf_counter()
+
+    def response(self, started, response):
+        """True if the response should be retried."""
+        failed = response.status_code in RETRY_STATUSES
+        stats.observe(str(response.status_code), time.perf_counter() - started)
+        breaker.record(failed)
+        return failed and self._next()
+
+    def error(self, started, exc):
+        """True if the exception is a transport error that should be retried."""
+        stats.observe("timeout" if isinstance(exc, httpx.TimeoutException) else "error",
+                      time.perf_counter() - started)
+        breaker.record(True)
+        return isinstance(exc, httpx.TransportError) and self._next()
+
+    def _next(self):
+        if self.retry >= settings.AI_HTTP_MAX_RETRIES:
+            return False
+        self.retry += 1
+        stats.retry()
+        return True
+
+
+class ResilientTransport(httpx.BaseTransport):
+
+    def __init__(self, transport):
+        self._transport = transport
+
+    def handle_request(self, request):
+        attempts = _Attempts()
+        while True:
+            started = attempts.start()
+            try:
+                response = self._transport.handle_request(request)
+            except Exception as exc:
+                if not attempts.error(started, exc):
+                    raise
+                time.sleep(backoff(attempts.retry - 1))
+                continue
+            if not attempts.response(started, response):
+                return response
+            response.close()
+            time.sleep(backoff(attempts.retry - 1, response))
+
+    def close(self):
+        self._transport.close()
+
+
+class AsyncResilientTransport(httpx.AsyncBaseTransport):
+
+    def __init__(self, transport):
+        self._transport = transport
+
+    async def handle_async_request(self, request):
+        attempts = _Attempts()
+        while True:
+            started = attempts.start()
+            try:
+                response = await self._transport.handle_async_request(request)
+            except Exception as exc:
+                if not attempts.error(started, exc):
+                    raise
+                await asyncio.sleep(backoff(attempts.retry - 1))
+                continue
+            if not attempts.response(started, response):
+                return response
+            await response.aclose()
+            await asyncio.sleep(backoff(attempts.retry - 1, response))
+
+    async def aclose(self):
+        await self._transport.aclose()
+
+
+def timeout():
+    return httpx.Timeout(
+        connect=settings.AI_HTTP_CONNECT_TIMEOUT,
+        read=settings.AI_HTTP_READ_TIMEOUT,
+        write=settings.AI_HTTP_WRITE_TIMEOUT,
+        pool=settings.AI_HTTP_POOL_TIMEOUT,
+    )
+
+
+def _limits():
+    return httpx.Limits(
+        max_connections=settings.AI_HTTP_MAX_CONNECTIONS,
+        max_keepalive_connections=settings.AI_HTTP_MAX_KEEPALIVE,
+    )
+
+
+def http_client():
+    return httpx.Client(
+        transport=ResilientTransport(httpx.HTTPTransport(limits=_limits())),
+        timeout=timeout(),
+    )
+
+
+def async_http_client():
+    return httpx.AsyncClient(
+        transport=AsyncResilientTransport(httpx.AsyncHTTPTransport(limits=_limits())),
+        timeout=timeout(),
+    )
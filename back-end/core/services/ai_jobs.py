@@ -0,0 +1,173 @@
+"""
+Background processing of AI flashcard generation.
+
+The AIGenerationJob table is the queue: `enqueue` inserts a PENDING row and,
+once the transaction commits, wakes a worker from a bounded, per-process
+thread pool (settings.AI_JOB_WORKERS). A worker claims the oldest pending job
+with a conditional UPDATE, so several processes can share the same table
+without an external broker, and keeps claiming until the queue is empty.
+Each wake-up first requeues jobs left RUNNING by a process that died
+(restarted gunicorn worker), and the procfile's `worker` process
+(`manage.py run_ai_jobs --loop`) polls the table, so no job depends on the
+wake-up of the process that queued it.
+
+A worker only records the outcome while it still holds its claim: the job
+must be RUNNING with the started_at it was claimed with. A job requeued
+while its worker was still busy (slow model call) is therefore finished by
+whichever claim comes first, and the late one writes nothing. Jobs with a
+target deck insert their cards with a single bulk_create in the same
+transaction, after that check.
+
+With settings.AI_JOBS_EAGER the job runs inline when the transaction
+commits (tests, local development).
+"""
+import logging
+import threading
+from concurrent.futures import ThreadPoolExecutor
+from datetime import timedelta
+
+from django.conf import settings
+from django.db import connection, transaction
+from django.utils import timezone
+
+from ..models import AIGenerationJob, Deck
+from .ai_service import AIServiceUnavailable, InvalidAIResponse, generate_flashcards
+from .flashcards import bulk_create_flashcards
+
+logger = logging.getLogger(__name__)
+
+_executor = None
+_executor_lock = threading.Lock()
+
+
+def get_executor():
+    global _executor
+    with _executor_lock:
+        if _executor is None:
+            _executor = ThreadPoolExecutor(
+                max_workers=settings.AI_JOB_WORKERS,
+                thread_name_prefix="ai-job",
+            )
+        return _executor
+
+
+def enqueue(user, text, count, deck=None):
+    """`deck` must already be checked to belong to `user`."""
+    job = AIGenerationJob.objects.create(user=user, text=text, count=count, deck=deck)
+    transaction.on_commit(_dispatch)
+    return job
+
+
+def _dispatch():
+    if settings.AI_JOBS_EAGER:
+        run_next()
+    else:
+        get_executor().submit(_worker_tick)
+
+
+def _worker_tick():
+    try:
+        drain()
+    except Exception:
+        logger.exception("AI job worker crashed")
+    finally:
+        # Worker threads own their DB connection; don't leak it
+        connection.close()
+
+
+def claim_next():
+    """
+    Atomically moves the oldest pending job to RUNNING and returns it,
+    or returns None when the queue is empty.
+    """
+    pending = AIGenerationJob.objects.filter(status=AIGenerationJob.Status.PENDING)
+    while True:
+        job_id = pending.order_by("created_at").values_list("id", flat=True).first()
+        if job_id is None:
+            return None
+        claimed = pending.filter(id=job_id).update(
+            status=AIGenerationJob.Status.RUNNING,
+            started_at=timezone.now(),
+        )
+        if claimed:
+            # started_at identifies this claim (see _finish)
+            return AIGenerationJob.objects.get(id=job_id)
+        # Another worker won the race, try the next one
+
+
+def run_job(job):
+    try:
+        generation = generate_flashcards(job.text, job.count)
+    except InvalidAIResponse as exc:
+        _finish(job, AIGenerationJob.Status.FAILED, error="Invalid AI response", result={"raw": exc.raw})
+        return job
+    except AIServiceUnavailable as exc:
+        logger.warning("AI service unavailable for job %s: %s", job.id, exc)
+        _finish(job, AIGenerationJob.Status.FAILED, error=str(exc))
+        return job
+    except Exception as exc:
+        logger.exception("AI generation failed for job %s", job.id)
+        _finish(job, AIGenerationJob.Status.FAILED, error=f"AI service error: {exc}")
+        return job
+
+    result = {"flashcards": generation.flashcards, "cached": generation.cached, "chunks": generation.chunks}
+    # Cards and job result commit together, and only under a claim that still
+    # holds: a requeued job never saves twice
+    with transaction.atomic():
+        if not _finish(job, AIGenerationJob.Status.SUCCEEDED, result=result):
+            return job
+        # Deleting the deck clears job.deck; the cards are then only returned
+        deck = Deck.objects.filter(pk=job.deck_id).first() if job.deck_id else None
+        if deck is not None:
+            created = bulk_create_flashcards(deck, generation.flashcards)
+            result["flashcards"] = [
+                {"id": card.id, "front": card.front, "back": card.back} for card in created
+            ]
+            result["saved"] = [card.id for card in created]
+            job.save(update_fields=["result"])
+    return job
+
+
+def _finish(job, status, result=None, error=""):
+    """
+    Stores the outcome with a conditional UPDATE on the claim (RUNNING, same
+    started_at). Returns False, writing nothing, when the job was requeued
+    since `job` claimed it.
+    """
+    finished_at = timezone.now()
+    finished = AIGenerationJob.objects.filter(
+        pk=job.pk, status=AIGenerationJob.Status.RUNNING, started_at=job.started_at,
+    ).update(status=status, result=result, error=error, finished_at=finished_at)
+    if not finished:
+        logger.warning("AI job %s was requeued while it ran; dropping this run's outcome", job.id)
+        return False
+    job.status, job.result, job.error, job.finished_at = status, result, error, finished_at
+    return True
+
+
+def run_next():
+    """Claims and runs one job. Returns the job, or None if there was none."""
+    job = claim_next()
+    if job is not None:
+        run_job(job)
+    return job
+
+
+def drain():
+    """Requeues stale jobs, then runs pending jobs until none is left. Returns how many ran."""
+    requeue_stale()
+    processed = 0
+    while run_next() is not None:
+        processed += 1
+    return processed
+
+
+def requeue_stale(older_than=timedelta(minutes=10)):
+    """
+    Puts back jobs whose worker died while RUNNING them. A worker that was
+    only slow loses its claim: its late outcome is dropped by _finish.
+    """
+    return AIGenerationJob.objects.filter(
+        status=AIGenerationJob.Status.RUNNING,
+        started_at__lt=timezone.now() - older_than,
+    ).update(status=AIGenerationJob.Status.PENDING, started_at=None)
@@ -1,11 +1,199 @@
-from openai import OpenAI
+import asyncio
+import json
+import re
+import threading
+import weakref
+from concurrent.futures import ThreadPoolExecutor
+from contextlib import contextmanager
+from typing import NamedTuple
+
+from asgiref.sync import sync_to_async
 from django.conf import settings
+from django.db import connection
+from django.utils.module_loading import import_string
+
+from . import ai_cache, chunking
+from .json_stream import JSONObjectStream
+
+MODEL = "gpt-4o-mini"  # modelo barato y rápido
+TEMPERATURE = 0.7
+PROMPT_VERSION = 2  # bump whenever build_prompt changes (invalidates the cache)
+DEFAULT_CARD_COUNT = 3
+MAX_CARD_COUNT = 50
+MAX_TEXT_CHARS = 200_000  # longer texts are chunked, but bound the request body
+
+SYSTEM_PROMPT = "Eres un generador de flashcards. Siempre responde SOLO en JSON válido."
+
+
+class OpenAIChatClient:
+    """
+    LLM client backed by the OpenAI chat completions API.
+    complete/stream block the calling thread; acomplete/astream use
+    AsyncOpenAI for the async views.
+
+    The openai SDK (and httpx/pydantic behind it) takes longer to import
+    than the rest of the app together, so it is only imported when a worker
+    actually calls the API. Both SDK clients go through the pooled,
+    retrying, circuit-broken HTTP clients of ai_http; failures of the model
+    service surface as AIServiceUnavailable.
+    """
+
+    def __init__(self):
+        self._client = None
+        # One AsyncOpenAI per event loop: pooled connections are bound to
+        # the loop that opened them, and under WSGI every async view call
+        # runs in a new loop (async_to_sync)
+        self._async_clients = weakref.WeakKeyDictionary()
+        self._async_lock = threading.Lock()
+
+    @property
+    def client(self):
+        if self._client is None:
+            from openai import OpenAI
+
+            from . import ai_http
+
+            self._client = OpenAI(
+                api_key=settings.OPENAI_API_KEY,
+                base_url=settings.OPENAI_BASE_URL,
+                timeout=ai_http.timeout(),
+                max_retries=0,  # ai_http retries
+                http_client=ai_http.http_client(),
+            )
+        return self._client
+
+    @property
+    def async_client(self):
+        """The AsyncOpenAI client of the running event loop."""
+        loop = asyncio.get_running_loop()
+        with self._async_lock:
+            client = self._async_clients.get(loop)
+            if client is None:
+                from openai import AsyncOpenAI
+
+                from . import ai_http
+
+                client = self._async_clients[loop] = AsyncOpenAI(
+                    api_key=settings.OPENAI_API_KEY,
+                    base_url=settings.OPENAI_BASE_URL,
+                    timeout=ai_http.timeout(),
+                    max_retries=0,
+                    http_client=ai_http.async_http_client(),
+                )
+            return client
+
+    def complete(self, messages, model, temperature):
+        with _service_errors():
+            response = self.client.chat.completions.create(
+                model=model,
+                messages=messages,
+                temperature=temperature
+            )
+        return response.choices[0].message.content
+
+    def stream(self, messages, model, temperature):
+        """Yields the completion text fragment by fragment as it is generated."""
+        with _service_errors():
+            stream = self.client.chat.completions.create(
+                model=model,
+                messages=messages,
+                temperature=temperature,
+                stream=True
+            )
+            for chunk in stream:
+                if chunk.choices and chunk.choices[0].delta.content:
+                    yield chunk.choices[0].delta.content
+
+    async def acomplete(self, messages, model, temperature):
+        with _service_errors():
+            response = await self.async_client.chat.completions.create(
+                model=model,
+                messages=messages,
+                temperature=temperature
+            )
+        return response.choices[0].message.content
+
+    async def astream(self, messages, model, temperature):
+        with _service_errors():
+            stream = await self.async_client.chat.completions.create(
+                model=model,
+                messages=messages,
+                temperature=temperature,
+                stream=True
+            )
+            async for chunk in stream:
+                if chunk.choices and chunk.choices[0].delta.content:
+                    yield chunk.choices[0].delta.content
+
+
+@contextmanager
+def _service_errors():
+    """Fails fast while the circuit is open and maps SDK errors of an unavailable service."""
+    import openai
+
+    from . import ai_http
+
+    ai_http.breaker.check()
+    try:
+        yield
+    except openai.APIConnectionError as exc:  # includes APITimeoutError
+        if isinstance(exc.__cause__, AIServiceUnavailable):
+            raise exc.__cause__ from None
+        raise AIServiceUnavailable(f"AI service unreachable: {exc}") from exc
+    except openai.APIStatusError as exc:
+        if exc.status_code in ai_http.RETRY_STATUSES:
+            raise AIServiceUnavailable(f"AI service error {exc.status_code}") from exc
+        raise
+
+
+class FakeLLMClient:
+    """
+    Offline LLM client for tests and local development without an API key.
+    Returns deterministic cards built from the user's text.
+    """
+
+    def complete(self, messages, model, temperature):
+        prompt = messages[-1]["content"]
+        count = int(re.search(r"exactamente (\d+)", prompt).group(1))
+        text = prompt.rsplit("Texto del usuario:", 1)[-1].strip().strip('"')
+        words = text.split() or ["MemoRise"]
+        return json.dumps([
+            {"front": f"¿Qué significa «{word}»?", "back": f"Término del texto: {word}"}
+            for word in words[:count]
+        ], ensure_ascii=False)
+
+    def stream(self, messages, model, temperature):
+        content = self.complete(messages, model, temperature)
+        for start in range(0, len(content), 7):
+            yield content[start:start + 7]
+
+    async def acomplete(self, messages, model, temperature):
+        return self.complete(messages, model, temperature)
 
-client = OpenAI(api_key=settings.OPENAI_API_KEY)
+    async def astream(self, messages, model, temperature):
+        for fragment in self.stream(messages, model, temperature):
+            yield fragment
 
-def generate_flashcards(user_text: str):
-    prompt = f"""
-    Genera exactamente 3 flashcards educativas en formato JSON puro.
+
+_clients = {}
+_clients_lock = threading.Lock()
+
+
+def get_llm_client():
+    """
+    Returns the client configured in settings.AI_LLM_CLIENT (dotted path),
+    created once per process and shared by every request and worker.
+    """
+    path = settings.AI_LLM_CLIENT
+    with _clients_lock:
+        if path not in _clients:
+            _clients[path] = import_string(path)()
+        return _clients[path]
+
+
+def build_prompt(user_text: str, count: int = DEFAULT_CARD_COUNT):
+    return f"""
+    Genera exactamente {count} flashcards educativas en formato JSON puro.
     IMPORTANTE:
     - Responde siempre en español.
     - No incluyas explicaciones ni texto extra fuera del JSON.
@@ -20,13 +208,343 @@ def generate_flashcards(user_text: str):
     Texto del usuario: "{user_text}"
     """
 
-    response = client.chat.completions.create(
-        model="gpt-4o-mini",  # modelo barato y rápido
-        messages=[
-            {"role": "system", "content": "Eres un generador de flashcards. Siempre responde SOLO en JSON válido."},
-            {"role": "user", "content": prompt}
-        ],
-        temperature=0.7
-    )
 
-    return response.choices[0].message.content
\ No newline at end of file
+def build_messages(chunk, count):
+    return [
+        {"role": "system", "content": SYSTEM_PROMPT},
+        {"role": "user", "content": build_prompt(chunk, count)}
+    ]
+
+
+def _chunk_key(chunk, count):
+    return ai_cache.cache_key(chunk, MODEL, f"{PROMPT_VERSION}:{count}", TEMPERATURE)
+
+
+class AIServiceUnavailable(Exception):
+    """The model service is down, overloaded or too slow (see ai_http)."""
+
+
+class CircuitOpenError(AIServiceUnavailable):
+    """Failed fast: the circuit breaker is open after too many failures."""
+
+    def __init__(self, retry_after):
+        super().__init__(f"AI service unavailable (circuit open, retry in {retry_after:.0f} s)")
+        self.retry_after = retry_after
+
+
+class InvalidAIResponse(ValueError):
+    """No chunk of the input produced parseable flashcards."""
+
+    def __init__(self, raw):
+        super().__init__("Invalid AI response")
+        self.raw = raw
+
+
+class Generation(NamedTuple):
+    flashcards: list  # merged, de-duplicated {"front", "back"} cards
+    cached: bool      # every chunk was served from the response cache
+    chunks: int       # number of chunks the text was split into
+
+
+class ChunkResult(NamedTuple):
+    flashcards: list
+    cached: bool
+    raw: str
+
+
+_slots = None
+_slots_lock = threading.Lock()
+
+
+def _llm_slots():
+    """Process-wide limit on in-flight LLM calls (settings.AI_MAX_CONCURRENCY)."""
+    global _slots
+    with _slots_lock:
+        if _slots is None:
+            _slots = threading.BoundedSemaphore(settings.AI_MAX_CONCURRENCY)
+        return _slots
+
+
+_async_slots = weakref.WeakKeyDictionary()
+
+
+def _async_llm_slots():
+    """
+    _llm_slots for coroutines: one asyncio.Semaphore per event loop, shared by
+    every request the loop serves (an ASGI worker runs a single loop).
+    """
+    loop = asyncio.get_running_loop()
+    with _slots_lock:
+        slots = _async_slots.get(loop)
+        if slots is None:
+            slots = _async_slots[loop] = asyncio.Semaphore(settings.AI_MAX_CONCURRENCY)
+        return slots
+
+
+def generate_chunk(chunk: str, count: int):
+    """
+    One LLM call for one chunk. Identical requests (same normalized text,
+    card count, model, prompt version and temperature) are served from the
+    cache; only outputs that parse into flashcards are cached.
+    """
+    key = _chunk_key(chunk, count)
+    if ai_cache.enabled():
+        cached = ai_cache.lookup(key)
+        if cached is not None:
+            return ChunkResult(parse_flashcards(cached), True, cached)
+
+    with _llm_slots():
+        content = get_llm_client().complete(
+            messages=build_messages(chunk, count),
+            model=MODEL,
+            temperature=TEMPERATURE
+        )
+    return _chunk_result(key, content, store=ai_cache.store)
+
+
+def _chunk_result(key, content, store):
+    try:
+        flashcards = parse_flashcards(content)
+    except ValueError:
+        flashcards = []
+    if flashcards and ai_cache.enabled():
+        store(key, content)
+    return ChunkResult(flashcards, False, content)
+
+
+async def agenerate_chunk(chunk: str, count: int):
+    """Async generate_chunk: awaits the LLM instead of blocking a thread."""
+    key = _chunk_key(chunk, count)
+    if ai_cache.enabled():
+        cached = await sync_to_async(ai_cache.lookup)(key)
+        if cached is not None:
+            return ChunkResult(parse_flashcards(cached), True, cached)
+
+    async with _async_llm_slots():
+        content = await get_llm_client().acomplete(
+            messages=build_messages(chunk, count),
+            model=MODEL,
+            temperature=TEMPERATURE
+        )
+    if ai_cache.enabled():
+        # The cache write touches the database: run it off the event loop
+        return await sync_to_async(_chunk_result)(key, content, ai_cache.store)
+    return _chunk_result(key, content, store=ai_cache.store)
+
+
+def _generate_chunk_in_thread(job):
+    try:
+        return generate_chunk(*job)
+    finally:
+        # Fan-out threads open their own DB connection for the cache
+        connection.close()
+
+
+def _card_key(card):
+    return " ".join(re.sub(r"[^\w\s]", " ", card["front"].casefold()).split())
+
+
+def merge_flashcards(groups, limit):
+    """Concatenates chunk results in document order, dropping repeated questions."""
+    seen = set()
+    merged = []
+    for cards in groups:
+        for card in cards:
+            key = _card_key(card)
+            if key and key not in seen:
+                seen.add(key)
+                merged.append(card)
+    return merged[:limit]
+
+
+def generate_flashcards(user_text: str, count: int = DEFAULT_CARD_COUNT):
+    """
+    Generates `count` flashcards for the text.
+
+    Long texts are split into token-bounded chunks (AI_CHUNK_MAX_TOKENS),
+    the requested count is spread over them by size (at least one card per
+    chunk, so a long text may get more than `count`), and the chunks are sent
+    concurrently through the shared client, so wall time follows the slowest
+    chunk rather than the whole document. Results are merged and de-duplicated.
+    Raises InvalidAIResponse when no chunk returned valid flashcards.
+    """
+    chunks, jobs, count = _plan(user_text, count)
+
+    if len(jobs) == 1:
+        results = [generate_chunk(*jobs[0])]
+    else:
+        workers = min(len(jobs), settings.AI_MAX_CONCURRENCY)
+        with ThreadPoolExecutor(max_workers=workers, thread_name_prefix="ai-chunk") as pool:
+            results = list(pool.map(_generate_chunk_in_thread, jobs))
+
+    return _merge_results(results, chunks, jobs, count)
+
+
+async def agenerate_flashcards(user_text: str, count: int = DEFAULT_CARD_COUNT):
+    """
+    Async generate_flashcards for the ASGI views: the chunks are awaited
+    concurrently on the event loop (at most AI_MAX_CONCURRENCY in flight
+    across all the requests of the loop), so a slow LLM never holds a
+    worker thread.
+    """
+    chunks, jobs, count = _plan(user_text, count)
+    results = await asyncio.gather(*(agenerate_chunk(chunk, share) for chunk, share in jobs))
+    return _merge_results(results, chunks, jobs, count)
+
+
+def _plan(user_text, count):
+    """
+    Splits the text into chunks and the (chunk, card count) calls to make.
+
+    Every chunk gets at least one card, so no part of the text is left out:
+    a count below the number of chunks is raised to one card per chunk, and
+    the returned count is the total to keep. Texts that would need more than
+    AI_MAX_CHUNKS calls are split into proportionally larger chunks instead.
+    """
+    max_tokens = settings.AI_CHUNK_MAX_TOKENS
+    chunks = chunking.split_text(user_text, max_tokens) or [user_text]
+    while len(chunks) > settings.AI_MAX_CHUNKS:
+        max_tokens = -(-max_tokens * len(chunks) // settings.AI_MAX_CHUNKS)
+        chunks = chunking.split_text(user_text, max_tokens)
+    shares = chunking.distribute(count, [len(chunk) for chunk in chunks])
+    return chunks, list(zip(chunks, shares)), sum(shares)
+
+
+def _merge_results(results, chunks, jobs, count):
+    # A chunk keeps only its share, so one verbose answer can't crowd out the rest of the text
+    groups = (result.flashcards[:share] for result, (_, share) in zip(results, jobs))
+    flashcards = merge_flashcards(groups, count)
+    if not flashcards:
+        raise InvalidAIResponse(results[0].raw)
+    return Generation(flashcards, all(result.cached for result in results), len(chunks))
+
+
+def _valid_card(obj):
+    if isinstance(obj, dict) and obj.get("front") and obj.get("back"):
+        return {"front": str(obj["front"]), "back": str(obj["back"])}
+    return None
+
+
+class _CardStream:
+    """
+    Turns streamed model output into ("card", card) / ("error", raw) events,
+    skipping repeated questions and stopping at each chunk's share and at
+    `count` cards overall. Shared by the sync and async streaming generators.
+    """
+
+    def __init__(self, count):
+        self.count = count
+        self.seen = set()
+        self.emitted = 0
+
+    def start_chunk(self, share):
+        self.share = share
+        self.parser = JSONObjectStream()
+        self.content = []
+
+    def feed(self, fragment):
+        self.content.append(fragment)
+        events = []
+        for obj, raw in self.parser.feed(fragment):
+            card = _valid_card(obj) if raw is None else None
+            if card is None:
+                events.append(("error", raw if raw is not None else json.dumps(obj, ensure_ascii=False)))
+                continue
+            key = _card_key(card)
+            if key in self.seen or self.share <= 0 or self.emitted >= self.count:
+                continue
+            self.seen.add(key)
+            self.share -= 1
+            self.emitted += 1
+            events.append(("card", card))
+        return events
+
+    def end_chunk(self):
+        return [("error", self.parser.pending)] if self.parser.pending else []
+
+    def cacheable_output(self):
+        """The chunk's full output if it parses into flashcards, else None."""
+        content = "".join(self.content)
+        try:
+            return content if parse_flashcards(content) else None
+        except ValueError:
+            return None
+
+
+def stream_flashcards(user_text: str, count: int = DEFAULT_CARD_COUNT):
+    """
+    Streaming variant of generate_flashcards.
+
+    Yields ("card", card) as soon as each card object is complete in the
+    model output, and ("error", raw) for an object that is malformed, so one
+    bad card never discards the others. Chunks are streamed one after the
+    other; cached chunks are replayed instantly and complete outputs that
+    parse are stored in the cache.
+    """
+    chunks, jobs, count = _plan(user_text, count)
+    cards = _CardStream(count)
+
+    for chunk, share in jobs:
+        key = _chunk_key(chunk, share)
+        cached = ai_cache.lookup(key) if ai_cache.enabled() else None
+        cards.start_chunk(share)
+        if cached is not None:
+            yield from cards.feed(cached)
+        else:
+            # The slot is held while the chunk streams, like generate_chunk's call
+            with _llm_slots():
+                fragments = get_llm_client().stream(
+                    messages=build_messages(chunk, share), model=MODEL, temperature=TEMPERATURE
+                )
+                for fragment in fragments:
+                    yield from cards.feed(fragment)
+        yield from cards.end_chunk()
+
+        if cached is None and ai_cache.enabled():
+            output = cards.cacheable_output()
+            if output is not None:
+                ai_cache.store(key, output)
+
+
+async def astream_flashcards(user_text: str, count: int = DEFAULT_CARD_COUNT):
+    """Async stream_flashcards (AsyncOpenAI); cache reads and writes run off the event loop."""
+    chunks, jobs, count = _plan(user_text, count)
+    cards = _CardStream(count)
+
+    for chunk, share in jobs:
+        key = _chunk_key(chunk, share)
+        cached = await sync_to_async(ai_cache.lookup)(key) if ai_cache.enabled() else None
+
+        cards.start_chunk(share)
+        if cached is not None:
+            for event in cards.feed(cached):
+                yield event
+        else:
+            # The slot is held while the chunk streams, like generate_chunk's call
+            async with _async_llm_slots():
+                fragments = get_llm_client().astream(
+                    messages=build_messages(chunk, share), model=MODEL, temperature=TEMPERATURE
+                )
+                async for fragment in fragments:
+                    for event in cards.feed(fragment):
+                        yield event
+        for event in cards.end_chunk():
+            yield event
+
+        if cached is None and ai_cache.enabled():
+            output = cards.cacheable_output()
+            if output is not None:
+                await sync_to_async(ai_cache.store)(key, output)
+
+
+def parse_flashcards(raw):
+    """
+    Parses the model output into a list of {"front", "back"} dicts.
+    Raises ValueError when the output is not a JSON list of cards.
+    """
+    if not isinstance(raw, str):
+        raise ValueError("Empty AI response.")
+    cards = json.loads(raw)
+    if not isinstance(cards, list):
+        raise ValueError("Expected a JSON list of flashcards.")
+    return [card for card in map(_valid_card, cards) if card]
@@ -0,0 +1,84 @@
+"""
+Token-bounded text splitting for long AI inputs.
+
+Token counts are estimated (about 4 characters per token for Spanish and
+English prose), which is enough to keep every chunk well inside the model's
+context window without shipping a tokenizer.
+"""
+import re
+
+CHARS_PER_TOKEN = 4
+
+_PARAGRAPHS = re.compile(r"\n\s*\n")
+_SENTENCES = re.compile(r"(?<=[.!?¿¡;:])\s+")
+
+
+def estimate_tokens(text):
+    return (len(text) + CHARS_PER_TOKEN - 1) // CHARS_PER_TOKEN
+
+
+def _pieces(text, max_chars):
+    """Yields paragraph, sentence or (last resort) word-wrapped pieces <= max_chars."""
+    for paragraph in _PARAGRAPHS.split(text):
+        paragraph = paragraph.strip()
+        if not paragraph:
+            continue
+        if len(paragraph) <= max_chars:
+            yield paragraph
+            continue
+        for sentence in _SENTENCES.split(paragraph):
+            if len(sentence) <= max_chars:
+                yield sentence
+                continue
+            line = ""
+            for word in sentence.split():
+                while len(word) > max_chars:
+                    if line:
+                        yield line
+                        line = ""
+                    yield word[:max_chars]
+                    word = word[max_chars:]
+                if line and len(line) + 1 + len(word) > max_chars:
+                    yield line
+                    line = word
+                else:
+                    line = f"{line} {word}" if line else word
+            if line:
+                yield line
+
+
+def split_text(text, max_tokens):
+    """
+    Splits text into chunks of at most `max_tokens` (estimated), packing
+    whole paragraphs and sentences together whenever they fit.
+    """
+    max_chars = max_tokens * CHARS_PER_TOKEN
+    chunks = []
+    current = ""
+    for piece in _pieces(text, max_chars):
+        if current and len(current) + 2 + len(piece) > max_chars:
+            chunks.append(current)
+            current = piece
+        else:
+            current = f"{current}\n\n{piece}" if current else piece
+    if current:
+        chunks.append(current)
+    return chunks
+
+
+def distribute(total, weights):
+    """
+    Splits `total` across chunks proportionally to `weights` (largest
+    remainder). Every chunk gets at least one, so a total smaller than the
+    number of chunks is raised to one per chunk rather than skipping any.
+    """
+    if not weights:
+        return []
+    remaining = max(total - len(weights), 0)
+    weight_sum = sum(weights) or 1
+    raw = [remaining * w / weight_sum for w in weights]
+    shares = [1 + int(r) for r in raw]
+    leftovers = len(weights) + remaining - sum(shares)
+    for i in sorted(range(len(weights)), key=lambda i: -(raw[i] - int(raw[i])))[:leftovers]:
+        shares[i] += 1
+    return shares
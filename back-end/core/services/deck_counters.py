@@ -0,0 +1,182 @@
+"""
+Per-deck card counters.
+
+Two ways to get the counts shown in the deck list:
+- `annotate_deck_counts` (default): one query with conditional
+  Count(filter=Q(...)) over the user's flashcards.
+- Materialized `DeckCounter` rows (settings.DECK_COUNTERS_MATERIALIZED):
+  counts by status are read from a table kept up to date incrementally, so
+  the deck list never scans cards.
+
+The table is always maintained, the setting only chooses how it is read, so
+it can be switched on at any time without a rebuild. Model signals
+(connected in CoreConfig.ready) keep it right for every save and delete of a
+single model instance, views, admin and shell alike:
+- a deck gets its counter row when it is created;
+- a saved flashcard is compared with the deck and status it was loaded with;
+- a deleted flashcard is subtracted, unless its deck is being deleted too
+  (the counter row goes with the deck).
+Bulk ORM writes send no signals: call record_created / record_changes /
+record_deleted after bulk_create, bulk_update or QuerySet.update/delete, or
+`manage.py rebuild_deck_counters` after writing cards with raw SQL.
+"""
+from collections import Counter, defaultdict
+
+from django.conf import settings
+from django.db.models import Count, F, IntegerField, OuterRef, Q, QuerySet, Subquery, Value
+from django.db.models.functions import Coalesce
+from django.utils import timezone
+
+from ..models import DeckCounter, Flashcard
+
+STATUSES = [choice for choice, _ in Flashcard.Status.choices]
+DUE_STATUSES = [Flashcard.Status.LEARNING, Flashcard.Status.REVIEW]
+
+
+def materialized_enabled():
+    return getattr(settings, "DECK_COUNTERS_MATERIALIZED", False)
+
+
+def annotate_deck_counts(queryset, now):
+    """
+    Adds total, new, due_now, learning and lapsed to every deck of the
+    queryset, in the same SQL query.
+    """
+    due_now = Q(flashcards__status__in=DUE_STATUSES, flashcards__due_date__lte=now)
+
+    if not materialized_enabled():
+        return queryset.annotate(
+            total=Count("flashcards"),
+            new=Count("flashcards", filter=Q(flashcards__status=Flashcard.Status.NEW)),
+            due_now=Count("flashcards", filter=due_now),
+            learning=Count("flashcards", filter=Q(flashcards__status=Flashcard.Status.LEARNING)),
+            lapsed=Count("flashcards", filter=Q(flashcards__status=Flashcard.Status.LAPSED)),
+        )
+
+    # "Due now" is time dependent: one index seek per deck on flashcard_deck_due_idx
+    due_now_count = (
+        Flashcard.objects.filter(deck=OuterRef("pk"), status__in=DUE_STATUSES, due_date__lte=now)
+        .order_by()
+        .values("deck")
+        .annotate(count=Count("id"))
+        .values("count")
+    )
+    zero = Value(0, output_field=IntegerField())
+    return queryset.annotate(
+        total=Coalesce(F("counters__total"), zero),
+        new=Coalesce(F("counters__new"), zero),
+        due_now=Coalesce(Subquery(due_now_count, output_field=IntegerField()), zero),
+        learning=Coalesce(F("counters__learning"), zero),
+        lapsed=Coalesce(F("counters__lapsed"), zero),
+    )
+
+
+def rebuild(deck_ids):
+    """Recomputes the counters of the given decks from their flashcards."""
+    rows = {deck_id: Counter() for deck_id in deck_ids}
+    counts = (
+        Flashcard.objects.filter(deck_id__in=deck_ids)
+        .values("deck_id", "status")
+        .annotate(count=Count("id"))
+    )
+    for row in counts:
+        rows[row["deck_id"]][row["status"]] = row["count"]
+
+    for deck_id, counter in rows.items():
+        DeckCounter.objects.update_or_create(
+            deck_id=deck_id,
+            defaults={"total": counter.total(), **{status: counter[status] for status in STATUSES}},
+        )
+
+
+def _apply(deltas):
+    """
+    deltas: {deck_id: Counter({status: +/-n})}. One UPDATE per touched deck;
+    decks without a counter row yet are rebuilt from scratch instead.
+    """
+    missing = []
+    now = timezone.now()
+    for deck_id, counter in deltas.items():
+        changes = {status: F(status) + n for status, n in counter.items() if n}
+        total = sum(counter.values())
+        if total:
+            changes["total"] = F("total") + total
+        if not changes:
+            continue
+        changes["updated_at"] = now  # update() skips auto_now
+        if not DeckCounter.objects.filter(deck_id=deck_id).update(**changes):
+            missing.append(deck_id)
+    if missing:
+        rebuild(missing)
+
+
+def record_created(cards):
+    """Call after inserting flashcards."""
+    deltas = defaultdict(Counter)
+    for card in cards:
+        deltas[card.deck_id][card.status] += 1
+    _apply(deltas)
+
+
+def record_deleted(cards):
+    """Call after deleting flashcards (with their pre-delete deck and status)."""
+    deltas = defaultdict(Counter)
+    for card in cards:
+        deltas[card.deck_id][card.status] -= 1
+    _apply(deltas)
+
+
+def record_changes(changes):
+    """
+    Call after saving flashcards whose deck or status may have changed.
+    changes: iterable of (old_deck_id, old_status, new_deck_id, new_status).
+    Unchanged cards (the usual review -> review case) cost nothing.
+    """
+    deltas = defaultdict(Counter)
+    for old_deck_id, old_status, new_deck_id, new_status in changes:
+        if (old_deck_id, old_status) == (new_deck_id, new_status):
+            continue
+        deltas[old_deck_id][old_status] -= 1
+        deltas[new_deck_id][new_status] += 1
+    _apply(deltas)
+
+
+# Signal receivers (see the module docstring)
+
+def deck_created(sender, instance, created, raw=False, **kwargs):
+    if created and not raw:
+        DeckCounter.objects.create(deck=instance)
+
+
+def _stored_state(card):
+    # Read from __dict__: touching a deferred field would cost a query
+    return card.__dict__.get("deck_id"), card.__dict__.get("status")
+
+
+def flashcard_loaded(sender, instance, **kwargs):
+    """post_init: remembers the deck and status the card was loaded with."""
+    if instance.pk is not None:
+        instance._counted_state = _stored_state(instance)
+
+
+def flashcard_saved(sender, instance, created, raw=False, update_fields=None, **kwargs):
+    if raw:
+        return
+    if update_fields is not None and not {"deck", "deck_id", "status"} & set(update_fields):
+        return
+    state = (instance.deck_id, instance.status)
+    old = getattr(instance, "_counted_state", None)
+    if created:
+        record_created([instance])
+    elif old is None or None in old:
+        rebuild([instance.deck_id])  # saved without being loaded first: state unknown
+    else:
+        record_changes([(*old, *state)])
+    instance._counted_state = state
+
+
+def flashcard_deleted(sender, instance, origin=None, **kwargs):
+    # Deleting a deck or a user cascades to the cards and to the counter rows
+    if isinstance(origin, Flashcard) or (isinstance(origin, QuerySet) and origin.model is Flashcard):
+        deck_id, status = getattr(instance, "_counted_state", None) or (instance.deck_id, instance.status)
+        _apply({deck_id: Counter({status: -1})})
@@ -0,0 +1,172 @@
+"""
+Deck import and export (CSV, JSON, Anki-style TSV).
+
+Imports read the uploaded file as a stream (Django spools large uploads to
+disk), validate rows in batches and insert each valid batch with one
+bulk_create. Exports stream rows straight from a server-side iterator, so
+neither side ever holds the whole deck in memory.
+"""
+import codecs
+import csv
+import json
+import re
+
+from django.db import transaction
+
+from ..serializer import FlashcardImportRowSerializer
+from .flashcards import bulk_create_flashcards
+from .json_stream import JSONObjectStream
+
+FORMATS = ("csv", "tsv", "json")
+CONTENT_TYPES = {
+    "csv": "text/csv",
+    "tsv": "text/tab-separated-values",
+    "json": "application/json",
+}
+BATCH_SIZE = 500
+MAX_ROWS = 50_000
+MAX_REPORTED_ERRORS = 1000
+READ_SIZE = 64 * 1024
+ANKI_HEADER = re.compile(r"#[^\t:]+:[^\t]*$")  # #separator:tab, #html:false...
+
+
+class DeckImportError(ValueError):
+    pass
+
+
+def detect_format(filename, requested=None):
+    if requested:
+        fmt = requested.lower()
+    else:
+        extension = filename.rsplit(".", 1)[-1].lower() if "." in filename else ""
+        fmt = {"txt": "tsv"}.get(extension, extension)
+    if fmt not in FORMATS:
+        raise DeckImportError(f"Unsupported format. Use one of: {', '.join(FORMATS)}.")
+    return fmt
+
+
+def _text_lines(uploaded_file):
+    # Django's File yields bytes lines (endings kept), decoded incrementally
+    return codecs.iterdecode(uploaded_file, "utf-8-sig")
+
+
+def _without_anki_headers(lines):
+    """Drops the leading #key:value lines of an Anki TSV export; card lines are never touched."""
+    lines = iter(lines)
+    for line in lines:
+        if not ANKI_HEADER.match(line):
+            yield line
+            break
+    yield from lines
+
+
+def _delimited_rows(uploaded_file, delimiter):
+    """
+    Yields (row_number, {"front", "back"}) from CSV/TSV. A TSV file may start
+    with Anki headers (#separator:tab, #html:false...), which are skipped.
+    An optional "front,back" header row is detected and skipped.
+    """
+    lines = _text_lines(uploaded_file)
+    if delimiter == "\t":
+        lines = _without_anki_headers(lines)
+    for number, row in enumerate(csv.reader(lines, delimiter=delimiter), start=1):
+        if not row or not any(cell.strip() for cell in row):
+            continue
+        if number == 1 and [cell.strip().lower() for cell in row[:2]] == ["front", "back"]:
+            continue
+        yield number, {"front": row[0] if row else "", "back": row[1] if len(row) > 1 else ""}
+
+
+def _json_rows(uploaded_file):
+    """Yields (row_number, object) from a JSON array of objects, without loading it whole."""
+    decoder = codecs.getincrementaldecoder("utf-8-sig")()
+    parser = JSONObjectStream()
+    number = 0
+    for block in iter(lambda: uploaded_file.read(READ_SIZE), b""):
+        for obj, raw in parser.feed(decoder.decode(block)):
+            number += 1
+            yield number, obj if raw is None else {"_invalid": raw}
+    if parser.pending:
+        yield number + 1, {"_invalid": parser.pending}
+
+
+def read_rows(uploaded_file, fmt):
+    if fmt == "json":
+        return _json_rows(uploaded_file)
+    return _delimited_rows(uploaded_file, "\t" if fmt == "tsv" else ",")
+
+
+def import_flashcards(deck, uploaded_file, fmt):
+    """
+    Imports every valid row into the deck. Returns
+    {"created": n, "error_count": n, "errors": [{"row": n, "errors": {...}}]}.
+    Only the first MAX_REPORTED_ERRORS errors are listed.
+    """
+    report = {"created": 0, "error_count": 0, "errors": []}
+
+    def add_error(number, errors):
+        report["error_count"] += 1
+        if len(report["errors"]) < MAX_REPORTED_ERRORS:
+            report["errors"].append({"row": number, "errors": errors})
+
+    def flush(batch):
+        serializer = FlashcardImportRowSerializer(data=[row for _, row in batch], many=True)
+        serializer.is_valid(raise_exception=True)
+        valid = []
+        for (number, _), item in zip(batch, serializer.validated_data):
+            if item["errors"]:
+                add_error(number, item["errors"])
+            else:
+                valid.append(item["data"])
+        report["created"] += len(bulk_create_flashcards(deck, valid, batch_size=BATCH_SIZE))
+
+    with transaction.atomic():
+        batch = []
+        total = 0
+        try:
+            for number, row in read_rows(uploaded_file, fmt):
+                total += 1
+                if total > MAX_ROWS:
+                    raise DeckImportError(f"Files are limited to {MAX_ROWS} rows.")
+                if not isinstance(row, dict) or "_invalid" in row:
+                    add_error(number, {"non_field_errors": ["Malformed row."]})
+                    continue
+                batch.append((number, row))
+                if len(batch) == BATCH_SIZE:
+                    flush(batch)
+                    batch = []
+        except (UnicodeDecodeError, csv.Error) as exc:
+            raise DeckImportError(f"Could not read the file: {exc}")
+        if batch:
+            flush(batch)
+
+    return report
+
+
+class _Echo:
+    """File-like object whose write() returns the line, for csv.writer."""
+
+    def write(self, value):
+        return value
+
+
+def export_rows(deck, fmt):
+    """Generator of text blocks for the deck's cards in the given format."""
+    cards = deck.flashcards.order_by("id").values_list("front", "back").iterator(chunk_size=2000)
+
+    if fmt == "json":
+        yield "["
+        first = True
+        for front, back in cards:
+            yield ("\n" if first else ",\n") + json.dumps({"front": front, "back": back}, ensure_ascii=False)
+            first = False
+        yield "\n]\n"
+        return
+
+    writer = csv.writer(_Echo(), delimiter="\t" if fmt == "tsv" else ",")
+    if fmt == "tsv":
+        yield "#separator:tab\n#html:false\n"
+    else:
+        yield writer.writerow(["front", "back"])
+    for front, back in cards:
+        yield writer.writerow([front, back])
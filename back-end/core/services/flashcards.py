@@ -0,0 +1,56 @@
+"""
+Flashcard queries and writes shared by the sync (DRF) and async views,
+deck import and AI generation.
+"""
+from django.db import transaction
+
+from ..models import Flashcard
+from . import deck_counters
+from .forecast import invalidate_forecast
+
+
+def build_flashcards(deck, cards):
+    """Unsaved Flashcard instances for {"front", "back"} dicts, owner filled in."""
+    return [
+        Flashcard(deck=deck, user_id=deck.user_id, front=card["front"], back=card["back"])
+        for card in cards
+    ]
+
+
+def bulk_create_flashcards(deck, cards, batch_size=500):
+    """
+    Inserts the cards into the deck with bulk_create and updates the
+    deck counters. The caller owns the transaction and ownership checks.
+    Returns the created flashcards (with ids).
+    """
+    created = Flashcard.objects.bulk_create(build_flashcards(deck, cards), batch_size=batch_size)
+    if created:
+        deck_counters.record_created(created)
+        invalidate_forecast(deck.user_id)
+    return created
+
+
+def due_queue(user, now, deck_id=None):
+    """
+    The user's study queue as (new, [due...]): the NEW cards, and the
+    learning and review cards that are due, one queryset per status.
+    DueQueueKeyset pages through the parts in that order. Each part filters
+    the denormalized owner and one status, so it reads a single range of
+    flashcard_new_queue_idx or flashcard_due_queue_idx.
+    """
+    cards = Flashcard.objects.filter(user=user)
+    if deck_id:
+        cards = cards.filter(deck_id=deck_id)
+    new = cards.filter(status=Flashcard.Status.NEW)
+    due = [
+        cards.filter(status=status, due_date__lte=now)
+        for status in (Flashcard.Status.LEARNING, Flashcard.Status.REVIEW)
+    ]
+    return new, due
+
+
+def save_review(flashcard):
+    """Saves a card scheduled by apply_review (its deck counters follow through post_save)."""
+    with transaction.atomic():
+        flashcard.save()
+    invalidate_forecast(flashcard.user_id)
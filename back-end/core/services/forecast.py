@@ -0,0 +1,140 @@
+"""
+Workload forecast: how many reviews come due each day.
+
+Two modes:
+- "due": histogram of the current due_date values, one aggregated query.
+- "simulate": also projects the follow-up reviews inside the window by running
+  the scheduler forward, assuming every review is answered "good".
+
+Results are cached per user. The cache key embeds the user's
+ForecastVersion, which `invalidate_forecast` bumps whenever their cards
+change. The version lives in the database, so a write through any worker
+invalidates the forecasts cached by every worker; the forecasts themselves
+never change under a given version, so each worker can keep them in its own
+(per-process) cache.
+"""
+from collections import Counter
+from datetime import datetime, time, timedelta
+
+from django.core.cache import cache
+from django.db.models import Count, F, Q
+from django.db.models.functions import TruncDate
+from django.utils import timezone
+
+from ..models import Flashcard, ForecastVersion
+from ..scheduling import GOOD, next_states
+
+FORECAST_MODES = ("due", "simulate")
+MAX_FORECAST_DAYS = 365
+CACHE_TTL = 60 * 60
+
+
+def _version(user_id):
+    return ForecastVersion.objects.filter(user_id=user_id).values_list("version", flat=True).first() or 0
+
+
+def invalidate_forecast(user_id):
+    """Drops every cached forecast of the user, in every worker (one UPDATE)."""
+    versions = ForecastVersion.objects.filter(user_id=user_id)
+    if not versions.update(version=F("version") + 1):
+        _, created = ForecastVersion.objects.get_or_create(user_id=user_id, defaults={"version": 1})
+        if not created:  # another writer created the row meanwhile
+            versions.update(version=F("version") + 1)
+
+
+def get_forecast(user, days=30, deck_id=None, mode="due"):
+    today = timezone.localdate()
+    version = _version(user.id)
+    key = f"forecast:{user.id}:{version}:{today.isoformat()}:{days}:{deck_id or ''}:{mode}"
+
+    forecast = cache.get(key)
+    if forecast is None:
+        queryset = Flashcard.objects.filter(user=user)
+        if deck_id:
+            queryset = queryset.filter(deck_id=deck_id)
+        forecast = build_forecast(queryset, today, days, mode)
+        cache.set(key, forecast, CACHE_TTL)
+    return forecast
+
+
+def build_forecast(queryset, start, days, mode="due"):
+    """
+    Returns {"start", "days", "mode", "new", "overdue", "forecast": [{"date", "reviews"}]}.
+    Overdue cards are due before `start`; new cards have no due_date yet.
+    """
+    tz = timezone.get_current_timezone()
+    start_at = timezone.make_aware(datetime.combine(start, time.min), tz)
+    end_at = start_at + timedelta(days=days)
+
+    if mode == "simulate":
+        new, overdue, counts = _simulate(queryset, start, start_at, end_at, days)
+    else:
+        new, overdue, counts = _histogram(queryset, start, start_at, end_at)
+
+    return {
+        "start": start.isoformat(),
+        "days": days,
+        "mode": mode,
+        "new": new,
+        "overdue": overdue,
+        "forecast": [
+            {"date": (start + timedelta(days=offset)).isoformat(), "reviews": counts.get(offset, 0)}
+            for offset in range(days)
+        ],
+    }
+
+
+def _histogram(queryset, start, start_at, end_at):
+    rows = (
+        queryset.filter(Q(due_date__lt=end_at) | Q(due_date__isnull=True))
+        .annotate(day=TruncDate("due_date"))
+        .values("day")
+        .annotate(reviews=Count("id"))
+    )
+
+    new = overdue = 0
+    counts = {}
+    for row in rows:
+        if row["day"] is None:
+            new += row["reviews"]
+        elif row["day"] < start:
+            overdue += row["reviews"]
+        else:
+            counts[(row["day"] - start).days] = row["reviews"]
+    return new, overdue, counts
+
+
+def _simulate(queryset, start, start_at, end_at, days):
+    new = queryset.filter(due_date__isnull=True).count()
+    cards = list(
+        queryset.filter(due_date__lt=end_at).values_list(
+            "interval", "ease_factor", "streak", "lapses", "status", "due_date"
+        )
+    )
+    overdue = sum(1 for card in cards if card[5] < start_at)
+
+    # Cards waiting on each day offset; overdue cards are reviewed on day 0
+    pending = {}
+    for interval, ease, streak, lapses, status, due_date in cards:
+        offset = max(0, (timezone.localdate(due_date) - start).days)
+        pending.setdefault(offset, []).append((interval, float(ease), streak, lapses, status))
+
+    counts = Counter()
+    for offset in range(days):
+        due = pending.pop(offset, None)
+        if not due:
+            continue
+        counts[offset] = len(due)
+
+        result = next_states(*zip(*due), [GOOD] * len(due))
+        for i in range(len(due)):
+            next_offset = offset + max(1, int(result.due_in_minutes[i]) // (24 * 60))
+            if next_offset < days:
+                pending.setdefault(next_offset, []).append((
+                    int(result.interval[i]),
+                    float(result.ease_factor[i]),
+                    int(result.streak[i]),
+                    int(result.lapses[i]),
+                    str(result.status[i]),
+                ))
+    return new, overdue, counts
@@ -0,0 +1,60 @@
+"""
+Incremental extraction of JSON objects from a streamed text.
+
+LLM output arrives token by token, e.g. `[{"front": "a", "ba` ... `ck": "b"}, {`.
+`JSONObjectStream` is fed those fragments and returns every top-level
+`{...}` object as soon as its closing brace arrives. Brackets, commas,
+code fences or chatter around the objects are ignored, and an object that
+fails to parse is reported without losing the ones around it.
+"""
+import json
+
+
+class JSONObjectStream:
+
+    def __init__(self):
+        self._buffer = []      # characters of the object being read
+        self._depth = 0
+        self._in_string = False
+        self._escaped = False
+
+    def feed(self, text):
+        """
+        Consumes a fragment. Returns a list of (obj, None) for parsed objects
+        and (None, raw) for objects that were complete but invalid JSON.
+        """
+        results = []
+        for char in text:
+            if self._depth == 0:
+                if char == "{":
+                    self._depth = 1
+                    self._buffer = [char]
+                continue
+
+            self._buffer.append(char)
+            if self._in_string:
+                if self._escaped:
+                    self._escaped = False
+                elif char == "\\":
+                    self._escaped = True
+                elif char == '"':
+                    self._in_string = False
+            elif char == '"':
+                self._in_string = True
+            elif char == "{":
+                self._depth += 1
+            elif char == "}":
+                self._depth -= 1
+                if self._depth == 0:
+                    raw = "".join(self._buffer)
+                    self._buffer = []
+                    try:
+                        results.append((json.loads(raw), None))
+                    except ValueError:
+                        results.append((None, raw))
+        return results
+
+    @property
+    def pending(self):
+        """Text of an object that was started but never closed."""
+        return "".join(self._buffer) if self._depth else ""
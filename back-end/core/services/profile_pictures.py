@@ -0,0 +1,151 @@
+"""
+Profile picture uploads.
+
+`validate` rejects files over PROFILE_PICTURE_MAX_BYTES, formats other than
+JPEG/PNG/WebP and images outside the allowed dimensions, reading only the
+image header. `store` copies the upload to storage chunk by chunk (Django
+already spools large uploads to a temporary file) under a content-hashed
+name, so an identical picture is stored once and every URL can be cached
+forever. After the user row is committed, `schedule_thumbnails` renders
+square WebP thumbnails (PROFILE_THUMBNAIL_SIZES) in a worker thread pool and
+records their names in `User.profile_thumbnails`.
+
+With settings.PROFILE_THUMBNAILS_EAGER the thumbnails are rendered inline
+when the transaction commits (tests, local development).
+"""
+import hashlib
+import io
+import logging
+import threading
+from concurrent.futures import ThreadPoolExecutor
+from pathlib import PurePosixPath
+
+from django.conf import settings
+from django.core.exceptions import ValidationError
+from django.core.files.base import ContentFile
+from django.core.files.storage import default_storage
+from django.db import connection, transaction
+from PIL import Image, ImageOps, UnidentifiedImageError
+
+from ..models import User
+
+logger = logging.getLogger(__name__)
+
+UPLOAD_DIR = "profiles/"
+THUMBNAIL_DIR = "profiles/thumbs/"
+FORMATS = {"JPEG": "jpg", "PNG": "png", "WEBP": "webp"}
+
+_executor = None
+_executor_lock = threading.Lock()
+
+
+def get_executor():
+    global _executor
+    with _executor_lock:
+        if _executor is None:
+            _executor = ThreadPoolExecutor(
+                max_workers=settings.PROFILE_THUMBNAIL_WORKERS,
+                thread_name_prefix="thumbnail",
+            )
+        return _executor
+
+
+def validate(upload):
+    """Raises ValidationError unless the upload is an acceptable profile picture."""
+    if upload.size > settings.PROFILE_PICTURE_MAX_BYTES:
+        raise ValidationError(f"The picture must be at most {settings.PROFILE_PICTURE_MAX_BYTES // (1024 * 1024)} MB.")
+    try:
+        upload.seek(0)
+        with Image.open(upload) as image:
+            image_format, (width, height) = image.format, image.size
+    except (UnidentifiedImageError, Image.DecompressionBombError, OSError):
+        raise ValidationError("Upload a valid image.")
+    finally:
+        upload.seek(0)
+
+    if image_format not in FORMATS:
+        raise ValidationError("Only JPEG, PNG and WebP pictures are supported.")
+    if min(width, height) < settings.PROFILE_PICTURE_MIN_DIMENSION:
+        raise ValidationError(f"The picture must be at least {settings.PROFILE_PICTURE_MIN_DIMENSION} px wide and high.")
+    if max(width, height) > settings.PROFILE_PICTURE_MAX_DIMENSION:
+        raise ValidationError(f"The picture must be at most {settings.PROFILE_PICTURE_MAX_DIMENSION} px wide and high.")
+    return image_format
+
+
+def store(upload):
+    """Saves a validated upload as profiles/<sha256>.<ext> and returns the storage name."""
+    image_format = validate(upload)
+    digest = hashlib.sha256()
+    for chunk in upload.chunks():
+        digest.update(chunk)
+    upload.seek(0)
+
+    name = f"{UPLOAD_DIR}{digest.hexdigest()[:32]}.{FORMATS[image_format]}"
+    if not default_storage.exists(name):
+        name = default_storage.save(name, upload)
+    return name
+
+
+def thumbnail_name(source_name, size):
+    return f"{THUMBNAIL_DIR}{PurePosixPath(source_name).stem}-{size}.webp"
+
+
+def render_thumbnail(image, size):
+    thumbnail = ImageOps.fit(image, (size, size), Image.Resampling.LANCZOS)
+    buffer = io.BytesIO()
+    thumbnail.save(buffer, "WEBP", quality=settings.PROFILE_THUMBNAIL_QUALITY, method=4)
+    return buffer.getvalue()
+
+
+def generate_thumbnails(user_id, source_name):
+    """Renders the missing thumbnails of a stored picture and records them on the user."""
+    sizes = sorted(settings.PROFILE_THUMBNAIL_SIZES)
+    thumbnails = {}
+    with default_storage.open(source_name) as file, Image.open(file) as image:
+        # JPEGs are decoded at the smallest scale that is still large enough
+        image.draft("RGB", (sizes[-1] * 2, sizes[-1] * 2))
+        image = ImageOps.exif_transpose(image)
+        if image.mode not in ("RGB", "RGBA"):
+            image = image.convert("RGBA" if "A" in image.getbands() else "RGB")
+        for size in sizes:
+            name = thumbnail_name(source_name, size)
+            if not default_storage.exists(name):
+                name = default_storage.save(name, ContentFile(render_thumbnail(image, size)))
+            thumbnails[str(size)] = name
+
+    # Only if the picture was not replaced meanwhile
+    User.objects.filter(pk=user_id, profile_picture=source_name).update(profile_thumbnails=thumbnails)
+    return thumbnails
+
+
+def schedule_thumbnails(user):
+    """Generates the user's thumbnails once the current transaction commits."""
+    user_id, source_name = user.pk, user.profile_picture.name
+    transaction.on_commit(lambda: _dispatch(user_id, source_name))
+
+
+def _dispatch(user_id, source_name):
+    if settings.PROFILE_THUMBNAILS_EAGER:
+        generate_thumbnails(user_id, source_name)
+    else:
+        get_executor().submit(_worker, user_id, source_name)
+
+
+def _worker(user_id, source_name):
+    try:
+        generate_thumbnails(user_id, source_name)
+    except Exception:
+        logger.exception("Thumbnail generation failed for %s", source_name)
+    finally:
+        # Worker threads own their DB connection; don't leak it
+        connection.close()
+
+
+def picture_urls(user):
+    """{"original": url, "<size>": url, ...} with the thumbnails generated so far."""
+    if not user.profile_picture:
+        return {}
+    urls = {"original": user.profile_picture.url}
+    for size, name in sorted(user.profile_thumbnails.items(), key=lambda item: int(item[0])):
+        urls[size] = default_storage.url(name)
+    return urls
@@ -0,0 +1,132 @@
+"""
+Synthetic data for benchmarks and local load testing.
+
+Creates users × decks × flashcards with bulk_create and a realistic spread of
+study states: a third of the cards never studied, most in review with due
+dates scattered over the next month (a slice of them overdue), a few in
+learning or lapsed due within the hour. Output is deterministic for a given
+random seed, so benchmark runs are comparable.
+"""
+import random
+from datetime import timedelta
+from decimal import Decimal
+
+from django.contrib.auth.hashers import make_password
+from django.db import transaction
+from django.utils import timezone
+
+from ..models import Deck, Flashcard, User
+from . import deck_counters
+
+EMAIL_DOMAIN = "memorise.test"
+DEFAULT_PASSWORD = "benchmark-password"
+
+STATUS_WEIGHTS = {
+    Flashcard.Status.NEW: 30,
+    Flashcard.Status.LEARNING: 10,
+    Flashcard.Status.REVIEW: 55,
+    Flashcard.Status.LAPSED: 5,
+}
+
+WORDS = (
+    "célula mitocondria ribosoma núcleo enzima proteína átomo molécula energía fuerza "
+    "velocidad masa ecuación derivada integral vector matriz algoritmo función variable "
+    "historia imperio revolución tratado economía mercado inflación capital idioma verbo"
+).split()
+
+
+def seed_email(index):
+    return f"bench{index}@{EMAIL_DOMAIN}"
+
+
+def seeded_users():
+    return User.objects.filter(email__endswith=f"@{EMAIL_DOMAIN}")
+
+
+def _card_state(rng, now):
+    status = rng.choices(list(STATUS_WEIGHTS), weights=list(STATUS_WEIGHTS.values()))[0]
+    if status == Flashcard.Status.NEW:
+        return {"status": status}
+    if status == Flashcard.Status.REVIEW:
+        interval = rng.randint(1, 60)
+        return {
+            "status": status,
+            "interval": interval,
+            "ease_factor": Decimal(f"{rng.uniform(1.3, 3.0):.2f}"),
+            "streak": rng.randint(1, 12),
+            "lapses": rng.choices((0, 1, 2, 3), weights=(70, 20, 7, 3))[0],
+            # Mostly in the future, ~15% overdue by up to a few days
+            "due_date": now + timedelta(days=rng.triangular(-4, 30, 3)),
+            "last_reviewed": now - timedelta(days=interval),
+        }
+    return {
+        "status": status,
+        "streak": 0,
+        "lapses": rng.randint(1, 4) if status == Flashcard.Status.LAPSED else 0,
+        "due_date": now + timedelta(minutes=rng.uniform(-60, 60)),
+        "last_reviewed": now - timedelta(minutes=rng.uniform(1, 120)),
+    }
+
+
+def seed(users, decks_per_user, cards_per_deck, random_seed=0, password=DEFAULT_PASSWORD, batch_size=2000):
+    """
+    Creates the data and returns (users, decks, flashcards) counts.
+    Every user gets the same password (hashed once).
+    """
+    rng = random.Random(random_seed)
+    now = timezone.now()
+    password_hash = make_password(password)
+    start = seeded_users().count()
+
+    with transaction.atomic():
+        created_users = User.objects.bulk_create(
+            [
+                User(email=seed_email(i), username=f"bench{i}", password=password_hash)
+                for i in range(start, start + users)
+            ],
+            batch_size=batch_size,
+        )
+        decks = Deck.objects.bulk_create(
+            [
+                Deck(
+                    user=user,
+                    title=f"Deck {d + 1} de {user.username}",
+                    description=" ".join(rng.sample(WORDS, 5)),
+                    color=rng.choice(Deck.Color.values),
+                )
+                for user in created_users
+                for d in range(decks_per_user)
+            ],
+            batch_size=batch_size,
+        )
+
+        batch = []
+        total = 0
+        for deck in decks:
+            for c in range(cards_per_deck):
+                word = rng.choice(WORDS)
+                batch.append(Flashcard(
+                    deck=deck,
+                    user_id=deck.user_id,
+                    front=f"¿Qué es «{word}»? ({c + 1})",
+                    back=" ".join(rng.sample(WORDS, 8)),
+                    **_card_state(rng, now),
+                ))
+                if len(batch) == batch_size:
+                    Flashcard.objects.bulk_create(batch)
+                    total += len(batch)
+                    batch = []
+        if batch:
+            Flashcard.objects.bulk_create(batch)
+            total += len(batch)
+
+        deck_ids = [deck.id for deck in decks]
+        for i in range(0, len(deck_ids), 500):
+            deck_counters.rebuild(deck_ids[i:i + 500])
+
+    return len(created_users), len(decks), total
+
+
+def clear():
+    """Deletes every seeded user (and, by cascade, their decks and cards)."""
+    return seeded_users().delete()
@@ -0,0 +1,147 @@
+"""
+Incremental delta sync of decks and flashcards.
+
+The server hands out an opaque, signed change token holding a timestamp.
+A client sends it back on its next sync and only receives the decks and
+flashcards whose updated_at moved since then, plus tombstones for what was
+deleted. The token is taken a few seconds in the past so rows saved by
+transactions that were still committing are re-sent rather than missed;
+clients apply changes as idempotent upserts.
+
+A deck is re-sent whenever its counters may have moved: its own row, its
+counter row (cards created, deleted, moved or changing status) or one of
+its cards (a review moves due_now) changed since the token.
+
+Full snapshots are paged by flashcard id with the same token, which then
+also holds the last id sent; every page but the last has "more" set. The
+delta that follows a snapshot starts from the time its first page was
+taken, so nothing changed while it was being paged is lost.
+"""
+from collections import namedtuple
+from datetime import timedelta
+
+from django.conf import settings
+from django.core import signing
+from django.db.models import Q
+from django.utils import timezone
+from django.utils.dateparse import parse_datetime
+
+from ..models import Deck, Flashcard, Tombstone
+
+TOKEN_SALT = "core.sync"
+TOKEN_OVERLAP = timedelta(seconds=5)
+
+
+class InvalidSyncToken(Exception):
+    pass
+
+
+# `after`: the last flashcard id sent, while a snapshot is being paged
+SyncCursor = namedtuple("SyncCursor", "since after", defaults=[None])
+SyncPage = namedtuple("SyncPage", "decks flashcards deleted full more token")
+
+
+def tombstone_retention():
+    return timedelta(days=getattr(settings, "SYNC_TOMBSTONE_RETENTION_DAYS", 30))
+
+
+def _dump(cursor):
+    payload = {"t": cursor.since.isoformat()}
+    if cursor.after is not None:
+        payload["a"] = cursor.after
+    return signing.dumps(payload, salt=TOKEN_SALT, compress=True)
+
+
+def issue_token(now):
+    return _dump(SyncCursor(now - TOKEN_OVERLAP))
+
+
+def read_token(token):
+    try:
+        payload = signing.loads(token, salt=TOKEN_SALT)
+        cursor = SyncCursor(parse_datetime(payload["t"]), payload.get("a"))
+    except (signing.BadSignature, KeyError, TypeError, ValueError):
+        raise InvalidSyncToken("Invalid sync token.")
+    if cursor.since is None or not isinstance(cursor.after, (int, type(None))):
+        raise InvalidSyncToken("Invalid sync token.")
+    return cursor
+
+
+def record_deletions(user, kind, object_ids):
+    """Writes one tombstone per deleted object (call next to the delete)."""
+    now = timezone.now()
+    Tombstone.objects.bulk_create(
+        [Tombstone(user=user, kind=kind, object_id=object_id, deleted_at=now) for object_id in object_ids],
+        batch_size=1000,
+    )
+
+
+def record_deck_deletion(user, deck):
+    """
+    Tombstones a deck and the flashcards its deletion cascades to, so clients
+    never have to infer cascades themselves. Call before deleting the deck.
+    """
+    card_ids = list(deck.flashcards.values_list("id", flat=True))
+    record_deletions(user, Tombstone.Kind.DECK, [deck.id])
+    record_deletions(user, Tombstone.Kind.FLASHCARD, card_ids)
+
+
+def changes_since(user, cursor=None, now=None):
+    """
+    Returns the SyncPage that answers `cursor` (None on a first sync).
+
+    Without a cursor, or when it is older than the tombstone retention
+    window (tombstones may have been pruned), a full snapshot starts and
+    `full` is True on its first page: the client must replace its cache.
+    """
+    now = now or timezone.now()
+    decks = Deck.objects.filter(user=user)
+    flashcards = Flashcard.objects.filter(user=user)
+    deleted = {Tombstone.Kind.DECK.value: [], Tombstone.Kind.FLASHCARD.value: []}
+
+    if cursor is None or cursor.since < now - tombstone_retention():
+        return _snapshot_page(decks.order_by("id"), flashcards, deleted, SyncCursor(now - TOKEN_OVERLAP, 0), True)
+    if cursor.after is not None:
+        return _snapshot_page(decks.none(), flashcards, deleted, cursor, False)
+
+    since = cursor.since
+    tombstones = Tombstone.objects.filter(user=user, deleted_at__gte=since).values_list("kind", "object_id")
+    for kind, object_id in tombstones:
+        deleted[kind].append(object_id)
+
+    changed_cards = flashcards.filter(updated_at__gte=since)
+    changed_decks = decks.filter(
+        Q(updated_at__gte=since)
+        | Q(counters__updated_at__gte=since)
+        | Q(id__in=changed_cards.values("deck_id"))
+    )
+    return SyncPage(
+        changed_decks.order_by("updated_at", "id"),
+        changed_cards.order_by("updated_at", "id"),
+        deleted,
+        False,
+        False,
+        issue_token(now),
+    )
+
+
+def _snapshot_page(decks, flashcards, deleted, cursor, full):
+    """One page of a full snapshot: the flashcards after cursor.after, by id."""
+    size = getattr(settings, "SYNC_SNAPSHOT_PAGE_SIZE", 1000)
+    page = list(flashcards.filter(id__gt=cursor.after).order_by("id")[:size + 1])
+    more = len(page) > size
+    page = page[:size]
+    # The last page hands over to deltas from the time the snapshot started
+    token = _dump(cursor._replace(after=page[-1].id if more else None))
+    return SyncPage(decks, page, deleted, full, more, token)
+
+
+def prune_tombstones(batch_size=5000):
+    """Deletes tombstones older than the retention window, in batches."""
+    cutoff = timezone.now() - tombstone_retention()
+    removed = 0
+    while True:
+        ids = list(Tombstone.objects.filter(deleted_at__lt=cutoff).values_list("id", flat=True)[:batch_size])
+        if not ids:
+            return removed
+        removed += Tombstone.objects.filter(id__in=ids).delete()[0]
@@ -0,0 +1,178 @@
+"""
+Refresh token blacklist with an in-memory front.
+
+simplejwt's token_blacklist app stores every issued refresh token
+(OutstandingToken) and every rotated/revoked one (BlacklistedToken), and by
+default checks the blacklist table on every refresh. Here each process keeps:
+
+- a Bloom filter of blacklisted JTIs: a refresh whose JTI is not in it (the
+  normal case) is accepted without touching the blacklist table; a "maybe"
+  is confirmed with one indexed query. The filter is built from the
+  unexpired rows on first use and picks up rows blacklisted by other
+  workers incrementally (id > last seen) at most every
+  TOKEN_BLACKLIST_SYNC_SECONDS; tokens blacklisted by this process are
+  added immediately. 0 syncs on every check.
+- an LRU of the OutstandingToken ids it issued, so rotating a token does not
+  have to look its row up again.
+
+`prune_expired` (manage.py prune_tokens) deletes expired rows in batches; run
+it periodically so the tables only hold tokens that could still be used.
+"""
+import hashlib
+import math
+import threading
+import time
+from collections import OrderedDict
+
+from django.conf import settings
+from django.db import IntegrityError, transaction
+from django.utils import timezone
+from rest_framework_simplejwt.settings import api_settings
+from rest_framework_simplejwt.token_blacklist.models import BlacklistedToken, OutstandingToken
+from rest_framework_simplejwt.utils import datetime_from_epoch
+
+
+class BloomFilter:
+    """Fixed-size Bloom filter of strings (double hashing over one BLAKE2b digest)."""
+
+    def __init__(self, capacity, error_rate=0.001):
+        self.capacity = max(capacity, 1)
+        self.size = max(8, math.ceil(-self.capacity * math.log(error_rate) / math.log(2) ** 2))
+        self.hashes = max(1, round(self.size / self.capacity * math.log(2)))
+        self.count = 0
+        self._bits = bytearray((self.size + 7) // 8)
+
+    def _positions(self, value):
+        digest = hashlib.blake2b(value.encode("utf-8"), digest_size=16).digest()
+        h1 = int.from_bytes(digest[:8], "little")
+        h2 = int.from_bytes(digest[8:], "little") | 1
+        return [(h1 + i * h2) % self.size for i in range(self.hashes)]
+
+    def add(self, value):
+        for position in self._positions(value):
+            self._bits[position >> 3] |= 1 << (position & 7)
+        self.count += 1
+
+    def __contains__(self, value):
+        return all(self._bits[position >> 3] & (1 << (position & 7)) for position in self._positions(value))
+
+
+class BlacklistIndex:
+    """Per-process front of the blacklist tables (see the module docstring)."""
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self._outstanding = OrderedDict()  # jti -> OutstandingToken id
+        self.reset()
+
+    def reset(self):
+        """Forgets everything; the filter is rebuilt from the database on next use."""
+        with self._lock:
+            self._bloom = None
+            self._watermark = 0
+            self._synced_at = 0.0
+            self._outstanding.clear()
+
+    def _load(self, queryset):
+        rows = queryset.order_by("id").values_list("id", "token__jti")
+        for row_id, jti in rows.iterator(chunk_size=5000):
+            self._bloom.add(jti)
+            self._watermark = row_id
+
+    def _sync(self):
+        now = time.monotonic()
+        if self._bloom is None or self._bloom.count > self._bloom.capacity:
+            unexpired = BlacklistedToken.objects.filter(token__expires_at__gt=timezone.now())
+            capacity = max(settings.TOKEN_BLACKLIST_BLOOM_CAPACITY, 2 * unexpired.count())
+            self._bloom = BloomFilter(capacity, settings.TOKEN_BLACKLIST_BLOOM_ERROR_RATE)
+            latest = BlacklistedToken.objects.order_by("-id").values_list("id", flat=True).first() or 0
+            self._load(unexpired.filter(id__lte=latest))
+            self._watermark = latest
+        elif now - self._synced_at >= settings.TOKEN_BLACKLIST_SYNC_SECONDS:
+            self._load(BlacklistedToken.objects.filter(id__gt=self._watermark))
+        else:
+            return
+        self._synced_at = now
+
+    def is_blacklisted(self, jti):
+        with self._lock:
+            self._sync()
+            maybe = jti in self._bloom
+        # Bloom filters have false positives, never false negatives
+        return maybe and BlacklistedToken.objects.filter(token__jti=jti).exists()
+
+    def add(self, jti):
+        with self._lock:
+            if self._bloom is not None:
+                self._bloom.add(jti)
+
+    def remember_outstanding(self, jti, token_id):
+        with self._lock:
+            self._outstanding[jti] = token_id
+            self._outstanding.move_to_end(jti)
+            while len(self._outstanding) > settings.TOKEN_BLACKLIST_LRU_SIZE:
+                self._outstanding.popitem(last=False)
+
+    def outstanding_id(self, jti):
+        with self._lock:
+            token_id = self._outstanding.pop(jti, None)
+        if token_id is None:
+            token_id = OutstandingToken.objects.filter(jti=jti).values_list("id", flat=True).first()
+        return token_id
+
+
+index = BlacklistIndex()
+
+
+def _outstanding_fields(token):
+    return {
+        "user_id": token.get(api_settings.USER_ID_CLAIM),
+        "token": str(token),
+        "created_at": token.current_time,
+        "expires_at": datetime_from_epoch(token["exp"]),
+    }
+
+
+def outstand(token):
+    """Records a newly issued refresh token (one INSERT, no user lookup)."""
+    jti = token[api_settings.JTI_CLAIM]
+    outstanding = OutstandingToken.objects.create(jti=jti, **_outstanding_fields(token))
+    index.remember_outstanding(jti, outstanding.id)
+    return outstanding
+
+
+def blacklist(token):
+    """
+    Blacklists a refresh token. Returns False when it already was, which is
+    how the loser of two concurrent refreshes with the same token finds out.
+    """
+    jti = token[api_settings.JTI_CLAIM]
+    token_id = index.outstanding_id(jti)
+    if token_id is None:
+        # Issued before the blacklist was enabled: record it first
+        outstanding, _ = OutstandingToken.objects.get_or_create(jti=jti, defaults=_outstanding_fields(token))
+        _, created = BlacklistedToken.objects.get_or_create(token=outstanding)
+    else:
+        try:
+            with transaction.atomic():
+                BlacklistedToken.objects.create(token_id=token_id)
+            created = True
+        except IntegrityError:
+            created = False
+    index.add(jti)
+    return created
+
+
+def prune_expired(batch_size=5000):
+    """Deletes expired outstanding tokens (and their blacklist rows) in batches."""
+    now = timezone.now()
+    removed = 0
+    while True:
+        ids = list(OutstandingToken.objects.filter(expires_at__lte=now).values_list("id", flat=True)[:batch_size])
+        if not ids:
+            break
+        BlacklistedToken.objects.filter(token_id__in=ids).delete()
+        removed += OutstandingToken.objects.filter(id__in=ids).delete()[0]
+    # Rebuilt without the expired JTIs on next use
+    index.reset()
+    return removed
@@ -0,0 +1,60 @@
+"""
+Static files storage: ManifestStaticFilesStorage (content-hashed names, e.g.
+admin/css/base.6b517d0d5813.css) that also writes precompressed .gz and .br
+siblings of every compressible file at collectstatic time, so core/files.py
+can serve them without compressing anything per request.
+"""
+import gzip
+import os
+from concurrent.futures import ThreadPoolExecutor
+
+from django.contrib.staticfiles.storage import ManifestStaticFilesStorage
+
+try:
+    import brotli
+except ImportError:  # pragma: no cover - brotli is optional
+    brotli = None
+
+COMPRESSIBLE_EXTENSIONS = {
+    ".css", ".js", ".mjs", ".map", ".json", ".svg", ".html", ".txt", ".xml", ".ico", ".ttf", ".otf", ".eot",
+}
+MIN_COMPRESS_SIZE = 256  # bytes; smaller files are not worth a second request path
+MIN_SAVING = 0.05        # keep a variant only if it is at least 5% smaller
+
+
+def compressed_variants(data):
+    """{suffix: bytes} of the encodings worth keeping for this content."""
+    variants = {".gz": gzip.compress(data, compresslevel=9, mtime=0)}
+    if brotli is not None:
+        variants[".br"] = brotli.compress(data, quality=11)
+    return {suffix: body for suffix, body in variants.items() if len(body) <= len(data) * (1 - MIN_SAVING)}
+
+
+class CompressedManifestStaticFilesStorage(ManifestStaticFilesStorage):
+
+    def post_process(self, paths, dry_run=False, **options):
+        yield from super().post_process(paths, dry_run, **options)
+        if dry_run:
+            return
+        names = {*paths, *self.hashed_files.values()}
+        targets = sorted(name for name in names if self._compressible(name))
+        # zlib and brotli release the GIL, so this scales with the cores
+        with ThreadPoolExecutor() as executor:
+            for name, written in zip(targets, executor.map(self._compress, targets)):
+                for compressed_name in written:
+                    yield name, compressed_name, True
+
+    def _compressible(self, name):
+        if os.path.splitext(name)[1].lower() not in COMPRESSIBLE_EXTENSIONS or not self.exists(name):
+            return False
+        return self.size(name) >= MIN_COMPRESS_SIZE
+
+    def _compress(self, name):
+        with self.open(name) as file:
+            data = file.read()
+        written = []
+        for suffix, body in compressed_variants(data).items():
+            with open(self.path(name + suffix), "wb") as file:
+                file.write(body)
+            written.append(name + suffix)
+        return written
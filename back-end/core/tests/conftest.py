@@ -84,4 +84,54 @@ def get_token(create_user):
 @pytest.fixture
 def create_deck(create_user):
     deck = Deck.objects.create(user=create_user, title="Test Deck", color="#3B82F6")
-    return deck
\ No newline at end of file
+    return deck
+
+@pytest.fixture(autouse=True)
+def clear_cache():
+    """
+    Clears Django's cache, the in-process AI response cache, the JWT user
+    cache and the token blacklist front around every test so cached results
+    never leak between tests.
+    """
+    from django.core.cache import cache
+    from core.authentication import user_cache
+    from core.services import ai_cache, token_blacklist
+    cache.clear()
+    ai_cache.clear_memory()
+    ai_cache.stats.reset()
+    user_cache.clear()
+    token_blacklist.index.reset()
+    yield
+    cache.clear()
+    ai_cache.clear_memory()
+    user_cache.clear()
+    token_blacklist.index.reset()
+
+
+@pytest.fixture
+def fake_llm(settings):
+    """
+    Routes AI generation to the offline FakeLLMClient and runs
+    AI jobs inline when their transaction commits.
+    """
+    settings.AI_LLM_CLIENT = "core.services.ai_service.FakeLLMClient"
+    settings.AI_JOBS_EAGER = True
+    from core.services.ai_service import get_llm_client
+    return get_llm_client()
+
+
+@pytest.fixture
+def count_queries():
+    """
+    Returns count(func) -> (func(), number of SQL queries it ran).
+    Used by the query budget suite (test_query_budgets.py).
+    """
+    from django.db import connection
+    from django.test.utils import CaptureQueriesContext
+
+    def count(func):
+        with CaptureQueriesContext(connection) as queries:
+            result = func()
+        return result, len(queries)
+
+    return count
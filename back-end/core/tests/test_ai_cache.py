@@ -0,0 +1,83 @@
+import pytest
+from datetime import timedelta
+from django.utils import timezone
+from core.models import AIResponseCache
+from core.services import ai_cache
+from core.services.ai_service import InvalidAIResponse, generate_flashcards
+
+
+class CountingLLMClient:
+    calls = 0
+
+    def complete(self, messages, model, temperature):
+        CountingLLMClient.calls += 1
+        return '[{"front": "¿2+2?", "back": "4"}]'
+
+
+@pytest.fixture
+def counting_llm(settings):
+    settings.AI_LLM_CLIENT = "core.tests.test_ai_cache.CountingLLMClient"
+    CountingLLMClient.calls = 0
+    return CountingLLMClient
+
+
+@pytest.mark.django_db
+def test_same_normalized_text_is_served_from_cache(counting_llm):
+    first = generate_flashcards("Suma  básica\n de números")
+    second = generate_flashcards("  Suma básica de números ")
+
+    assert counting_llm.calls == 1
+    assert (first.cached, second.cached) == (False, True)
+    assert second.flashcards == first.flashcards
+    assert ai_cache.stats.snapshot()["memory_hits"] == 1
+
+
+@pytest.mark.django_db
+def test_database_tier_survives_process_cache_loss(counting_llm):
+    generate_flashcards("texto")
+    ai_cache.clear_memory()  # e.g. another worker process
+
+    assert generate_flashcards("texto").cached is True
+    assert counting_llm.calls == 1
+    snapshot = ai_cache.stats.snapshot()
+    assert (snapshot["db_hits"], snapshot["misses"]) == (1, 1)
+    assert AIResponseCache.objects.get().hits == 1
+
+
+@pytest.mark.django_db
+def test_invalid_responses_are_not_cached(settings):
+    settings.AI_LLM_CLIENT = "core.tests.test_ai_jobs.BrokenLLMClient"
+
+    with pytest.raises(InvalidAIResponse):
+        generate_flashcards("texto")
+    assert AIResponseCache.objects.count() == 0
+
+
+def test_key_depends_on_model_prompt_and_temperature():
+    base = ai_cache.cache_key("texto", "gpt-4o-mini", "2:3", 0.7)
+    assert base == ai_cache.cache_key(" texto ", "gpt-4o-mini", "2:3", 0.7)
+    assert base != ai_cache.cache_key("texto", "gpt-4o", "2:3", 0.7)
+    assert base != ai_cache.cache_key("texto", "gpt-4o-mini", "3:3", 0.7)
+    assert base != ai_cache.cache_key("texto", "gpt-4o-mini", "2:3", 0.2)
+
+
+def test_memory_tier_evicts_least_recently_used():
+    cache = ai_cache.LRUCache(maxsize=2, ttl=60)
+    cache.set("a", 1)
+    cache.set("b", 2)
+    cache.get("a")
+    assert cache.set("c", 3) == 1
+    assert cache.get("b") is None
+    assert cache.get("a") == 1
+
+
+@pytest.mark.django_db
+def test_prune_drops_expired_and_overflowing_rows(settings):
+    settings.AI_CACHE_DB_MAX_ENTRIES = 1
+    now = timezone.now()
+    AIResponseCache.objects.create(key="expired", response="[]", expires_at=now - timedelta(seconds=1))
+    AIResponseCache.objects.create(key="old", response="[]", expires_at=now + timedelta(days=1), last_used_at=now - timedelta(days=1))
+    AIResponseCache.objects.create(key="recent", response="[]", expires_at=now + timedelta(days=1))
+
+    assert ai_cache.prune() == 2
+    assert list(AIResponseCache.objects.values_list("key", flat=True)) == ["recent"]
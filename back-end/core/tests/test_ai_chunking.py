@@ -0,0 +1,145 @@
+import asyncio
+import threading
+import time
+
+import pytest
+
+from core.services import chunking
+from core.services.ai_service import _plan, agenerate_flashcards, generate_flashcards
+
+
+class SlowLLMClient:
+    """Answers after a delay, recording how many calls overlap."""
+    delay = 0.2
+    active = 0
+    peak = 0
+    lock = threading.Lock()
+
+    def complete(self, messages, model, temperature):
+        with SlowLLMClient.lock:
+            SlowLLMClient.active += 1
+            SlowLLMClient.peak = max(SlowLLMClient.peak, SlowLLMClient.active)
+        time.sleep(self.delay)
+        with SlowLLMClient.lock:
+            SlowLLMClient.active -= 1
+        chunk = messages[-1]["content"].rsplit("Texto del usuario:", 1)[-1]
+        topic = chunk.split()[0].strip('"')
+        return (
+            f'[{{"front": "¿Qué es {topic}?", "back": "Un tema."}},'
+            f' {{"front": "¿Qué es el documento?", "back": "Un texto largo."}}]'
+        )
+
+
+class SlowAsyncLLMClient:
+    """Async SlowLLMClient (every call runs on the same event loop)."""
+    active = 0
+    peak = 0
+
+    async def acomplete(self, messages, model, temperature):
+        SlowAsyncLLMClient.active += 1
+        SlowAsyncLLMClient.peak = max(SlowAsyncLLMClient.peak, SlowAsyncLLMClient.active)
+        await asyncio.sleep(0.05)
+        SlowAsyncLLMClient.active -= 1
+        return SlowLLMClient.complete(SlowLLMClient(), messages, model, temperature)
+
+
+def test_split_text_respects_token_budget_and_keeps_paragraphs():
+    paragraphs = [f"Párrafo {i}. " + "palabra " * 30 for i in range(10)]
+    text = "\n\n".join(paragraphs)
+
+    chunks = chunking.split_text(text, max_tokens=100)
+
+    assert len(chunks) > 1
+    assert all(chunking.estimate_tokens(chunk) <= 100 for chunk in chunks)
+    assert " ".join(" ".join(chunks).split()) == " ".join(text.split())
+
+
+def test_split_text_breaks_oversized_words():
+    chunks = chunking.split_text("x" * 50, max_tokens=3)
+    assert all(len(chunk) <= 12 for chunk in chunks)
+    assert "".join(chunks) == "x" * 50
+
+
+@pytest.mark.parametrize("total,weights", [(3, [10]), (10, [1, 1, 1]), (7, [100, 10, 1]), (3, [5, 50, 20])])
+def test_distribute_assigns_exactly_the_requested_total(total, weights):
+    shares = chunking.distribute(total, weights)
+    assert sum(shares) == total
+    assert len(shares) == len(weights)
+
+
+def test_distribute_gives_every_chunk_at_least_one():
+    assert chunking.distribute(2, [5, 50, 20, 1]) == [1, 1, 1, 1]
+
+
+def test_every_chunk_reaches_the_model_with_the_default_count(settings):
+    """Ten chunks and count=3: the last paragraph is still sent and turned into a card."""
+    settings.AI_LLM_CLIENT = "core.tests.test_ai_chunking.SlowLLMClient"
+    settings.AI_CACHE_ENABLED = False
+    settings.AI_CHUNK_MAX_TOKENS = 50
+    SlowLLMClient.delay = 0
+    text = "\n\n".join(f"tema{i} " + "detalle " * 20 for i in range(10))
+
+    try:
+        generation = generate_flashcards(text)
+    finally:
+        SlowLLMClient.delay = 0.2
+
+    assert generation.chunks == 10
+    assert "¿Qué es tema9?" in [card["front"] for card in generation.flashcards]
+
+
+def test_texts_beyond_the_chunk_limit_get_larger_chunks(settings):
+    settings.AI_CHUNK_MAX_TOKENS = 50
+    settings.AI_MAX_CHUNKS = 4
+    text = "\n\n".join(f"tema{i} " + "detalle " * 20 for i in range(10))
+
+    chunks, jobs, count = _plan(text, 3)
+
+    assert len(jobs) <= 4
+    assert " ".join(" ".join(chunks).split()) == " ".join(text.split())
+    assert count == len(jobs)
+
+
+def test_long_text_is_generated_concurrently_and_deduplicated(settings):
+    """
+    Four chunks of ~0.2s each finish in roughly one chunk's time, and the
+    question repeated by every chunk appears only once.
+    """
+    settings.AI_LLM_CLIENT = "core.tests.test_ai_chunking.SlowLLMClient"
+    settings.AI_CACHE_ENABLED = False
+    settings.AI_CHUNK_MAX_TOKENS = 50
+    settings.AI_MAX_CONCURRENCY = 4
+    SlowLLMClient.peak = 0
+    text = "\n\n".join(f"tema{i} " + "detalle " * 20 for i in range(4))
+
+    started = time.monotonic()
+    generation = generate_flashcards(text, count=8)
+    elapsed = time.monotonic() - started
+
+    assert generation.chunks == 4
+    assert SlowLLMClient.peak == 4
+    assert elapsed < 4 * SlowLLMClient.delay
+    fronts = [card["front"] for card in generation.flashcards]
+    assert fronts.count("¿Qué es el documento?") == 1
+    assert {f"¿Qué es tema{i}?" for i in range(4)} <= set(fronts)
+
+
+def test_async_generation_shares_the_concurrency_limit_across_requests(settings):
+    settings.AI_LLM_CLIENT = "core.tests.test_ai_chunking.SlowAsyncLLMClient"
+    settings.AI_CACHE_ENABLED = False
+    settings.AI_CHUNK_MAX_TOKENS = 50
+    settings.AI_MAX_CONCURRENCY = 2
+    SlowAsyncLLMClient.peak = 0
+    SlowLLMClient.delay = 0
+    text = "\n\n".join(f"tema{i} " + "detalle " * 20 for i in range(2))
+
+    async def requests():
+        return await asyncio.gather(*(agenerate_flashcards(text, count=4) for _ in range(3)))
+
+    try:
+        generations = asyncio.run(requests())
+    finally:
+        SlowLLMClient.delay = 0.2
+
+    assert [generation.chunks for generation in generations] == [2, 2, 2]
+    assert SlowAsyncLLMClient.peak == 2  # not 2 per request
@@ -0,0 +1,246 @@
+import asyncio
+import json
+import os
+import threading
+import time
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+
+import pytest
+from asgiref.sync import async_to_sync
+
+from core.services import ai_http, ai_service
+
+
+def _completion(content):
+    return {
+        "id": "chatcmpl-stub",
+        "object": "chat.completion",
+        "created": 0,
+        "model": ai_service.MODEL,
+        "choices": [{"index": 0, "message": {"role": "assistant", "content": content}, "finish_reason": "stop"}],
+    }
+
+
+class StubModelServer(ThreadingHTTPServer):
+    """
+    Local stand-in for the OpenAI API. `responses` is consumed one entry per
+    request: (status, body, delay seconds); the last entry repeats.
+    """
+    daemon_threads = True
+
+    def __init__(self):
+        super().__init__(("127.0.0.1", 0), StubHandler)
+        self.responses = [(200, _completion("[]"), 0)]
+        self.requests = 0
+        self._lock = threading.Lock()
+
+    @property
+    def url(self):
+        return f"http://127.0.0.1:{self.server_address[1]}/v1"
+
+    def next_response(self):
+        with self._lock:
+            self.requests += 1
+            return self.responses.pop(0) if len(self.responses) > 1 else self.responses[0]
+
+
+class StubHandler(BaseHTTPRequestHandler):
+    protocol_version = "HTTP/1.1"  # keep-alive, so clients reuse pooled connections
+
+    def do_POST(self):
+        self.rfile.read(int(self.headers.get("Content-Length", 0)))
+        status, body, delay = self.server.next_response()
+        time.sleep(delay)
+        payload = json.dumps(body).encode()
+        try:
+            self.send_response(status)
+            self.send_header("Content-Type", "application/json")
+            self.send_header("Content-Length", str(len(payload)))
+            self.end_headers()
+            self.wfile.write(payload)
+        except OSError:
+            pass  # the client timed out and hung up
+
+    def log_message(self, format, *args):
+        pass
+
+
+@pytest.fixture
+def stub_server(settings):
+    server = StubModelServer()
+    thread = threading.Thread(target=server.serve_forever, daemon=True)
+    thread.start()
+    settings.OPENAI_API_KEY = "sk-test"
+    settings.OPENAI_BASE_URL = server.url
+    settings.AI_HTTP_BACKOFF_BASE = 0
+    settings.AI_HTTP_MAX_RETRIES = 2
+    settings.AI_HTTP_READ_TIMEOUT = 2
+    ai_http.breaker.reset()
+    ai_http.stats.reset()
+    yield server
+    server.shutdown()
+    server.server_close()
+    ai_http.breaker.reset()
+    ai_http.stats.reset()
+
+
+def _complete(client=None):
+    client = client or ai_service.OpenAIChatClient()
+    return client.complete([{"role": "user", "content": "hola"}], ai_service.MODEL, 0)
+
+
+def test_completes_through_the_pooled_client(stub_server):
+    stub_server.responses = [(200, _completion('[{"front": "a", "back": "b"}]'), 0)]
+    client = ai_service.OpenAIChatClient()
+
+    assert _complete(client) == '[{"front": "a", "back": "b"}]'
+    assert _complete(client) == '[{"front": "a", "back": "b"}]'
+    assert stub_server.requests == 2
+    assert ai_http.stats.snapshot()["attempts"] == {"200": 2}
+
+
+def test_retries_429_and_5xx_then_succeeds(stub_server):
+    stub_server.responses = [
+        (429, {"error": {"message": "slow down"}}, 0),
+        (503, {"error": {"message": "overloaded"}}, 0),
+        (200, _completion("ok"), 0),
+    ]
+
+    assert _complete() == "ok"
+    assert stub_server.requests == 3
+    snapshot = ai_http.stats.snapshot()
+    assert snapshot["retries"] == 2
+    assert snapshot["attempts"] == {"429": 1, "503": 1, "200": 1}
+
+
+def test_gives_up_after_max_retries(stub_server):
+    stub_server.responses = [(500, {"error": {"message": "boom"}}, 0)]
+
+    with pytest.raises(ai_service.AIServiceUnavailable, match="500"):
+        _complete()
+    assert stub_server.requests == 3  # first attempt + AI_HTTP_MAX_RETRIES
+
+
+def test_client_errors_are_not_retried(stub_server):
+    import openai
+
+    stub_server.responses = [(400, {"error": {"message": "bad request"}}, 0)]
+
+    with pytest.raises(openai.BadRequestError):
+        _complete()
+    assert stub_server.requests == 1
+    assert ai_http.breaker.state == "closed"
+
+
+def test_read_timeout_bounds_each_attempt(stub_server, settings):
+    settings.AI_HTTP_READ_TIMEOUT = 0.2
+    settings.AI_HTTP_MAX_RETRIES = 1
+    stub_server.responses = [(200, _completion("late"), 1)]
+    client = ai_service.OpenAIChatClient()
+    client.client  # imports the SDK outside the timed call
+
+    started = time.perf_counter()
+    with pytest.raises(ai_service.AIServiceUnavailable):
+        _complete(client)
+    assert time.perf_counter() - started < 1.5
+    assert ai_http.stats.snapshot()["attempts"] == {"timeout": 2}
+
+
+def test_breaker_opens_and_fails_fast(stub_server, settings):
+    settings.AI_HTTP_MAX_RETRIES = 0
+    settings.AI_BREAKER_MIN_REQUESTS = 4
+    settings.AI_BREAKER_FAILURE_RATE = 0.5
+    stub_server.responses = [(200, _completion("ok"), 0), (200, _completion("ok"), 0), (502, {}, 0)]
+    client = ai_service.OpenAIChatClient()
+
+    _complete(client)
+    _complete(client)
+    for _ in range(2):
+        with pytest.raises(ai_service.AIServiceUnavailable):
+            _complete(client)
+    assert ai_http.breaker.state == "open"
+
+    with pytest.raises(ai_service.CircuitOpenError):
+        _complete(client)
+    assert stub_server.requests == 4  # the last call never left the process
+    assert f'memorise_llm_circuit_state{{worker="{os.getpid()}"}} 2' in ai_http.stats.render_prometheus()
+
+
+def test_half_open_probe_closes_the_circuit(stub_server, settings):
+    settings.AI_HTTP_MAX_RETRIES = 0
+    settings.AI_BREAKER_MIN_REQUESTS = 1
+    settings.AI_BREAKER_COOLDOWN_SECONDS = 0.2
+    stub_server.responses = [(503, {}, 0), (200, _completion("back"), 0)]
+    client = ai_service.OpenAIChatClient()
+
+    with pytest.raises(ai_service.AIServiceUnavailable):
+        _complete(client)
+    assert ai_http.breaker.state == "open"
+
+    time.sleep(0.25)
+    assert _complete(client) == "back"
+    assert ai_http.breaker.state == "closed"
+    assert ai_http.breaker.opened == 1
+
+
+def test_async_client_retries_through_the_same_layer(stub_server):
+    stub_server.responses = [(503, {}, 0), (200, _completion("async ok"), 0)]
+    client = ai_service.OpenAIChatClient()
+
+    content = asyncio.run(client.acomplete([{"role": "user", "content": "hola"}], ai_service.MODEL, 0))
+
+    assert content == "async ok"
+    assert ai_http.stats.snapshot()["retries"] == 1
+
+
+def test_async_client_is_bound_to_the_running_loop(stub_server):
+    stub_server.responses = [(200, _completion("ok"), 0)]
+    client = ai_service.OpenAIChatClient()
+
+    # async_to_sync runs each call in a new event loop, like async views under WSGI
+    for _ in range(3):
+        assert async_to_sync(client.acomplete)([{"role": "user", "content": "hola"}], ai_service.MODEL, 0) == "ok"
+    assert ai_http.stats.snapshot()["attempts"] == {"200": 3}
+    assert ai_http.breaker.state == "closed"
+
+
+def test_backoff_honours_retry_after_and_caps(settings):
+    import httpx
+
+    settings.AI_HTTP_BACKOFF_BASE = 1
+    settings.AI_HTTP_BACKOFF_MAX = 4
+
+    assert ai_http.backoff(0, httpx.Response(429, headers={"Retry-After": "3"})) == 3
+    assert ai_http.backoff(0, httpx.Response(429, headers={"Retry-After": "120"})) == 4
+    assert all(0 <= ai_http.backoff(10) <= 4 for _ in range(20))
+
+
+def test_breaker_window_forgets_old_failures(settings):
+    settings.AI_BREAKER_WINDOW_SECONDS = 10
+    settings.AI_BREAKER_MIN_REQUESTS = 3
+    settings.AI_BREAKER_FAILURE_RATE = 0.5
+    now = [0.0]
+    breaker = ai_http.CircuitBreaker(clock=lambda: now[0])
+
+    breaker.record(True)
+    breaker.record(True)
+    now[0] = 20.0  # both failures left the window
+    breaker.record(False)
+    breaker.record(True)
+    assert breaker.state == "closed"
+    breaker.record(True)
+    assert breaker.state == "open"
+
+
+@pytest.mark.django_db
+def test_metrics_endpoint_includes_llm_metrics(client, settings):
+    settings.METRICS_TOKEN = "secret"
+    ai_http.stats.reset()
+
+    response = client.get("/metrics", HTTP_AUTHORIZATION="Bearer secret")
+
+    assert response.status_code == 200
+    body = response.content.decode()
+    worker = f'worker="{os.getpid()}"'
+    assert f"memorise_llm_retries_total{{{worker}}} 0" in body
+    assert f"memorise_llm_circuit_state{{{worker}}} 0" in body
@@ -0,0 +1,184 @@
+import pytest
+from django.urls import reverse
+from rest_framework.test import APIClient
+from django.db import connection
+from django.test.utils import CaptureQueriesContext
+from core.models import AIGenerationJob, Deck, DeckCounter, Flashcard, User
+from core.services import ai_jobs
+
+
+class BrokenLLMClient:
+    def complete(self, messages, model, temperature):
+        return "Lo siento, no puedo generar JSON."
+
+
+@pytest.mark.django_db
+def test_ai_endpoint_enqueues_job_and_returns_202(create_user, fake_llm, django_capture_on_commit_callbacks):
+    """
+    POST returns 202 with a job id right away; the job runs once the
+    request transaction commits and the result is available by polling.
+    """
+    client = APIClient()
+    client.force_authenticate(user=create_user)
+
+    with django_capture_on_commit_callbacks(execute=True):
+        response = client.post(reverse("ai-flashcards"), {"text": "fotosíntesis clorofila luz"}, format="json")
+
+    assert response.status_code == 202
+    job_id = response.json()["id"]
+
+    job = client.get(reverse("ai-job-detail", args=[job_id])).json()
+    assert job["status"] == "succeeded"
+    assert len(job["result"]["flashcards"]) == 3
+    assert {"front", "back"} <= set(job["result"]["flashcards"][0])
+
+
+@pytest.mark.django_db
+def test_invalid_ai_output_fails_the_job(create_user, settings, fake_llm, django_capture_on_commit_callbacks):
+    settings.AI_LLM_CLIENT = "core.tests.test_ai_jobs.BrokenLLMClient"
+    client = APIClient()
+    client.force_authenticate(user=create_user)
+
+    with django_capture_on_commit_callbacks(execute=True):
+        job_id = client.post(reverse("ai-flashcards"), {"text": "algo"}, format="json").json()["id"]
+
+    job = AIGenerationJob.objects.get(id=job_id)
+    assert job.status == AIGenerationJob.Status.FAILED
+    assert job.error == "Invalid AI response"
+    assert job.result["raw"].startswith("Lo siento")
+
+
+@pytest.mark.django_db
+def test_jobs_are_private(create_user, fake_llm):
+    other = User.objects.create_user(email="other@mail.com", username="other", password="secret")
+    job = AIGenerationJob.objects.create(user=other, text="secreto")
+
+    client = APIClient()
+    client.force_authenticate(user=create_user)
+    assert client.get(reverse("ai-job-detail", args=[job.id])).status_code == 404
+
+
+@pytest.mark.django_db
+def test_workers_claim_oldest_pending_job_once(create_user, fake_llm):
+    first = AIGenerationJob.objects.create(user=create_user, text="uno")
+    second = AIGenerationJob.objects.create(user=create_user, text="dos")
+
+    assert ai_jobs.claim_next().id == first.id
+    assert ai_jobs.claim_next().id == second.id
+    assert ai_jobs.claim_next() is None
+
+
+@pytest.mark.django_db
+def test_worker_tick_requeues_stale_jobs_and_drains_the_queue(create_user, fake_llm, monkeypatch):
+    from datetime import timedelta
+    from django.utils import timezone
+
+    stale = AIGenerationJob.objects.create(
+        user=create_user, text="muerto", status=AIGenerationJob.Status.RUNNING,
+        started_at=timezone.now() - timedelta(hours=1),
+    )
+    running = AIGenerationJob.objects.create(
+        user=create_user, text="vivo", status=AIGenerationJob.Status.RUNNING, started_at=timezone.now(),
+    )
+    pending = [AIGenerationJob.objects.create(user=create_user, text=f"texto {i}") for i in range(3)]
+    monkeypatch.setattr(connection, "close", lambda: None)  # the tick closes its thread's connection
+
+    ai_jobs._worker_tick()  # one wake-up, e.g. after the tick of the lost jobs never ran
+
+    for job in [stale, *pending]:
+        job.refresh_from_db()
+        assert job.status == AIGenerationJob.Status.SUCCEEDED
+    running.refresh_from_db()
+    assert running.status == AIGenerationJob.Status.RUNNING
+
+
+@pytest.mark.django_db
+def test_requeued_job_finishing_late_does_not_save_twice(create_user, create_deck, fake_llm):
+    from datetime import timedelta
+    from django.utils import timezone
+
+    AIGenerationJob.objects.create(user=create_user, deck=create_deck, text="uno dos tres", count=3)
+    slow = ai_jobs.claim_next()
+    # The model call outlives the stale threshold: another worker takes the job over
+    AIGenerationJob.objects.filter(id=slow.id).update(started_at=timezone.now() - timedelta(hours=1))
+    slow.refresh_from_db()
+    assert ai_jobs.requeue_stale() == 1
+    retry = ai_jobs.run_next()
+    retry.refresh_from_db()
+    assert retry.status == AIGenerationJob.Status.SUCCEEDED
+
+    ai_jobs.run_job(slow)  # the first worker finally gets its answer
+
+    retry.refresh_from_db()
+    assert retry.finished_at is not None and retry.result["saved"]
+    assert sorted(create_deck.flashcards.values_list("id", flat=True)) == sorted(retry.result["saved"])
+    assert DeckCounter.objects.get(deck=create_deck).total == 3
+
+
+@pytest.mark.django_db
+def test_job_with_deck_saves_cards_with_one_bulk_insert(
+    create_user, create_deck, fake_llm, django_capture_on_commit_callbacks
+):
+    client = APIClient()
+    client.force_authenticate(user=create_user)
+
+    with django_capture_on_commit_callbacks(execute=True):
+        response = client.post(
+            reverse("ai-flashcards"),
+            {"text": "átomo protón neutrón electrón", "count": 4, "deck": create_deck.id},
+            format="json",
+        )
+    assert response.status_code == 202
+    assert response.json()["deck"] == create_deck.id
+
+    job = client.get(reverse("ai-job-detail", args=[response.json()["id"]])).json()
+    assert job["status"] == "succeeded"
+    saved = job["result"]["saved"]
+    assert len(saved) == 4
+    assert [card["id"] for card in job["result"]["flashcards"]] == saved
+    assert sorted(create_deck.flashcards.values_list("id", flat=True)) == sorted(saved)
+    assert DeckCounter.objects.get(deck=create_deck).total == 4
+
+
+@pytest.mark.django_db
+def test_run_job_inserts_cards_in_one_statement(create_user, create_deck, fake_llm, settings):
+    settings.AI_CACHE_ENABLED = False
+    job = AIGenerationJob.objects.create(user=create_user, deck=create_deck, text="uno dos tres", count=3)
+    ai_jobs.claim_next()
+    job.refresh_from_db()
+
+    with CaptureQueriesContext(connection) as queries:
+        ai_jobs.run_job(job)
+
+    inserts = [q["sql"] for q in queries.captured_queries if q["sql"].startswith('INSERT INTO "core_flashcard"')]
+    assert len(inserts) == 1
+    assert create_deck.flashcards.count() == 3
+
+
+@pytest.mark.django_db
+def test_job_rejects_foreign_deck(create_user, fake_llm):
+    other = User.objects.create_user(email="other@mail.com", username="other", password="secret")
+    deck = Deck.objects.create(user=other, title="Other")
+
+    client = APIClient()
+    client.force_authenticate(user=create_user)
+    response = client.post(reverse("ai-flashcards"), {"text": "abc", "deck": deck.id}, format="json")
+    assert response.status_code == 400
+    assert "deck" in response.data
+    assert not AIGenerationJob.objects.exists()
+
+    response = client.post(reverse("ai-flashcards"), {"text": "abc", "deck": "x"}, format="json")
+    assert response.status_code == 400
+
+
+@pytest.mark.django_db
+def test_job_only_returns_cards_when_deck_was_deleted(create_user, create_deck, fake_llm):
+    job = AIGenerationJob.objects.create(user=create_user, deck=create_deck, text="uno dos")
+    create_deck.delete()
+
+    job = ai_jobs.run_next()
+    job.refresh_from_db()
+    assert job.status == AIGenerationJob.Status.SUCCEEDED
+    assert len(job.result["flashcards"]) == 2
+    assert "saved" not in job.result
+    assert not Flashcard.objects.exists()
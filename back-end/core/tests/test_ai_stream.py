@@ -0,0 +1,90 @@
+import json
+
+import pytest
+from django.urls import reverse
+from rest_framework.test import APIClient
+from core.models import Deck, Flashcard, User
+from core.services.json_stream import JSONObjectStream
+
+
+class HalfBrokenLLMClient:
+    """Streams three cards where the second one is malformed."""
+
+    def stream(self, messages, model, temperature):
+        content = '```json\n[{"front": "¿A?", "back": "a"}, {"front": "¿B?", "back": }, {"front": "¿C?", "back": "c"}]'
+        for start in range(0, len(content), 5):
+            yield content[start:start + 5]
+
+
+def read_events(response):
+    body = b"".join(response.streaming_content).decode()
+    return [json.loads(line) for line in body.splitlines()]
+
+
+def test_json_object_stream_emits_objects_across_fragments():
+    parser = JSONObjectStream()
+    assert parser.feed('[{"front": "a {x}", "ba') == []
+    assert parser.feed('ck": "b \\" }"}, {"front": ') == [({"front": "a {x}", "back": 'b " }'}, None)]
+    assert parser.pending == '{"front": '
+
+
+@pytest.mark.django_db
+def test_stream_yields_cards_and_saves_them_into_the_deck(create_user, create_deck, fake_llm):
+    client = APIClient()
+    client.force_authenticate(user=create_user)
+
+    response = client.post(
+        reverse("ai-flashcards-stream"),
+        {"text": "mitocondria ribosoma núcleo", "count": 3, "deck": create_deck.id},
+        format="json",
+    )
+
+    assert response.status_code == 200
+    assert response["Content-Type"] == "application/x-ndjson"
+    events = read_events(response)
+    cards = [event["card"] for event in events if event["type"] == "card"]
+    assert len(cards) == 3
+    assert events[-1] == {"type": "done", "count": 3, "saved": 3}
+    assert sorted(Flashcard.objects.filter(deck=create_deck).values_list("id", flat=True)) == sorted(
+        card["id"] for card in cards
+    )
+
+
+@pytest.mark.django_db
+def test_malformed_card_does_not_lose_the_others(create_user, settings):
+    settings.AI_LLM_CLIENT = "core.tests.test_ai_stream.HalfBrokenLLMClient"
+    client = APIClient()
+    client.force_authenticate(user=create_user)
+
+    events = read_events(client.post(reverse("ai-flashcards-stream"), {"text": "abc"}, format="json"))
+
+    assert [event["type"] for event in events] == ["card", "error", "card", "done"]
+    assert [events[0]["card"]["front"], events[2]["card"]["front"]] == ["¿A?", "¿C?"]
+
+
+@pytest.mark.django_db
+def test_stream_rejects_foreign_deck(create_user, fake_llm):
+    other = User.objects.create_user(email="other@mail.com", username="other", password="secret")
+    deck = Deck.objects.create(user=other, title="Other")
+    client = APIClient()
+    client.force_authenticate(user=create_user)
+
+    response = client.post(reverse("ai-flashcards-stream"), {"text": "abc", "deck": deck.id}, format="json")
+    assert response.status_code == 400
+    assert "deck" in response.data
+
+
+def test_streaming_holds_an_llm_slot_while_the_model_writes(fake_llm, settings, monkeypatch):
+    import threading
+    from core.services import ai_service
+
+    settings.AI_CACHE_ENABLED = False
+    slots = threading.BoundedSemaphore(1)
+    monkeypatch.setattr(ai_service, "_slots", slots)
+
+    events = ai_service.stream_flashcards("agua fuego", 2)
+    assert next(events)[0] == "card"
+    assert not slots.acquire(blocking=False)  # counted against AI_MAX_CONCURRENCY
+
+    list(events)
+    assert slots.acquire(blocking=False)
@@ -0,0 +1,179 @@
+import asyncio
+import json
+import time
+
+import pytest
+from asgiref.sync import async_to_sync
+from django.test import AsyncClient
+from django.urls import reverse
+
+from core.models import Deck, DeckCounter, Flashcard, User
+from core.services.ai_service import CircuitOpenError
+from core.services.flashcards import bulk_create_flashcards
+
+
+class SlowAsyncLLMClient:
+    """Takes 0.3 s per call without blocking the event loop."""
+
+    async def acomplete(self, messages, model, temperature):
+        await asyncio.sleep(0.3)
+        return json.dumps([{"front": "¿Lento?", "back": "Sí"}])
+
+
+class OpenCircuitLLMClient:
+    """Fails fast like OpenAIChatClient while its circuit breaker is open."""
+
+    async def acomplete(self, messages, model, temperature):
+        raise CircuitOpenError(12.5)
+
+
+@pytest.fixture(autouse=True)
+def async_urls(settings):
+    settings.ROOT_URLCONF = "core.tests.urls_async"
+
+
+class AuthClient(AsyncClient):
+    """AsyncClient sending the JWT on every request (client-level headers get HTTP_ doubled)."""
+
+    def __init__(self, token):
+        super().__init__()
+        self.auth = {"Authorization": f"Bearer {token}"}
+
+    def generic(self, *args, headers=None, **kwargs):
+        return super().generic(*args, headers={**self.auth, **(headers or {})}, **kwargs)
+
+
+@pytest.fixture
+def client(get_token):
+    return AuthClient(get_token)
+
+
+def call(method, *args, **kwargs):
+    return async_to_sync(method)(*args, **kwargs)
+
+
+@pytest.mark.django_db
+def test_async_study_returns_due_cards_in_batches(client, create_deck):
+    bulk_create_flashcards(create_deck, [{"front": f"q{i}", "back": "a"} for i in range(3)])
+
+    first = call(client.get, reverse("flashcard-study-cards"), {"limit": 2})
+    assert first.status_code == 200
+    body = first.json()
+    assert len(body["results"]) == 2 and body["next"]
+
+    rest = call(client.get, reverse("flashcard-study-cards"), {"limit": 2, "cursor": body["next"]}).json()
+    assert len(rest["results"]) == 1 and rest["next"] is None
+
+
+@pytest.mark.django_db
+def test_async_review_schedules_card_and_updates_counters(client, create_deck):
+    card = Flashcard.objects.create(deck=create_deck, front="a", back="b")
+
+    response = call(client.post, reverse("flashcard-review", args=[card.id]), {"answer": "good"},
+                    content_type="application/json")
+
+    assert response.status_code == 200
+    card.refresh_from_db()
+    assert response.json()["status"] == card.status != "new"
+    assert card.due_date is not None
+    counters = DeckCounter.objects.get(deck=create_deck)
+    assert counters.new == 0 and getattr(counters, card.status) == 1
+
+
+@pytest.mark.django_db
+def test_async_review_errors_match_drf(client, create_deck):
+    other = User.objects.create_user(email="other@mail.com", username="other", password="secret")
+    foreign = Flashcard.objects.create(deck=Deck.objects.create(user=other, title="x"), front="a", back="b")
+    own = Flashcard.objects.create(deck=create_deck, front="a", back="b")
+
+    url = reverse("flashcard-review", args=[foreign.id])
+    assert call(client.post, url, {"answer": "good"}, content_type="application/json").status_code == 404
+
+    bad = call(client.post, reverse("flashcard-review", args=[own.id]), {"answer": "maybe"},
+               content_type="application/json")
+    assert bad.status_code == 400 and "answer" in bad.json()
+
+    anonymous = call(AsyncClient().post, reverse("flashcard-review", args=[own.id]), {"answer": "good"},
+                     content_type="application/json")
+    assert anonymous.status_code == 401
+
+
+@pytest.mark.django_db
+def test_async_generate_saves_into_deck(client, create_deck, fake_llm):
+    response = call(client.post, reverse("ai-flashcards-generate"),
+                    {"text": "agua fuego tierra", "count": 3, "deck": create_deck.id},
+                    content_type="application/json")
+
+    assert response.status_code == 201
+    body = response.json()
+    assert len(body["saved"]) == 3
+    assert sorted(create_deck.flashcards.values_list("id", flat=True)) == sorted(body["saved"])
+
+
+@pytest.mark.django_db
+def test_async_generate_rejects_foreign_deck(client, fake_llm):
+    other = User.objects.create_user(email="other@mail.com", username="other", password="secret")
+    deck = Deck.objects.create(user=other, title="Other")
+
+    for name in ("ai-flashcards-generate", "ai-flashcards-stream"):
+        response = call(client.post, reverse(name), {"text": "abc", "deck": deck.id}, content_type="application/json")
+        assert response.status_code == 400
+        assert "deck" in response.json()
+    assert not deck.flashcards.exists()
+
+
+@pytest.mark.django_db
+def test_async_stream_emits_ndjson(client, create_deck, fake_llm):
+    response = call(client.post, reverse("ai-flashcards-stream"),
+                    {"text": "sol luna", "count": 2, "deck": create_deck.id}, content_type="application/json")
+
+    async def read():
+        return b"".join([chunk async for chunk in response.streaming_content])
+
+    events = [json.loads(line) for line in async_to_sync(read)().decode().splitlines()]
+    assert [event["type"] for event in events] == ["card", "card", "done"]
+    assert events[-1]["saved"] == 2
+    assert create_deck.flashcards.count() == 2
+
+
+@pytest.mark.django_db
+def test_slow_ai_requests_run_concurrently(client, settings):
+    settings.AI_LLM_CLIENT = "core.tests.test_async_views.SlowAsyncLLMClient"
+    settings.AI_CACHE_ENABLED = False
+
+    async def burst():
+        url = reverse("ai-flashcards-generate")
+        return await asyncio.gather(*(
+            client.post(url, {"text": f"texto {i}", "count": 1}, content_type="application/json")
+            for i in range(8)
+        ))
+
+    start = time.perf_counter()
+    responses = async_to_sync(burst)()
+    elapsed = time.perf_counter() - start
+
+    assert all(response.status_code == 200 for response in responses)
+    # 8 × 0.3 s calls overlap on one event loop instead of queueing
+    assert elapsed < 8 * 0.3 / 2
+
+
+@pytest.mark.django_db
+def test_async_generate_answers_503_while_the_circuit_is_open(client, settings):
+    settings.AI_LLM_CLIENT = "core.tests.test_async_views.OpenCircuitLLMClient"
+    settings.AI_CACHE_ENABLED = False
+
+    response = call(client.post, reverse("ai-flashcards-generate"), {"text": "agua", "count": 1},
+                    content_type="application/json")
+
+    assert response.status_code == 503
+    assert response["Retry-After"] == "12"
+    assert "circuit open" in response.json()["error"]
+
+
+def test_generate_is_only_mounted_in_the_asgi_profile(settings):
+    from django.urls import NoReverseMatch, clear_url_caches
+
+    settings.ROOT_URLCONF = "MemoRiseApi.urls"
+    clear_url_caches()
+    with pytest.raises(NoReverseMatch):
+        reverse("ai-flashcards-generate")
@@ -0,0 +1,114 @@
+import pytest
+from decimal import Decimal
+from django.db import connection
+from django.test.utils import CaptureQueriesContext
+from django.urls import reverse
+from rest_framework.test import APIClient
+from rest_framework_simplejwt.tokens import AccessToken, RefreshToken
+
+from core.authentication import ClaimsJWTAuthentication, user_cache, user_from_claims
+from core.models import Flashcard, User
+
+
+def _client(token):
+    client = APIClient()
+    client.credentials(HTTP_AUTHORIZATION=f"Bearer {token}")
+    return client
+
+
+def _user_queries(queries):
+    table = User._meta.db_table
+    return [q["sql"] for q in queries if q["sql"].startswith("SELECT") and f'FROM "{table}"' in q["sql"]]
+
+
+@pytest.mark.django_db
+def test_login_token_carries_user_claims(get_token, create_user):
+    token = AccessToken(get_token)
+
+    assert token["email"] == create_user.email
+    assert token["is_active"] is True
+    assert Decimal(token["base_ease_factor"]) == create_user.base_ease_factor
+
+
+@pytest.mark.django_db
+def test_refreshed_access_token_keeps_the_claims(create_user):
+    client = APIClient()
+    login = client.post(
+        reverse("token_obtain_pair"), {"email": create_user.email, "password": create_user.password}, format="json"
+    ).json()
+
+    response = client.post(reverse("token_refresh"), {"refresh": login["refresh"]}, format="json")
+
+    assert response.status_code == 200
+    assert AccessToken(response.json()["access"])["email"] == create_user.email
+
+
+@pytest.mark.django_db
+def test_review_does_not_query_the_user(get_token, create_deck):
+    card = Flashcard.objects.create(deck=create_deck, front="q", back="a")
+    client = _client(get_token)
+
+    with CaptureQueriesContext(connection) as queries:
+        response = client.post(reverse("flashcard-review", args=[card.id]), {"answer": "good"}, format="json")
+
+    assert response.status_code == 200
+    assert _user_queries(queries) == []
+
+
+@pytest.mark.django_db
+def test_claims_user_loads_deferred_fields_on_access(get_token, create_user, django_assert_num_queries):
+    user = user_from_claims(AccessToken(get_token))
+
+    assert user.pk == create_user.pk
+    assert user.get_deferred_fields() >= {"username", "password"}
+    with django_assert_num_queries(1):
+        assert user.username == create_user.username
+
+
+@pytest.mark.django_db
+def test_inactive_claim_is_rejected(create_user):
+    token = RefreshToken.for_user(create_user).access_token
+    token["email"] = create_user.email
+    token["is_active"] = False
+    token["base_ease_factor"] = "2.50"
+
+    response = _client(token).get(reverse("deck-list"))
+
+    assert response.status_code == 401
+
+
+@pytest.mark.django_db
+def test_token_without_claims_uses_the_cached_user(create_user, django_assert_num_queries):
+    token = RefreshToken.for_user(create_user).access_token
+    auth = ClaimsJWTAuthentication()
+
+    with django_assert_num_queries(1):
+        assert auth.get_user(token).pk == create_user.pk
+    with django_assert_num_queries(0):
+        cached = auth.get_user(token)
+    assert cached.email == create_user.email
+
+
+@pytest.mark.django_db
+def test_saving_the_user_drops_the_cached_row(create_user, django_assert_num_queries):
+    token = RefreshToken.for_user(create_user).access_token
+    auth = ClaimsJWTAuthentication()
+    auth.get_user(token)
+
+    create_user.username = "renamed"
+    create_user.save()
+
+    assert user_cache.get(create_user.pk) is None
+    with django_assert_num_queries(1):
+        assert auth.get_user(token).username == "renamed"
+
+
+@pytest.mark.django_db
+def test_cache_disabled_always_queries(settings, create_user, django_assert_num_queries):
+    settings.JWT_USER_CACHE_TTL = 0
+    token = RefreshToken.for_user(create_user).access_token
+    auth = ClaimsJWTAuthentication()
+
+    auth.get_user(token)
+    with django_assert_num_queries(1):
+        auth.get_user(token)
@@ -0,0 +1,68 @@
+import pytest
+from django.core.management import call_command
+from django.core.management.base import CommandError
+
+from core import benchmark
+from core.models import Deck, DeckCounter, Flashcard
+from core.services import seed
+
+
+@pytest.mark.django_db
+def test_seed_creates_requested_volume_with_mixed_states():
+    call_command("seed", users=2, decks=3, cards=40, seed=7)
+
+    assert seed.seeded_users().count() == 2
+    assert Deck.objects.count() == 6
+    assert Flashcard.objects.count() == 240
+    statuses = set(Flashcard.objects.values_list("status", flat=True))
+    assert statuses == {"new", "learning", "review", "lapsed"}
+    assert not Flashcard.objects.filter(status="new", due_date__isnull=False).exists()
+    assert not Flashcard.objects.filter(status="review", due_date__isnull=True).exists()
+    assert sum(DeckCounter.objects.values_list("total", flat=True)) == 240
+
+
+@pytest.mark.django_db
+def test_seed_is_deterministic_and_refuses_to_duplicate():
+    call_command("seed", users=1, decks=1, cards=30, seed=3)
+    first = list(Flashcard.objects.order_by("id").values_list("front", "status", "interval"))
+
+    with pytest.raises(CommandError):
+        call_command("seed", users=1, decks=1, cards=30, seed=3)
+
+    call_command("seed", users=1, decks=1, cards=30, seed=3, reset=True)
+    assert list(Flashcard.objects.order_by("id").values_list("front", "status", "interval")) == first
+
+
+@pytest.mark.django_db
+def test_benchmark_reports_latency_and_queries():
+    seed.seed(1, 2, 20)
+
+    results = benchmark.run(["study_cards", "review", "deck_list", "deck_flashcards"], iterations=3, warmup=1)
+
+    assert results["meta"]["dataset"] == {"users": 1, "decks": 2, "flashcards": 40}
+    for row in results["scenarios"].values():
+        assert 0 < row["p50_ms"] <= row["p95_ms"]
+        assert row["queries"] >= 1
+
+
+def test_compare_flags_query_and_latency_regressions():
+    baseline = {"scenarios": {
+        "deck_list": {"p95_ms": 10.0, "queries": 3},
+        "review": {"p95_ms": 10.0, "queries": 5},
+        "study_cards": {"p95_ms": 1.0, "queries": 2},
+    }}
+    results = {"scenarios": {
+        "deck_list": {"p95_ms": 10.5, "queries": 4},    # one more query
+        "review": {"p95_ms": 20.0, "queries": 5},       # twice as slow
+        "study_cards": {"p95_ms": 2.5, "queries": 2},   # slower, but within the noise floor
+    }}
+
+    regressions = benchmark.compare(results, baseline, tolerance=0.25)
+    assert len(regressions) == 2
+    assert regressions[0].startswith("deck_list: 4 queries")
+    assert regressions[1].startswith("review: p95")
+
+
+def test_percentile_interpolates():
+    assert benchmark.percentile([1, 2, 3, 4], 0.5) == 2.5
+    assert benchmark.percentile([5], 0.95) == 5
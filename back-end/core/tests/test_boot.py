@@ -0,0 +1,85 @@
+import json
+import sys
+from io import StringIO
+
+from django.core.management import call_command
+from django.test import override_settings
+
+from core import benchmark, boot
+from core.services import ai_service
+
+IMPORTTIME_REPORT = """\
+import time: self [us] | cumulative | imported package
+import time:       120 |        120 |   _io
+import time:       300 |        420 | io
+import time:       800 |        800 |     django.utils.version
+import time:      1500 |       2300 |   django.utils
+import time:      2000 |       4300 | django
+import time:       900 |        900 | core.models
+"""
+
+
+def test_parse_importtime_reads_times_and_nesting():
+    rows = boot.parse_importtime(IMPORTTIME_REPORT + "some other stderr line\n")
+
+    assert [row["module"] for row in rows] == [
+        "_io", "io", "django.utils.version", "django.utils", "django", "core.models",
+    ]
+    assert rows[2] == {"module": "django.utils.version", "self_us": 800, "cumulative_us": 800, "depth": 2}
+    assert rows[4]["depth"] == 0
+
+
+def test_summarize_totals_top_level_imports_and_packages():
+    report = boot.summarize(boot.parse_importtime(IMPORTTIME_REPORT), top=2)
+
+    assert report["total_ms"] == 5.6  # io + django + core.models
+    assert report["modules"] == 6
+    assert [row["module"] for row in report["slowest"]] == ["django", "django.utils"]
+    assert report["packages"][0] == {"package": "django", "self_ms": 4.3}
+    assert len(report["packages"]) == 2
+
+
+def test_heavy_clients_are_not_imported_with_the_application():
+    rows = boot.import_profile()
+    modules = {row["module"] for row in rows}
+
+    assert "MemoRiseApi.wsgi" in modules
+    assert "core.views" in modules
+    assert "openai" not in modules
+
+
+def test_openai_client_is_created_on_first_use(settings):
+    settings.OPENAI_API_KEY = "sk-test"
+    client = ai_service.OpenAIChatClient()
+
+    assert client._client is None
+    assert client.client is client.client
+    assert "openai" in sys.modules
+
+
+def test_time_boot_reaches_the_first_response():
+    result = boot.time_boot()
+
+    assert result["status"] == 401  # the full stack answered, without credentials
+    assert 0 < result["setup_ms"] < result["total_ms"]
+    assert result["first_request_ms"] > 0
+
+
+def test_importtime_command_prints_json():
+    out = StringIO()
+    call_command("importtime", "--json", "--top", "3", stdout=out)
+
+    report = json.loads(out.getvalue())
+    assert report["modules"] > 0
+    assert len(report["slowest"]) == 3
+
+
+@override_settings(BOOT_BUDGET_MS=500)
+def test_compare_flags_boot_over_budget_and_baseline():
+    baseline = {"scenarios": {}, "boot": {"p95_ms": 200.0}}
+
+    assert benchmark.compare({"scenarios": {}, "boot": {"p95_ms": 240.0}}, baseline) == []
+    regressions = benchmark.compare({"scenarios": {}, "boot": {"p95_ms": 600.0}}, baseline)
+    assert len(regressions) == 2
+    assert regressions[0].startswith("boot: p95 600.0 ms (budget")
+    assert regressions[1].startswith("boot: p95 600.0 ms (baseline")
@@ -0,0 +1,100 @@
+import pytest
+from datetime import timedelta
+from django.test import override_settings
+from django.urls import reverse
+from django.utils import timezone
+from rest_framework.test import APIClient
+from django.core.management import call_command
+from core.models import Deck, DeckCounter, Flashcard
+
+
+def seed_cards(deck):
+    now = timezone.now()
+    Flashcard.objects.create(deck=deck, front="n1", back="a")
+    Flashcard.objects.create(deck=deck, front="n2", back="a")
+    Flashcard.objects.create(deck=deck, front="l", back="a", status="learning", due_date=now - timedelta(minutes=1))
+    Flashcard.objects.create(deck=deck, front="r", back="a", status="review", due_date=now + timedelta(days=1))
+    Flashcard.objects.create(deck=deck, front="x", back="a", status="lapsed")
+
+
+@pytest.mark.django_db
+@pytest.mark.parametrize("materialized", [False, True])
+def test_deck_list_exposes_counts_in_constant_queries(create_user, materialized, django_assert_num_queries):
+    """
+    Both the annotated and the materialized paths return the same counts.
+    The counts come with the page query itself; the two other queries are
+    the ETag aggregates, so the cost does not depend on the number of decks.
+    """
+    for title in ("A", "B", "C"):
+        seed_cards(Deck.objects.create(user=create_user, title=title))
+
+    client = APIClient()
+    client.force_authenticate(user=create_user)
+
+    with override_settings(DECK_COUNTERS_MATERIALIZED=materialized):
+        with django_assert_num_queries(3):
+            response = client.get(reverse("deck-list"))
+
+    assert response.status_code == 200
+    for deck in response.json():
+        assert (deck["total"], deck["new"], deck["due_now"], deck["learning"], deck["lapsed"]) == (5, 2, 1, 1, 1)
+
+
+@pytest.mark.django_db
+def test_counters_follow_create_review_and_delete(create_user, create_deck):
+    client = APIClient()
+    client.force_authenticate(user=create_user)
+
+    card_id = client.post(
+        reverse("flashcard-list"), {"deck": create_deck.id, "front": "q", "back": "a"}, format="json"
+    ).json()["id"]
+    counter = DeckCounter.objects.get(deck=create_deck)
+    assert (counter.total, counter.new) == (1, 1)
+
+    client.post(reverse("flashcard-review", args=[card_id]), {"answer": "again"}, format="json")
+    counter.refresh_from_db()
+    assert (counter.total, counter.new, counter.learning) == (1, 0, 1)
+
+    client.post(reverse("flashcard-review-batch"), [{"id": card_id, "answer": "good"}], format="json")
+    counter.refresh_from_db()
+    assert (counter.learning, counter.review) == (0, 1)
+
+    client.delete(reverse("flashcard-detail", args=[card_id]))
+    counter.refresh_from_db()
+    assert (counter.total, counter.review) == (0, 0)
+
+
+def counts(deck):
+    counter = DeckCounter.objects.get(deck=deck)
+    return counter.total, counter.new, counter.learning, counter.review, counter.lapsed
+
+
+@pytest.mark.django_db
+def test_counters_follow_orm_writes_outside_the_views(create_user):
+    """Admin, shell and management code go through the same model signals."""
+    deck = Deck.objects.create(user=create_user, title="A")
+    other = Deck.objects.create(user=create_user, title="B")
+    assert counts(deck) == (0, 0, 0, 0, 0)  # created with the deck
+
+    seed_cards(deck)
+    assert counts(deck) == (5, 2, 1, 1, 1)
+
+    card = Flashcard.objects.get(deck=deck, front="n1")
+    card.status = "learning"
+    card.save()
+    assert counts(deck) == (5, 1, 2, 1, 1)
+
+    card.deck = other
+    card.save()
+    assert counts(deck) == (4, 1, 1, 1, 1)
+    assert counts(other) == (1, 0, 1, 0, 0)
+
+    Flashcard.objects.get(deck=deck, front="x").delete()
+    Flashcard.objects.filter(deck=deck, status="new").delete()
+    assert counts(deck) == (2, 0, 1, 1, 0)
+
+    other.delete()
+    assert not DeckCounter.objects.filter(deck_id=other.id).exists()
+    assert counts(deck) == (2, 0, 1, 1, 0)
+    call_command("rebuild_deck_counters")
+    assert counts(deck) == (2, 0, 1, 1, 0)
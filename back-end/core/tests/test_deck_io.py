@@ -0,0 +1,140 @@
+import json
+
+import pytest
+from django.core.files.uploadedfile import SimpleUploadedFile
+from django.urls import reverse
+from rest_framework.test import APIClient
+
+from core.models import Deck, DeckCounter, Flashcard, User
+
+
+@pytest.fixture
+def client(get_token):
+    client = APIClient()
+    client.credentials(HTTP_AUTHORIZATION=f"Bearer {get_token}")
+    return client
+
+
+@pytest.fixture
+def deck(create_user):
+    return Deck.objects.create(user=create_user, title="Import", description="")
+
+
+def upload(client, deck, name, content, **data):
+    url = reverse("deck-import-cards", args=[deck.id])
+    file = SimpleUploadedFile(name, content.encode("utf-8"))
+    return client.post(url, {"file": file, **data}, format="multipart")
+
+
+@pytest.mark.django_db
+def test_csv_import_with_header_and_per_row_errors(client, deck):
+    content = 'front,back\nHola,Hello\n"Multi\nline",Two lines\n,missing front\nAdiós,Bye\n'
+    response = upload(client, deck, "cards.csv", content)
+
+    assert response.status_code == 201
+    report = response.json()
+    assert report["created"] == 3
+    assert report["error_count"] == 1
+    assert report["errors"][0]["row"] == 4
+    assert "front" in report["errors"][0]["errors"]
+    assert list(deck.flashcards.order_by("id").values_list("front", flat=True)) == ["Hola", "Multi\nline", "Adiós"]
+    assert DeckCounter.objects.get(deck=deck).total == 3
+
+
+@pytest.mark.django_db
+def test_anki_tsv_import_skips_comment_lines(client, deck):
+    content = "#separator:tab\n#html:false\nperro\tdog\ngato\tcat\n"
+    response = upload(client, deck, "export.txt", content)
+
+    assert response.status_code == 201
+    assert response.json()["created"] == 2
+    assert set(deck.flashcards.values_list("back", flat=True)) == {"dog", "cat"}
+    assert all(card.user_id == deck.user_id for card in deck.flashcards.all())
+
+
+@pytest.mark.django_db
+def test_csv_import_keeps_lines_starting_with_hash(client, deck):
+    content = 'front,back\n#1 rule,Never give up\n"multi\n#2 line",x\nok,y\n'
+    response = upload(client, deck, "cards.csv", content)
+
+    assert response.json()["created"] == 3
+    assert list(deck.flashcards.order_by("id").values_list("front", "back")) == [
+        ("#1 rule", "Never give up"), ("multi\n#2 line", "x"), ("ok", "y"),
+    ]
+
+
+@pytest.mark.django_db
+def test_json_import_reports_malformed_objects(client, deck):
+    content = '[{"front": "a", "back": "b"}, {"front": "c", "back": }, {"front": "d", "back": "e"}]'
+    response = upload(client, deck, "cards.json", content)
+
+    report = response.json()
+    assert response.status_code == 201
+    assert report["created"] == 2
+    assert report["errors"] == [{"row": 2, "errors": {"non_field_errors": ["Malformed row."]}}]
+
+
+@pytest.mark.django_db
+def test_import_with_no_valid_rows_is_rejected(client, deck):
+    response = upload(client, deck, "cards.csv", ",\nonly front,\n")
+
+    assert response.status_code == 400
+    assert response.json()["created"] == 0
+    assert not deck.flashcards.exists()
+
+
+@pytest.mark.django_db
+def test_import_rejects_unknown_format(client, deck):
+    response = upload(client, deck, "cards.xlsx", "whatever")
+    assert response.status_code == 400
+    assert "file" in response.json()
+
+
+@pytest.mark.django_db
+def test_import_into_someone_elses_deck_is_404(client):
+    other = User.objects.create_user(email="other@mail.com", username="other", password="secret")
+    foreign = Deck.objects.create(user=other, title="Theirs", description="")
+
+    response = upload(client, foreign, "cards.csv", "a,b\n")
+    assert response.status_code == 404
+    assert not Flashcard.objects.exists()
+
+
+@pytest.mark.django_db
+def test_large_import_uses_batched_inserts(client, deck, django_assert_max_num_queries):
+    content = "".join(f"q{i},a{i}\n" for i in range(1200))
+    with django_assert_max_num_queries(40):
+        response = upload(client, deck, "cards.csv", content)
+
+    assert response.json()["created"] == 1200
+    assert deck.flashcards.count() == 1200
+
+
+@pytest.mark.django_db
+@pytest.mark.parametrize("fmt", ["csv", "tsv", "json"])
+def test_export_round_trips(client, deck, fmt):
+    Flashcard.objects.create(deck=deck, front="Hola, mundo", back='Dice "hi"')
+    Flashcard.objects.create(deck=deck, front="Tab\there", back="Line\nbreak")
+    Flashcard.objects.create(deck=deck, front="#1 rule", back="Never give up")
+    Flashcard.objects.create(deck=deck, front="#tag:value", back="multi\n#2 line")
+
+    response = client.get(reverse("deck-export", args=[deck.id]), {"fmt": fmt})
+    assert response.status_code == 200
+    assert response.streaming
+    assert f'filename="deck-{deck.id}.{fmt}"' in response["Content-Disposition"]
+    body = b"".join(response.streaming_content).decode("utf-8")
+
+    if fmt == "json":
+        assert json.loads(body) == [
+            {"front": "Hola, mundo", "back": 'Dice "hi"'},
+            {"front": "Tab\there", "back": "Line\nbreak"},
+            {"front": "#1 rule", "back": "Never give up"},
+            {"front": "#tag:value", "back": "multi\n#2 line"},
+        ]
+
+    target = Deck.objects.create(user=deck.user, title="Copy", description="")
+    response = upload(client, target, f"copy.{fmt}", body)
+    assert response.json()["created"] == 4
+    assert list(target.flashcards.order_by("id").values_list("front", "back")) == list(
+        deck.flashcards.order_by("id").values_list("front", "back")
+    )
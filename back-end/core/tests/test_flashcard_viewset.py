@@ -1,7 +1,12 @@
 import pytest
 from rest_framework.test import APIClient
+from django.db import connection
 from django.urls import reverse
-from core.models import Deck, Flashcard
+from django.utils import timezone
+from datetime import timedelta
+from core.models import Deck, Flashcard, User
+from core.pagination import DueQueueKeyset
+from core.services.flashcards import due_queue
 
 
 @pytest.mark.django_db
@@ -25,4 +30,162 @@ def test_create_flashcard_in_user_deck(create_user):
     data = response.json()
     assert data["front"] == payload["front"]
     assert data["back"] == payload["back"]
-    assert data["deck"] == deck.id
\ No newline at end of file
+    assert data["deck"] == deck.id
+
+@pytest.mark.django_db
+def test_flashcard_inherits_deck_owner(create_user, create_deck):
+    """
+    The denormalized `user` column is filled from the deck on save.
+    """
+    card = Flashcard.objects.create(deck=create_deck, front="Q", back="A")
+    assert card.user_id == create_user.id
+
+
+@pytest.mark.django_db
+def test_study_cards_returns_due_batches_with_cursor(create_user, create_deck):
+    """
+    The study endpoint only returns new or due cards, ordered by due_date
+    (new cards first), in bounded batches linked by a keyset cursor.
+    """
+    now = timezone.now()
+    new_card = Flashcard.objects.create(deck=create_deck, front="new", back="a")
+    due_old = Flashcard.objects.create(
+        deck=create_deck, front="old", back="a", status="review", due_date=now - timedelta(days=2)
+    )
+    due_recent = Flashcard.objects.create(
+        deck=create_deck, front="recent", back="a", status="learning", due_date=now - timedelta(minutes=5)
+    )
+    Flashcard.objects.create(
+        deck=create_deck, front="future", back="a", status="review", due_date=now + timedelta(days=3)
+    )
+
+    client = APIClient()
+    client.force_authenticate(user=create_user)
+    url = reverse("flashcard-study-cards")
+
+    first = client.get(url, {"limit": 2}).json()
+    assert [c["id"] for c in first["results"]] == [new_card.id, due_old.id]
+    assert first["next"]
+
+    second = client.get(url, {"limit": 2, "cursor": first["next"]}).json()
+    assert [c["id"] for c in second["results"]] == [due_recent.id]
+    assert second["next"] is None
+
+
+@pytest.mark.django_db
+@pytest.mark.skipif(connection.vendor != "sqlite", reason="reads SQLite's EXPLAIN QUERY PLAN")
+def test_study_batches_are_index_range_scans(create_user, rf):
+    """Every part of a study batch follows its index: no sort of the user's queue."""
+    cursor = DueQueueKeyset().encode_cursor(
+        Flashcard(id=7, status="review", due_date=timezone.now() - timedelta(days=1))
+    )
+    for params in ({}, {"cursor": cursor}):
+        new, due, _ = DueQueueKeyset().page_querysets(due_queue(create_user, timezone.now()), rf.get("/", params))
+        parts = ([new] if new is not None else []) + due
+        assert len(parts) == (3 if not params else 2)
+        for part in parts:
+            plan = part.explain()
+            assert "USING INDEX flashcard_" in plan, plan
+            assert "TEMP B-TREE" not in plan, plan
+
+
+@pytest.mark.django_db
+def test_study_cards_rejects_invalid_cursor(create_user):
+    client = APIClient()
+    client.force_authenticate(user=create_user)
+
+    response = client.get(reverse("flashcard-study-cards"), {"cursor": "not-a-cursor"})
+    assert response.status_code == 400
+
+
+@pytest.mark.django_db
+def test_review_batch_applies_answers_and_reports_per_item(create_user, create_deck):
+    """
+    The batch endpoint schedules every valid item, saves them in bulk and
+    reports unknown cards or invalid answers per item without failing the batch.
+    """
+    other_user = User.objects.create_user(email="other@mail.com", username="other", password="secret")
+    foreign_card = Flashcard.objects.create(
+        deck=Deck.objects.create(user=other_user, title="Other"), front="x", back="y"
+    )
+    again_card = Flashcard.objects.create(deck=create_deck, front="q1", back="a1")
+    good_card = Flashcard.objects.create(deck=create_deck, front="q2", back="a2")
+    reviewed_at = timezone.now() - timedelta(hours=1)
+
+    client = APIClient()
+    client.force_authenticate(user=create_user)
+    payload = [
+        {"id": again_card.id, "answer": "again"},
+        {"id": good_card.id, "answer": "good", "reviewed_at": reviewed_at.isoformat()},
+        {"id": foreign_card.id, "answer": "good"},
+        {"id": good_card.id, "answer": "maybe"},
+    ]
+
+    response = client.post(reverse("flashcard-review-batch"), payload, format="json")
+    assert response.status_code == 200
+    results = response.json()["results"]
+    assert [r["status"] for r in results] == ["ok", "ok", "error", "error"]
+    assert "answer" in results[3]["errors"]
+
+    again_card.refresh_from_db()
+    good_card.refresh_from_db()
+    foreign_card.refresh_from_db()
+    assert again_card.status == "learning" and again_card.lapses == 1
+    assert good_card.status == "review" and good_card.interval == 1
+    assert good_card.last_reviewed == reviewed_at
+    assert foreign_card.status == "new"
+
+
+@pytest.mark.django_db
+def test_review_batch_rejects_empty_payload(create_user):
+    client = APIClient()
+    client.force_authenticate(user=create_user)
+
+    response = client.post(reverse("flashcard-review-batch"), [], format="json")
+    assert response.status_code == 400
+
+
+@pytest.mark.django_db
+def test_flashcard_list_is_cursor_paginated_with_sparse_fields(create_user, create_deck):
+    for i in range(3):
+        Flashcard.objects.create(deck=create_deck, front=f"q{i}", back=f"a{i}")
+
+    client = APIClient()
+    client.force_authenticate(user=create_user)
+
+    first = client.get(reverse("flashcard-list"), {"page_size": 2, "fields": "id,status"}).json()
+    assert len(first["results"]) == 2
+    assert set(first["results"][0]) == {"id", "status"}
+
+    second = client.get(first["next"]).json()
+    assert len(second["results"]) == 1
+    assert second["next"] is None
+
+    deck_page = client.get(reverse("deck-flashcards", args=[create_deck.id]), {"page_size": 2}).json()
+    assert len(deck_page["results"]) == 2 and deck_page["next"]
+
+
+@pytest.mark.django_db
+def test_deck_flashcards_answers_304_until_a_card_changes(create_user, create_deck):
+    """
+    Polling an unchanged deck with If-None-Match returns 304 without a body;
+    deleting a card (which does not move max(updated_at)) changes the ETag.
+    """
+    card = Flashcard.objects.create(deck=create_deck, front="q", back="a")
+    Flashcard.objects.create(deck=create_deck, front="q2", back="a2")
+
+    client = APIClient()
+    client.force_authenticate(user=create_user)
+    url = reverse("deck-flashcards", args=[create_deck.id])
+
+    response = client.get(url)
+    assert response.status_code == 200
+    etag = response["ETag"]
+    assert response["Last-Modified"]
+
+    not_modified = client.get(url, HTTP_IF_NONE_MATCH=etag)
+    assert not_modified.status_code == 304
+    assert not_modified.content == b""
+
+    card.delete()
+    assert client.get(url, HTTP_IF_NONE_MATCH=etag).status_code == 200
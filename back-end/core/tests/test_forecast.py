@@ -0,0 +1,106 @@
+import pytest
+from datetime import timedelta
+from django.urls import reverse
+from django.utils import timezone
+from rest_framework.test import APIClient
+from core.models import Flashcard
+
+
+def make_card(deck, days_from_today, **extra):
+    due = timezone.now().replace(hour=12, minute=0, second=0, microsecond=0) + timedelta(days=days_from_today)
+    fields = {"front": "q", "back": "a", "status": "review", "interval": 3, **extra}
+    return Flashcard.objects.create(deck=deck, due_date=due, **fields)
+
+
+@pytest.mark.django_db
+def test_forecast_counts_reviews_per_day(create_user, create_deck, django_assert_max_num_queries):
+    """
+    The "due" forecast buckets due dates per day with a single aggregated
+    query, and reports new and overdue cards separately.
+    """
+    Flashcard.objects.create(deck=create_deck, front="new", back="a")
+    make_card(create_deck, -2)
+    make_card(create_deck, 0)
+    make_card(create_deck, 2)
+    make_card(create_deck, 2)
+    make_card(create_deck, 40)
+
+    client = APIClient()
+    client.force_authenticate(user=create_user)
+
+    with django_assert_max_num_queries(2):  # forecast version + histogram
+        response = client.get(reverse("flashcard-forecast"), {"days": 5})
+
+    assert response.status_code == 200
+    data = response.json()
+    assert data["new"] == 1
+    assert data["overdue"] == 1
+    assert [day["reviews"] for day in data["forecast"]] == [1, 0, 2, 0, 0]
+
+
+@pytest.mark.django_db
+def test_forecast_is_cached_until_a_review_is_written(create_user, create_deck, django_assert_num_queries):
+    card = make_card(create_deck, 0)
+
+    client = APIClient()
+    client.force_authenticate(user=create_user)
+    url = reverse("flashcard-forecast")
+
+    first = client.get(url, {"days": 3}).json()
+    with django_assert_num_queries(1):  # only the forecast version
+        assert client.get(url, {"days": 3}).json() == first
+
+    client.post(reverse("flashcard-review", args=[card.id]), {"answer": "good"}, format="json")
+
+    after = client.get(url, {"days": 3}).json()
+    assert after != first
+
+
+@pytest.mark.django_db
+def test_review_invalidates_the_forecast_cached_by_every_worker(create_user, create_deck, monkeypatch):
+    """Each gunicorn worker has its own cache; a review in one must not leave the others stale."""
+    from django.core.cache.backends.locmem import LocMemCache
+    from core.services import forecast
+
+    workers = [LocMemCache(f"forecast-worker-{i}", {}) for i in range(2)]
+    card = make_card(create_deck, 0)
+    client = APIClient()
+    client.force_authenticate(user=create_user)
+    url = reverse("flashcard-forecast")
+
+    def get_through(worker):
+        monkeypatch.setattr(forecast, "cache", workers[worker])
+        return client.get(url, {"days": 3}).json()
+
+    before = get_through(0)
+    assert get_through(1) == before
+
+    monkeypatch.setattr(forecast, "cache", workers[1])
+    client.post(reverse("flashcard-review", args=[card.id]), {"answer": "good"}, format="json")
+
+    assert get_through(0) != before
+    assert get_through(0) == get_through(1)
+
+
+@pytest.mark.django_db
+def test_forecast_simulation_projects_follow_up_reviews(create_user, create_deck):
+    """
+    A card due today with interval 1 is answered "good": it comes back
+    after int(1 * 2.5) = 2 days, then after int(2 * 2.5) = 5 days.
+    """
+    make_card(create_deck, 0, interval=1)
+
+    client = APIClient()
+    client.force_authenticate(user=create_user)
+    data = client.get(reverse("flashcard-forecast"), {"days": 10, "mode": "simulate"}).json()
+
+    assert [day["reviews"] for day in data["forecast"]] == [1, 0, 1, 0, 0, 0, 0, 1, 0, 0]
+
+
+@pytest.mark.django_db
+def test_forecast_validates_params(create_user):
+    client = APIClient()
+    client.force_authenticate(user=create_user)
+
+    response = client.get(reverse("flashcard-forecast"), {"days": 0})
+    assert response.status_code == 400
@@ -0,0 +1,144 @@
+import logging
+import os
+
+import pytest
+from django.urls import reverse
+from rest_framework.test import APIClient
+
+from core import metrics
+from core.models import Flashcard
+
+
+@pytest.fixture(autouse=True)
+def clean_registry():
+    metrics.registry.reset()
+    yield
+    metrics.registry.reset()
+
+
+@pytest.mark.django_db
+def test_server_timing_header_reports_db_and_serializer_time(create_user, create_deck):
+    Flashcard.objects.create(deck=create_deck, front="a", back="b")
+    client = APIClient()
+    client.force_authenticate(user=create_user)
+
+    response = client.get(reverse("flashcard-list"))
+
+    timing = response["Server-Timing"]
+    assert timing.startswith("app;dur=")
+    assert 'db;dur=' in timing and ' queries"' in timing
+    assert "serializer;dur=" in timing
+
+
+@pytest.mark.django_db
+def test_requests_are_aggregated_per_route(create_user, create_deck):
+    client = APIClient()
+    client.force_authenticate(user=create_user)
+    client.get(reverse("deck-list"))
+    client.get(reverse("deck-list"))
+    client.get(reverse("deck-flashcards", args=[create_deck.id]))
+
+    snapshot = metrics.registry.snapshot()
+    decks = snapshot[("deck-list", "GET")]
+    assert decks["count"] == 2
+    assert decks["requests"] == {200: 2}
+    assert decks["db_queries"] >= 2
+    assert decks["serializer_time"] > 0
+    assert snapshot[("deck-flashcards", "GET")]["count"] == 1
+
+
+def test_only_project_serializers_are_timed():
+    from rest_framework import serializers
+    from core.serializer import FlashcardReviewSerializer
+
+    class ThirdParty(serializers.Serializer):
+        answer = serializers.CharField()
+
+    timings = metrics.RequestTimings()
+    token = timings.activate()
+    try:
+        assert ThirdParty(data={"answer": "good"}).is_valid()
+        assert timings.serializer_time == 0
+        assert FlashcardReviewSerializer(data={"answer": "good"}).is_valid()
+        assert timings.serializer_time > 0
+    finally:
+        metrics.RequestTimings.deactivate(token)
+
+
+@pytest.mark.django_db
+def test_metrics_endpoint_renders_prometheus_text(create_user, settings):
+    settings.METRICS_TOKEN = "scrape-me"
+    client = APIClient()
+    client.force_authenticate(user=create_user)
+    client.get(reverse("deck-list"))
+
+    assert APIClient().get("/metrics").status_code == 401
+    assert APIClient().get("/metrics", HTTP_AUTHORIZATION="Bearer wrong").status_code == 401
+
+    response = APIClient().get("/metrics", HTTP_AUTHORIZATION="Bearer scrape-me")
+    assert response.status_code == 200
+    assert response["Content-Type"].startswith("text/plain; version=0.0.4")
+    body = response.content.decode()
+    labels = f'route="deck-list",method="GET",worker="{os.getpid()}"'
+    assert "# TYPE memorise_http_request_duration_seconds histogram" in body
+    assert f'memorise_http_requests_total{{{labels},status="200"}} 1' in body
+    assert f"memorise_http_request_duration_seconds_count{{{labels}}} 1" in body
+    assert f"memorise_db_queries_total{{{labels}}}" in body
+
+
+@pytest.mark.django_db
+def test_every_sample_is_labelled_with_the_worker(create_user, settings):
+    settings.METRICS_TOKEN = "scrape-me"
+    client = APIClient()
+    client.force_authenticate(user=create_user)
+    client.get(reverse("deck-list"))
+
+    body = APIClient().get("/metrics", HTTP_AUTHORIZATION="Bearer scrape-me").content.decode()
+
+    samples = [line for line in body.splitlines() if line and not line.startswith("#")]
+    assert any(line.startswith("memorise_llm_") for line in samples)
+    assert all(f'worker="{os.getpid()}"' in line.split(" ")[0] for line in samples)
+
+
+@pytest.mark.django_db
+def test_streaming_responses_are_recorded_when_the_body_is_sent(create_user, create_deck):
+    for i in range(3):
+        Flashcard.objects.create(deck=create_deck, front=f"q{i}", back="a")
+    client = APIClient()
+    client.force_authenticate(user=create_user)
+
+    response = client.get(reverse("deck-export", args=[create_deck.id]), {"fmt": "csv"})
+    assert ("deck-export", "GET") not in metrics.registry.snapshot()
+
+    body = b"".join(response.streaming_content)
+    response.close()
+
+    assert body.count(b"\n") == 4
+    export = metrics.registry.snapshot()[("deck-export", "GET")]
+    assert export["count"] == 1
+    # The cards are read while the body streams: that query belongs to the request
+    assert export["db_queries"] >= 2
+
+
+@pytest.mark.django_db
+def test_metrics_endpoint_allows_staff_only(create_user):
+    client = APIClient()
+    client.force_authenticate(user=create_user)
+    assert client.get("/metrics").status_code == 403
+
+    create_user.is_staff = True
+    create_user.save()
+    assert client.get("/metrics").status_code == 200
+
+
+@pytest.mark.django_db
+def test_slow_queries_are_logged(create_user, settings, caplog):
+    settings.METRICS_SLOW_QUERY_MS = 0
+    client = APIClient()
+    client.force_authenticate(user=create_user)
+
+    with caplog.at_level(logging.WARNING, logger="core.metrics.slow_query"):
+        client.get(reverse("deck-list"))
+
+    assert any("on deck-list" in record.getMessage() for record in caplog.records)
+    assert metrics.registry.snapshot()[("deck-list", "GET")]["slow_queries"] >= 1
@@ -0,0 +1,127 @@
+import io
+
+import pytest
+from django.core.files.uploadedfile import SimpleUploadedFile
+from django.core.management import call_command
+from django.urls import reverse
+from PIL import Image
+from rest_framework.test import APIClient
+
+from core.models import User
+from core.serializer import PublicUserSerializer
+from core.services import profile_pictures
+
+
+@pytest.fixture
+def media(settings, tmp_path):
+    settings.MEDIA_ROOT = tmp_path
+    settings.PROFILE_THUMBNAILS_EAGER = True
+    return tmp_path
+
+
+def _picture(size=(400, 300), fmt="JPEG", name="photo.jpg", color="blue"):
+    file = io.BytesIO()
+    Image.new("RGB", size, color).save(file, fmt)
+    return SimpleUploadedFile(name, file.getvalue(), content_type=f"image/{fmt.lower()}")
+
+
+def _register(picture, email="pic@mail.com"):
+    payload = {
+        "email": email, "username": email.split("@")[0], "password": "secret123",
+        "confirm_password": "secret123", "profile_picture": picture,
+    }
+    return APIClient().post(reverse("user-list"), payload, format="multipart")
+
+
+@pytest.mark.django_db
+def test_upload_is_stored_under_a_content_hash_with_webp_thumbnails(media, django_capture_on_commit_callbacks):
+    with django_capture_on_commit_callbacks(execute=True):
+        response = _register(_picture())
+
+    assert response.status_code == 201, response.content
+    user = User.objects.get()
+    assert user.profile_picture.name.startswith("profiles/")
+    assert user.profile_picture.name.endswith(".jpg")
+    assert set(user.profile_thumbnails) == {"64", "256"}
+    for size, name in user.profile_thumbnails.items():
+        with Image.open(media / name) as thumbnail:
+            assert thumbnail.format == "WEBP"
+            assert thumbnail.size == (int(size), int(size))
+
+
+@pytest.mark.django_db
+def test_same_picture_is_stored_once(media, django_capture_on_commit_callbacks):
+    with django_capture_on_commit_callbacks(execute=True):
+        _register(_picture(), "a@mail.com")
+        _register(_picture(), "b@mail.com")
+
+    first, second = User.objects.order_by("id")
+    assert first.profile_picture.name == second.profile_picture.name
+    assert len(list((media / "profiles").glob("*.jpg"))) == 1
+
+
+@pytest.mark.django_db
+def test_serializer_exposes_per_size_urls(media, django_capture_on_commit_callbacks):
+    with django_capture_on_commit_callbacks(execute=True):
+        _register(_picture())
+    user = User.objects.get()
+
+    urls = PublicUserSerializer(user).data["profile_picture_urls"]
+
+    assert list(urls) == ["original", "64", "256"]
+    assert urls["64"].endswith("-64.webp")
+
+
+@pytest.mark.django_db
+def test_urls_are_empty_without_a_picture(create_user):
+    assert PublicUserSerializer(create_user).data["profile_picture_urls"] == {}
+
+
+@pytest.mark.django_db
+@pytest.mark.parametrize("picture, message", [
+    (_picture(size=(10, 10)), "at least"),
+    (_picture(size=(900, 100)), "at most"),
+    (_picture(fmt="GIF", name="anim.gif"), "JPEG, PNG and WebP"),
+])
+def test_invalid_pictures_are_rejected(media, settings, picture, message):
+    settings.PROFILE_PICTURE_MAX_DIMENSION = 800
+
+    response = _register(picture)
+
+    assert response.status_code == 400
+    assert message in str(response.json()["profile_picture"])
+    assert not User.objects.exists()
+
+
+@pytest.mark.django_db
+def test_oversized_files_are_rejected(media, settings):
+    settings.PROFILE_PICTURE_MAX_BYTES = 100
+
+    response = _register(_picture())
+
+    assert response.status_code == 400
+
+
+@pytest.mark.django_db
+def test_thumbnails_of_a_replaced_picture_are_not_recorded(media, create_user):
+    create_user.profile_picture = profile_pictures.store(_picture())
+    create_user.save()
+    old_name = create_user.profile_picture.name
+    create_user.profile_picture = profile_pictures.store(_picture(color="green"))
+    create_user.save()
+
+    profile_pictures.generate_thumbnails(create_user.id, old_name)
+
+    create_user.refresh_from_db()
+    assert create_user.profile_thumbnails == {}
+
+
+@pytest.mark.django_db
+def test_backfill_command_generates_missing_thumbnails(media, create_user):
+    create_user.profile_picture = profile_pictures.store(_picture(fmt="PNG", name="p.png"))
+    create_user.save()
+
+    call_command("generate_profile_thumbnails")
+
+    create_user.refresh_from_db()
+    assert set(create_user.profile_thumbnails) == {"64", "256"}
@@ -0,0 +1,79 @@
+"""
+Query budgets for every DeckViewSet / FlashCardViewSet action.
+
+Each action runs against the same user at several data sizes (decks and
+cards per deck). The query count must stay within its budget AND be the
+same at every size: a count that grows with the data is an N+1.
+Authentication is forced, so the counts are the view's own queries
+(including the SAVEPOINT/RELEASE pairs of atomic blocks inside the test
+transaction).
+"""
+import pytest
+from django.urls import reverse
+from rest_framework.test import APIClient
+
+from core.models import Deck, Flashcard
+from core.services.flashcards import bulk_create_flashcards
+
+SIZES = (1, 5, 25)
+
+
+def build(user, size):
+    """`size` decks with `size` cards each (a mix of new and due cards)."""
+    decks = [Deck.objects.create(user=user, title=f"Deck {i}") for i in range(size)]
+    for deck in decks:
+        cards = bulk_create_flashcards(deck, [{"front": f"q{i}", "back": f"a{i}"} for i in range(size)])
+        Flashcard.objects.filter(id__in=[card.id for card in cards[1::2]]).update(status="review")
+    return decks, Flashcard.objects.filter(user=user).order_by("id").first()
+
+
+# name: (budget, request(client, decks, card) -> response)
+# Card writes include the UPDATE of the user's ForecastVersion; the forecast reads it.
+# Decks get their DeckCounter row on create; deleting one loads its cards for post_delete.
+ACTIONS = {
+    "deck-list": (3, lambda c, decks, card: c.get(reverse("deck-list"))),
+    "deck-retrieve": (1, lambda c, decks, card: c.get(reverse("deck-detail", args=[decks[0].id]))),
+    "deck-create": (2, lambda c, decks, card: c.post(reverse("deck-list"), {"title": "Nuevo"}, format="json")),
+    "deck-update": (2, lambda c, decks, card: c.patch(
+        reverse("deck-detail", args=[decks[0].id]), {"title": "Otro"}, format="json")),
+    "deck-destroy": (12, lambda c, decks, card: c.delete(reverse("deck-detail", args=[decks[0].id]))),
+    "deck-flashcards": (3, lambda c, decks, card: c.get(reverse("deck-flashcards", args=[decks[0].id]))),
+    "flashcard-list": (2, lambda c, decks, card: c.get(reverse("flashcard-list"))),
+    "flashcard-retrieve": (1, lambda c, decks, card: c.get(reverse("flashcard-detail", args=[card.id]))),
+    "flashcard-create": (4, lambda c, decks, card: c.post(
+        reverse("flashcard-list"), {"deck": decks[0].id, "front": "f", "back": "b"}, format="json")),
+    "flashcard-update": (3, lambda c, decks, card: c.patch(
+        reverse("flashcard-detail", args=[card.id]), {"back": "nuevo"}, format="json")),
+    "flashcard-review": (6, lambda c, decks, card: c.post(
+        reverse("flashcard-review", args=[card.id]), {"answer": "good"}, format="json")),
+    "flashcard-destroy": (7, lambda c, decks, card: c.delete(reverse("flashcard-detail", args=[card.id]))),
+    # One review per card of the first deck: the batch itself grows with size
+    "flashcard-review-batch": (7, lambda c, decks, card: c.post(
+        reverse("flashcard-review-batch"),
+        [{"id": id_, "answer": "good"} for id_ in decks[0].flashcards.values_list("id", flat=True)],
+        format="json")),
+    # One range scan per part of the queue: new, learning and review cards
+    "flashcard-study": (3, lambda c, decks, card: c.get(reverse("flashcard-study-cards"))),
+    "flashcard-forecast": (2, lambda c, decks, card: c.get(reverse("flashcard-forecast"))),
+    "sync": (2, lambda c, decks, card: c.get(reverse("sync"))),
+}
+
+
+@pytest.mark.django_db
+@pytest.mark.parametrize("name", ACTIONS)
+def test_action_query_count_is_bounded_and_independent_of_size(name, count_queries, django_user_model):
+    budget, request = ACTIONS[name]
+    counts = {}
+    for size in SIZES:
+        user = django_user_model.objects.create_user(
+            email=f"size{size}@mail.com", username=f"size{size}", password="secret"
+        )
+        client = APIClient()
+        client.force_authenticate(user=user)
+        decks, card = build(user, size)
+
+        response, counts[size] = count_queries(lambda: request(client, decks, card))
+        assert response.status_code < 400, (name, size, response.content)
+
+    assert max(counts.values()) <= budget, f"{name} ran {counts} queries, budget {budget}"
+    assert len(set(counts.values())) == 1, f"{name} query count grows with data size: {counts}"
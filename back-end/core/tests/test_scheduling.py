@@ -0,0 +1,95 @@
+import random
+from decimal import Decimal
+
+import pytest
+
+from core.scheduling import ANSWERS, CardState, next_state, next_states
+
+
+def legacy_review(interval, ease, streak, lapses, answer):
+    """
+    The original Decimal-based algorithm from FlashCardViewSet.review,
+    kept verbatim as the oracle the engine must reproduce.
+    """
+    if answer == "again":
+        return 1, max(Decimal("1.3"), ease - Decimal("0.2")), 0, lapses + 1, "learning", 10
+    if answer == "good":
+        interval = max(1, int(interval * float(ease)))
+        return interval, min(Decimal("2.5"), ease + Decimal("0.05")), streak + 1, lapses, "review", interval * 1440
+    interval = max(1, int(interval * float(ease) * 1.5))
+    return interval, min(Decimal("3.0"), ease + Decimal("0.15")), streak + 1, lapses, "review", interval * 1440
+
+
+def random_states(seed, count):
+    rng = random.Random(seed)
+    statuses = ["new", "learning", "review", "lapsed"]
+    for _ in range(count):
+        yield (
+            rng.randint(0, 400),
+            Decimal(rng.randint(130, 500)) / 100,
+            rng.randint(0, 50),
+            rng.randint(0, 50),
+            rng.choice(statuses),
+            rng.choice(ANSWERS),
+        )
+
+
+@pytest.mark.parametrize("seed", range(5))
+def test_next_state_matches_legacy_algorithm(seed):
+    """
+    Property: for any state and answer, the pure engine gives exactly the
+    result of the legacy Decimal implementation.
+    """
+    for interval, ease, streak, lapses, status, answer in random_states(seed, 500):
+        new, due_in = next_state(CardState(interval, float(ease), streak, lapses, status), answer)
+        expected = legacy_review(interval, ease, streak, lapses, answer)
+
+        assert new.interval == expected[0]
+        assert Decimal(f"{new.ease_factor:.2f}") == expected[1]
+        assert (new.streak, new.lapses, new.status, due_in) == expected[2:]
+
+
+def test_next_states_matches_scalar_engine():
+    """
+    Property: the NumPy batch path equals running next_state card by card.
+    """
+    rows = list(random_states(42, 2000))
+    columns = list(zip(*rows))
+    columns[1] = [float(ease) for ease in columns[1]]
+
+    batch = next_states(*columns)
+
+    for i, (interval, ease, streak, lapses, status, answer) in enumerate(rows):
+        new, due_in = next_state((interval, float(ease), streak, lapses, status), answer)
+        assert int(batch.interval[i]) == new.interval
+        assert float(batch.ease_factor[i]) == new.ease_factor
+        assert int(batch.streak[i]) == new.streak
+        assert int(batch.lapses[i]) == new.lapses
+        assert batch.status[i] == new.status
+        assert int(batch.due_in_minutes[i]) == due_in
+
+
+def test_invariants_over_long_sessions():
+    """
+    Property: whatever the answers, intervals stay >= 1, ease never drops
+    below 1.3 and "again" always resets the streak.
+    """
+    rng = random.Random(7)
+    state = CardState(0, 2.5, 0, 0, "new")
+    for _ in range(1000):
+        answer = rng.choice(ANSWERS)
+        previous = state
+        state, _ = next_state(state, answer)
+        assert state.interval >= 1
+        assert state.ease_factor >= 1.3
+        if answer == "again":
+            assert state.streak == 0 and state.lapses == previous.lapses + 1
+        else:
+            assert state.streak == previous.streak + 1
+
+
+def test_unknown_answer_is_rejected():
+    with pytest.raises(ValueError):
+        next_state(CardState(1, 2.5, 0, 0, "new"), "maybe")
+    with pytest.raises(ValueError):
+        next_states([1], [2.5], [0], [0], ["new"], ["maybe"])
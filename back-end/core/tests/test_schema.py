@@ -0,0 +1,105 @@
+import json
+
+import pytest
+import yaml
+from django.core.management import call_command
+from django.urls import reverse
+from drf_spectacular.generators import SchemaGenerator
+from drf_spectacular.renderers import OpenApiJsonRenderer
+from rest_framework.test import APIClient
+
+from core import schema
+
+
+@pytest.fixture
+def schema_dir(settings, tmp_path, monkeypatch):
+    settings.OPENAPI_SCHEMA_DIR = str(tmp_path)
+    settings.CODE_VERSION = "v1"
+    schema.code_version.cache_clear()
+    schema.cache.clear()
+    calls = []
+    generate = schema.generate
+    monkeypatch.setattr(schema, "generate", lambda: calls.append(1) or generate())
+    yield calls
+    schema.code_version.cache_clear()
+    schema.cache.clear()
+
+
+@pytest.mark.django_db
+def test_schema_is_generated_once_per_version(schema_dir, tmp_path):
+    client = APIClient()
+
+    first = client.get(reverse("schema"))
+    second = client.get(reverse("schema"), {"format": "json"})
+
+    assert first.status_code == second.status_code == 200
+    assert yaml.safe_load(first.content) == json.loads(second.content)
+    assert len(schema_dir) == 1
+    assert (tmp_path / "openapi-v1.json").exists()
+
+
+@pytest.mark.django_db
+def test_cached_schema_matches_a_fresh_generation(schema_dir):
+    response = APIClient().get(reverse("schema"), {"format": "json"})
+
+    fresh = json.loads(OpenApiJsonRenderer().render(SchemaGenerator().get_schema(request=None, public=True)))
+    assert json.loads(response.content) == fresh
+    assert "/api/decks/" in fresh["paths"]
+    assert "jwtAuth" in fresh["components"]["securitySchemes"]
+
+
+@pytest.mark.django_db
+def test_etag_revalidation_returns_304(schema_dir):
+    client = APIClient()
+    etag = client.get(reverse("schema"))["ETag"]
+
+    response = client.get(reverse("schema"), HTTP_IF_NONE_MATCH=etag)
+
+    assert response.status_code == 304
+    assert response["ETag"] == etag
+
+
+@pytest.mark.django_db
+def test_new_process_loads_the_stored_schema(schema_dir):
+    APIClient().get(reverse("schema"))
+    schema.cache.clear()
+
+    response = APIClient().get(reverse("schema"))
+
+    assert response.status_code == 200
+    assert len(schema_dir) == 1
+
+
+@pytest.mark.django_db
+def test_new_code_version_rebuilds_and_drops_the_old_file(schema_dir, settings, tmp_path):
+    client = APIClient()
+    old_etag = client.get(reverse("schema"))["ETag"]
+
+    settings.CODE_VERSION = "v2"
+    schema.code_version.cache_clear()
+    response = client.get(reverse("schema"), HTTP_IF_NONE_MATCH=old_etag)
+
+    assert response.status_code == 200
+    assert len(schema_dir) == 2
+    assert [path.name for path in tmp_path.glob("openapi-*.json")] == ["openapi-v2.json"]
+
+
+def test_code_version_hashes_the_sources_when_not_configured(settings):
+    settings.CODE_VERSION = ""
+    schema.code_version.cache_clear()
+    try:
+        version = schema.code_version()
+        assert len(version) == 16
+        assert version == schema.code_version()
+    finally:
+        schema.code_version.cache_clear()
+
+
+@pytest.mark.django_db
+def test_build_schema_command(schema_dir, tmp_path, capsys):
+    call_command("build_schema")
+    call_command("build_schema")
+
+    assert (tmp_path / "openapi-v1.json").exists()
+    assert "up to date" in capsys.readouterr().out
+    assert len(schema_dir) == 1
@@ -0,0 +1,147 @@
+import gzip
+
+import pytest
+from django.test import Client
+
+from core import files
+from core.storage import CompressedManifestStaticFilesStorage
+
+CSS = "body { color: red; }\n" * 200
+
+
+@pytest.fixture
+def static_root(settings, tmp_path):
+    root = tmp_path / "static"
+    (root / "app").mkdir(parents=True)
+    (root / "app" / "site.css").write_text(CSS)
+    (root / "app" / "site.css.gz").write_bytes(gzip.compress(CSS.encode()))
+    (root / "app" / "site.0123456789ab.css").write_text(CSS)
+    settings.STATIC_ROOT = root
+    files.clear_cache()
+    yield root
+    files.clear_cache()
+
+
+@pytest.fixture
+def media_root(settings, tmp_path):
+    root = tmp_path / "media"
+    (root / "profiles").mkdir(parents=True)
+    (root / "profiles" / "notes.bin").write_bytes(bytes(range(256)) * 4)
+    (root / "profiles" / f"{'a' * 32}.jpg").write_bytes(b"jpeg")
+    settings.MEDIA_ROOT = root
+    return root
+
+
+def _body(response):
+    return b"".join(response.streaming_content) if response.streaming else response.content
+
+
+def test_collectstatic_writes_compressed_variants(tmp_path):
+    source = tmp_path / "source"
+    source.mkdir()
+    (source / "site.css").write_text(CSS)
+    (source / "tiny.js").write_text("x=1")
+    storage = CompressedManifestStaticFilesStorage(location=tmp_path / "out", base_url="/static/")
+    for name in ("site.css", "tiny.js"):
+        with open(source / name, "rb") as file:
+            storage.save(name, file)
+
+    list(storage.post_process({name: (storage, name) for name in ("site.css", "tiny.js")}))
+
+    hashed = storage.stored_name("site.css")
+    assert hashed != "site.css"
+    assert gzip.decompress((tmp_path / "out" / f"{hashed}.gz").read_bytes()).decode() == CSS
+    assert (tmp_path / "out" / f"{hashed}.br").exists()
+    assert not (tmp_path / "out" / "tiny.js.gz").exists()  # too small to bother
+
+
+@pytest.mark.django_db
+def test_static_file_negotiates_precompressed_variant(static_root):
+    response = Client().get("/static/app/site.css", headers={"accept-encoding": "br;q=0, gzip"})
+
+    assert response.status_code == 200
+    assert response["Content-Encoding"] == "gzip"
+    assert response["Content-Type"].startswith("text/css")
+    assert response["Vary"] == "Accept-Encoding"
+    assert gzip.decompress(_body(response)).decode() == CSS
+
+
+@pytest.mark.django_db
+def test_static_file_without_accept_encoding_is_identity(static_root):
+    response = Client().get("/static/app/site.css")
+
+    assert "Content-Encoding" not in response
+    assert _body(response).decode() == CSS
+    assert response["Cache-Control"] == "public, max-age=60"
+
+
+@pytest.mark.django_db
+def test_hashed_names_are_immutable(static_root, media_root):
+    static = Client().get("/static/app/site.0123456789ab.css")
+    media = Client().get(f"/media/profiles/{'a' * 32}.jpg")
+
+    assert static["Cache-Control"] == files.IMMUTABLE
+    assert media["Cache-Control"] == files.IMMUTABLE
+
+
+@pytest.mark.django_db
+def test_conditional_get_returns_304(static_root):
+    client = Client()
+    etag = client.get("/static/app/site.css")["ETag"]
+
+    response = client.get("/static/app/site.css", headers={"if-none-match": etag})
+
+    assert response.status_code == 304
+    assert response["ETag"] == etag
+
+
+@pytest.mark.django_db
+@pytest.mark.parametrize("header, start, end", [
+    ("bytes=0-9", 0, 9),
+    ("bytes=1000-", 1000, 1023),
+    ("bytes=-24", 1000, 1023),
+    ("bytes=1000-5000", 1000, 1023),
+])
+def test_media_range_requests(media_root, header, start, end):
+    response = Client().get("/media/profiles/notes.bin", headers={"range": header})
+
+    assert response.status_code == 206
+    assert response["Content-Range"] == f"bytes {start}-{end}/1024"
+    assert response["Content-Length"] == str(end - start + 1)
+    assert _body(response) == (bytes(range(256)) * 4)[start:end + 1]
+
+
+@pytest.mark.django_db
+def test_unsatisfiable_range_is_416(media_root):
+    response = Client().get("/media/profiles/notes.bin", headers={"range": "bytes=5000-"})
+
+    assert response.status_code == 416
+    assert response["Content-Range"] == "bytes */1024"
+
+
+@pytest.mark.django_db
+def test_stale_if_range_serves_the_whole_file(media_root):
+    response = Client().get("/media/profiles/notes.bin", headers={"range": "bytes=0-9", "if-range": '"stale"'})
+
+    assert response.status_code == 200
+    assert len(_body(response)) == 1024
+
+
+@pytest.mark.django_db
+def test_head_and_method_checks(media_root):
+    client = Client()
+
+    head = client.head("/media/profiles/notes.bin")
+    post = client.post("/media/profiles/notes.bin")
+
+    assert head.status_code == 200
+    assert head["Content-Length"] == "1024"
+    assert post.status_code == 405
+
+
+@pytest.mark.django_db
+def test_paths_outside_the_root_and_missing_files_are_404(media_root):
+    client = Client()
+
+    assert client.get("/media/../settings.py").status_code == 404
+    assert client.get("/media/profiles/missing.jpg").status_code == 404
@@ -0,0 +1,137 @@
+import pytest
+from datetime import timedelta
+from django.urls import reverse
+from django.utils import timezone
+from rest_framework.test import APIClient
+from core.models import Deck, DeckCounter, Flashcard, Tombstone
+from core.services import sync
+
+
+@pytest.mark.django_db
+def test_sync_returns_only_changes_since_token(create_user, create_deck):
+    """
+    First sync is a full snapshot; the next one only carries what changed
+    since the returned token, including tombstones for deletions.
+    """
+    kept = Flashcard.objects.create(deck=create_deck, front="kept", back="a")
+    removed = Flashcard.objects.create(deck=create_deck, front="removed", back="a")
+
+    client = APIClient()
+    client.force_authenticate(user=create_user)
+    url = reverse("sync")
+
+    first = client.get(url).json()
+    assert first["full"] is True
+    assert {c["id"] for c in first["flashcards"]} == {kept.id, removed.id}
+
+    # Pretend the first sync happened well before the next changes
+    token = sync.issue_token(timezone.now() - timedelta(minutes=1))
+    Flashcard.objects.filter(id__in=[kept.id, removed.id]).update(updated_at=timezone.now() - timedelta(minutes=5))
+    Deck.objects.filter(id=create_deck.id).update(updated_at=timezone.now() - timedelta(minutes=5))
+
+    client.patch(reverse("flashcard-detail", args=[kept.id]), {"back": "changed"}, format="json")
+    client.delete(reverse("flashcard-detail", args=[removed.id]))
+
+    delta = client.get(url, {"since": token}).json()
+    assert delta["full"] is False
+    assert [(deck["id"], deck["total"]) for deck in delta["decks"]] == [(create_deck.id, 1)]  # counters moved
+    assert [c["id"] for c in delta["flashcards"]] == [kept.id]
+    assert delta["deleted"]["flashcard"] == [removed.id]
+    assert delta["token"]
+
+
+@pytest.mark.django_db
+def test_deck_deletion_tombstones_its_flashcards(create_user, create_deck):
+    card = Flashcard.objects.create(deck=create_deck, front="q", back="a")
+
+    client = APIClient()
+    client.force_authenticate(user=create_user)
+    token = sync.issue_token(timezone.now())
+
+    client.delete(reverse("deck-detail", args=[create_deck.id]))
+
+    delta = client.get(reverse("sync"), {"since": token}).json()
+    assert delta["deleted"] == {"deck": [create_deck.id], "flashcard": [card.id]}
+
+
+@pytest.mark.django_db
+def test_stale_or_invalid_tokens(create_user, settings):
+    client = APIClient()
+    client.force_authenticate(user=create_user)
+
+    assert client.get(reverse("sync"), {"since": "forged"}).status_code == 400
+
+    settings.SYNC_TOMBSTONE_RETENTION_DAYS = 1
+    old_token = sync.issue_token(timezone.now() - timedelta(days=2))
+    assert client.get(reverse("sync"), {"since": old_token}).json()["full"] is True
+
+
+@pytest.mark.django_db
+def test_prune_tombstones_keeps_recent_ones(create_user, settings):
+    settings.SYNC_TOMBSTONE_RETENTION_DAYS = 1
+    Tombstone.objects.create(user=create_user, kind="deck", object_id=1, deleted_at=timezone.now() - timedelta(days=3))
+    recent = Tombstone.objects.create(user=create_user, kind="deck", object_id=2)
+
+    assert sync.prune_tombstones(batch_size=1) == 1
+    assert list(Tombstone.objects.values_list("id", flat=True)) == [recent.id]
+
+
+@pytest.mark.django_db
+def test_full_snapshot_is_paged_with_the_token(create_user, create_deck, settings):
+    """
+    A first sync sends the cards in pages; the token of the last page starts
+    the deltas from the time the snapshot began, so a card edited while the
+    snapshot was being paged comes back in the next delta.
+    """
+    settings.SYNC_SNAPSHOT_PAGE_SIZE = 2
+    cards = [Flashcard.objects.create(deck=create_deck, front=f"q{i}", back="a") for i in range(5)]
+    Flashcard.objects.update(updated_at=timezone.now() - timedelta(minutes=5))
+    client = APIClient()
+    client.force_authenticate(user=create_user)
+    url = reverse("sync")
+
+    pages = [client.get(url).json()]
+    while pages[-1]["more"]:
+        pages.append(client.get(url, {"since": pages[-1]["token"]}).json())
+
+    assert [len(page["flashcards"]) for page in pages] == [2, 2, 1]
+    assert [page["full"] for page in pages] == [True, False, False]
+    assert [len(page["decks"]) for page in pages] == [1, 0, 0]
+    assert [c["id"] for page in pages for c in page["flashcards"]] == [card.id for card in cards]
+
+    client.patch(reverse("flashcard-detail", args=[cards[0].id]), {"back": "changed"}, format="json")
+    delta = client.get(url, {"since": pages[-1]["token"]}).json()
+    assert delta["full"] is False and delta["more"] is False
+    assert [c["id"] for c in delta["flashcards"]] == [cards[0].id]
+
+
+@pytest.mark.django_db
+def test_delta_resends_decks_whose_counters_moved(create_user, create_deck):
+    """
+    Reviews, deletions and moves change a deck's counters without saving the
+    deck; the delta still re-sends it with the new counts.
+    """
+    reviewed = Flashcard.objects.create(deck=create_deck, front="q", back="a")
+    removed = Flashcard.objects.create(deck=create_deck, front="q2", back="a2")
+    other = Deck.objects.create(user=create_user, title="Other")
+    Flashcard.objects.create(deck=other, front="q3", back="a3")
+    client = APIClient()
+    client.force_authenticate(user=create_user)
+    url = reverse("sync")
+
+    old = timezone.now() - timedelta(minutes=5)
+    Deck.objects.update(updated_at=old)
+    Flashcard.objects.update(updated_at=old)
+    DeckCounter.objects.update(updated_at=old)
+    token = sync.issue_token(timezone.now() - timedelta(minutes=1))
+    assert client.get(url, {"since": token}).json()["decks"] == []
+
+    client.post(reverse("flashcard-review", args=[reviewed.id]), {"answer": "good"}, format="json")
+    decks = {deck["id"]: deck for deck in client.get(url, {"since": token}).json()["decks"]}
+    assert set(decks) == {create_deck.id}
+    assert decks[create_deck.id]["new"] == 1
+
+    Flashcard.objects.filter(id=reviewed.id).update(updated_at=old)
+    client.delete(reverse("flashcard-detail", args=[removed.id]))
+    decks = {deck["id"]: deck for deck in client.get(url, {"since": token}).json()["decks"]}
+    assert decks[create_deck.id]["total"] == 1
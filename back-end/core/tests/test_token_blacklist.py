@@ -0,0 +1,110 @@
+import pytest
+from datetime import timedelta
+from django.core.management import call_command
+from django.urls import reverse
+from django.utils import timezone
+from rest_framework.test import APIClient
+from rest_framework_simplejwt.exceptions import TokenError
+from rest_framework_simplejwt.token_blacklist.models import BlacklistedToken, OutstandingToken
+
+from core.authentication import BlacklistRefreshToken
+from core.services.token_blacklist import BloomFilter, index
+
+
+def _login(user):
+    response = APIClient().post(
+        reverse("token_obtain_pair"), {"email": user.email, "password": user.password}, format="json"
+    )
+    assert response.status_code == 200
+    return response.json()["refresh"]
+
+
+def _refresh(token):
+    return APIClient().post(reverse("token_refresh"), {"refresh": token}, format="json")
+
+
+def test_bloom_filter_has_no_false_negatives():
+    bloom = BloomFilter(1000, 0.01)
+    values = [f"jti-{i}" for i in range(1000)]
+    for value in values:
+        bloom.add(value)
+
+    assert all(value in bloom for value in values)
+    false_positives = sum(f"other-{i}" in bloom for i in range(10000))
+    assert false_positives < 300
+
+
+@pytest.mark.django_db
+def test_login_records_the_outstanding_token(create_user):
+    refresh = BlacklistRefreshToken(_login(create_user))
+
+    assert OutstandingToken.objects.filter(jti=refresh["jti"], user=create_user).exists()
+
+
+@pytest.mark.django_db
+def test_rotation_blacklists_the_old_refresh_token(create_user):
+    old = _login(create_user)
+
+    response = _refresh(old)
+
+    assert response.status_code == 200
+    assert BlacklistedToken.objects.filter(token__jti=BlacklistRefreshToken(old, verify=False)["jti"]).exists()
+    assert _refresh(old).status_code == 401
+    assert _refresh(response.json()["refresh"]).status_code == 200
+
+
+@pytest.mark.django_db
+def test_refresh_skips_the_blacklist_table_and_user_lookups(create_user, count_queries):
+    token = _login(create_user)
+    _refresh(_login(create_user))  # builds the Bloom filter
+
+    response, queries = count_queries(lambda: _refresh(token))
+
+    assert response.status_code == 200
+    # user active check, blacklist insert (+ savepoint pair), outstanding insert
+    assert queries == 5
+
+
+@pytest.mark.django_db
+def test_tokens_blacklisted_by_other_workers_are_seen_after_sync(settings, create_user):
+    settings.TOKEN_BLACKLIST_SYNC_SECONDS = 0
+    token = _login(create_user)
+    index.is_blacklisted("warm-up")
+
+    # Another process blacklists the token: this process only sees the row
+    outstanding = OutstandingToken.objects.get(jti=BlacklistRefreshToken(token, verify=False)["jti"])
+    BlacklistedToken.objects.create(token=outstanding)
+
+    assert _refresh(token).status_code == 401
+
+
+@pytest.mark.django_db
+def test_token_issued_before_the_blacklist_is_recorded_on_rotation(create_user):
+    token = BlacklistRefreshToken(_login(create_user))
+    OutstandingToken.objects.all().delete()
+    index.reset()
+
+    assert _refresh(str(token)).status_code == 200
+    assert BlacklistedToken.objects.filter(token__jti=token["jti"]).exists()
+
+
+@pytest.mark.django_db
+def test_blacklisting_twice_fails(create_user):
+    token = BlacklistRefreshToken(_login(create_user))
+    token.blacklist()
+
+    with pytest.raises(TokenError):
+        token.blacklist()
+
+
+@pytest.mark.django_db
+def test_prune_tokens_deletes_expired_rows(create_user):
+    _refresh(_login(create_user))
+    expired = OutstandingToken.objects.order_by("id").first()
+    OutstandingToken.objects.filter(pk=expired.pk).update(expires_at=timezone.now() - timedelta(seconds=1))
+
+    call_command("prune_tokens", batch_size=1)
+
+    assert not OutstandingToken.objects.filter(pk=expired.pk).exists()
+    assert not BlacklistedToken.objects.exists()
+    assert OutstandingToken.objects.count() == 1
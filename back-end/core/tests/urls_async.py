@@ -0,0 +1,7 @@
+"""URLconf of the ASGI profile (ASYNC_VIEWS=True), for the async view tests."""
+from django.urls import include, path
+
+urlpatterns = [
+    path("api/", include("core.async_urls")),
+    path("", include("MemoRiseApi.urls")),
+]
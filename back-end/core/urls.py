@@ -1,6 +1,8 @@
+from django.conf import settings
 from django.urls import path,include
 from rest_framework.routers import DefaultRouter
-from .views import PublicUserViewSet,DeckViewSet,FlashCardViewSet,AIAgentFlashcardsView
+from . import async_urls
+from .views import PublicUserViewSet,DeckViewSet,FlashCardViewSet,AIAgentFlashcardsView,AIStreamFlashcardsView,AIJobDetailView,AICacheStatsView,SyncView
 
 router = DefaultRouter()
 router.register(r'users',PublicUserViewSet,basename='user')
@@ -9,5 +11,13 @@ router.register(r'flashcards',FlashCardViewSet,basename="flashcard")
 
 urlpatterns = [
     path('',include(router.urls)),
-    path('ai/flashcards/', AIAgentFlashcardsView.as_view(), name='ai-flashcards')
-]
\ No newline at end of file
+    path('ai/flashcards/', AIAgentFlashcardsView.as_view(), name='ai-flashcards'),
+    path('ai/flashcards/stream/', AIStreamFlashcardsView.as_view(), name='ai-flashcards-stream'),
+    path('ai/jobs/<uuid:pk>/', AIJobDetailView.as_view(), name='ai-job-detail'),
+    path('ai/cache/stats/', AICacheStatsView.as_view(), name='ai-cache-stats'),
+    path('sync/', SyncView.as_view(), name='sync'),
+]
+
+# ⚡ ASGI profile: async study/review/AI stream views take over the same URLs
+if settings.ASYNC_VIEWS:
+    urlpatterns = async_urls.urlpatterns + urlpatterns
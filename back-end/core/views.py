@@ -1,38 +1,224 @@
-from rest_framework import viewsets,status
+from rest_framework import viewsets,status,generics
+from rest_framework.reverse import reverse
 from rest_framework.views import APIView
-from .models import User,Deck,Flashcard
-from .serializer import PublicUserSerializer,CustomTokenObtainPairSerializer,DeckSerializer,FlashCardSerializer,FlashcardReviewSerializer
-from .services.ai_service import generate_flashcards
+from .models import User,Deck,Flashcard,Tombstone,AIGenerationJob
+from .serializer import PublicUserSerializer,CustomTokenObtainPairSerializer,DeckSerializer,FlashCardSerializer,FlashcardReviewSerializer,FlashcardReviewItemSerializer,ForecastQuerySerializer,AIGenerationJobSerializer,AIGenerationRequestSerializer
+from .services import ai_jobs, ai_cache
+from .services.ai_service import stream_flashcards
+from .renderers import NDJSONRenderer
+from . import metrics, schema
+from .services.forecast import get_forecast, invalidate_forecast
+from .services import deck_counters
+from .services import sync
+from .services import deck_io
+from .services.flashcards import due_queue, save_review
+from .pagination import DueQueueKeyset, UpdatedAtCursorPagination
+from .conditional import ConditionalListMixin, collection_state, conditional_list
+from .scheduling import apply_review, apply_reviews
 
 from rest_framework_simplejwt.views import TokenObtainPairView
-from rest_framework.permissions import IsAuthenticated, AllowAny
+from drf_spectacular.views import SpectacularAPIView
+from rest_framework.permissions import IsAuthenticated, AllowAny, IsAdminUser, BasePermission
+from rest_framework.settings import api_settings
 from rest_framework.decorators import action
 from rest_framework.response import Response
+from rest_framework.exceptions import ValidationError
+from rest_framework.renderers import JSONRenderer
 
 from django.utils import timezone
-from decimal import Decimal
-from datetime import timedelta
-from django.db.models import Q
+from django.db.models import Count, Max, Q
+from django.db import transaction
+from django.shortcuts import get_object_or_404
+from django.http import HttpResponse, HttpResponseNotModified, StreamingHttpResponse
+from django.conf import settings
+from django.utils.crypto import constant_time_compare
 
 import json
 
 
 class AIAgentFlashcardsView(APIView):
+    """
+    Queues an AI flashcard generation job.
+    Returns 202 with the job id; poll GET /api/ai/jobs/<id>/ for the result.
+    With "deck", the cards are saved into that deck server-side and the
+    job result lists their ids in "saved".
+    """
     permission_classes = [IsAuthenticated]
 
     def post(self, request):
-        user_text = request.data.get("text", "")
-        if not user_text:
-            return Response({"error": "No text provided"}, status=400)
+        serializer = AIGenerationRequestSerializer(data=request.data, context={"request": request})
+        serializer.is_valid(raise_exception=True)
+
+        job = ai_jobs.enqueue(request.user, **serializer.validated_data)
+        return Response(
+            {
+                "id": str(job.id),
+                "status": job.status,
+                "deck": job.deck_id,
+                "url": reverse("ai-job-detail", args=[job.id], request=request),
+            },
+            status=status.HTTP_202_ACCEPTED,
+        )
+
+
+class AIStreamFlashcardsView(APIView):
+    """
+    Streams AI-generated flashcards as NDJSON while the model writes them.
+
+    Body: {"text", "count"?, "deck"?}. Each line is one event:
+    {"type": "card", "card": {...}}            as soon as a card is complete
+    {"type": "error", "raw": "..."}            for a malformed card (others are kept)
+    {"type": "done", "count": n, "saved": m}   at the end
+    With "deck", every card is saved into that deck as it arrives and the
+    card event includes its id.
+    """
+    permission_classes = [IsAuthenticated]
+    renderer_classes = [JSONRenderer, NDJSONRenderer]
+
+    def post(self, request):
+        serializer = AIGenerationRequestSerializer(data=request.data, context={"request": request})
+        serializer.is_valid(raise_exception=True)
+
+        events = self._events(request.user, **serializer.validated_data)
+        response = StreamingHttpResponse(events, content_type="application/x-ndjson")
+        response["Cache-Control"] = "no-cache"
+        response["X-Accel-Buffering"] = "no"  # don't let proxies buffer the stream
+        return response
+
+    def _events(self, user, text, count, deck=None):
+        created = []
+        emitted = 0
+        try:
+            for kind, payload in stream_flashcards(text, count):
+                if kind == "error":
+                    yield _ndjson({"type": "error", "raw": payload})
+                    continue
+                if deck is not None:
+                    flashcard = Flashcard.objects.create(deck=deck, **payload)
+                    created.append(flashcard)
+                    payload = {"id": flashcard.id, **payload}
+                emitted += 1
+                yield _ndjson({"type": "card", "card": payload})
+        except Exception as exc:
+            yield _ndjson({"type": "error", "message": f"AI service error: {exc}"})
+        finally:
+            if created:
+                invalidate_forecast(user.id)
+        yield _ndjson({"type": "done", "count": emitted, "saved": len(created)})
+
+
+def _ndjson(event):
+    return json.dumps(event, ensure_ascii=False) + "\n"
+
+
+class AICacheStatsView(APIView):
+    """Hit/miss counters of the AI response cache (this process), staff only."""
+    permission_classes = [IsAdminUser]
+
+    def get(self, request):
+        return Response(ai_cache.stats.snapshot())
+
+
+class AIJobDetailView(generics.RetrieveAPIView):
+    """
+    Status of an AI generation job. Once "succeeded", `result` holds
+    {"flashcards": [...]}; when "failed", `error` explains why.
+    """
+    serializer_class = AIGenerationJobSerializer
+    permission_classes = [IsAuthenticated]
+
+    def get_queryset(self):
+        return AIGenerationJob.objects.filter(user=self.request.user)
+
+
+class HasMetricsToken(BasePermission):
+    """Bearer METRICS_TOKEN, so Prometheus can scrape without a user JWT."""
+
+    def has_permission(self, request, view):
+        expected = settings.METRICS_TOKEN
+        given = request.META.get("HTTP_AUTHORIZATION", "")
+        return bool(expected) and constant_time_compare(given, f"Bearer {expected}")
+
+
+class MetricsView(APIView):
+    """
+    Request and LLM metrics of the worker that serves the scrape, in the
+    Prometheus text format; samples are labelled with its pid (core/metrics.py).
+    """
+    permission_classes = [HasMetricsToken | IsAdminUser]
+
+    def get_authenticators(self):
+        # Only try the JWT when the header is not the metrics token
+        # (no request while the OpenAPI schema is generated)
+        if self.request is not None and HasMetricsToken().has_permission(self.request, self):
+            return []
+        return [auth() for auth in api_settings.DEFAULT_AUTHENTICATION_CLASSES]
+
+    def get(self, request):
+        # Imported here: ai_http pulls in httpx, which start-up does not need
+        from .services import ai_http
+
+        return HttpResponse(
+            metrics.registry.render_prometheus() + ai_http.stats.render_prometheus(),
+            content_type="text/plain; version=0.0.4; charset=utf-8",
+        )
 
-        flashcards_raw = generate_flashcards(user_text)
 
+class CachedSchemaView(SpectacularAPIView):
+    """
+    /api/schema/ served from core.schema.cache (built once per code version)
+    with an ETag, so unchanged schemas cost a 304.
+    """
+
+    def _get_schema_response(self, request):
+        if request.GET.get("lang") or self.api_version or self._get_version_parameter(request):
+            # Translated or versioned variants are not cached
+            return super()._get_schema_response(request)
+
+        etag, body = schema.cache.rendered(request.accepted_renderer)
+        if etag in {tag.strip() for tag in request.headers.get("If-None-Match", "").split(",")}:
+            response = HttpResponseNotModified()
+        else:
+            response = HttpResponse(body, content_type=f"{request.accepted_media_type}; charset=utf-8")
+            response["Content-Disposition"] = f'inline; filename="{self._get_filename(request, None)}"'
+        response["ETag"] = etag
+        response["Cache-Control"] = "no-cache"  # revalidate with the ETag
+        return response
+
+
+class SyncView(APIView):
+    """
+    Delta sync for offline-capable clients.
+
+    GET /api/sync/ returns a full snapshot and a change token.
+    GET /api/sync/?since=<token> returns only the decks and flashcards
+    created or updated since that token, plus the ids deleted since then:
+    {"token", "full", "more", "decks", "flashcards", "deleted": {"deck": [...], "flashcard": [...]}}.
+    When "full" is true the client must replace its local cache. Snapshots
+    come in pages: while "more" is true, sync again with the new token
+    right away and upsert what it returns.
+    """
+    permission_classes = [IsAuthenticated]
+
+    def get(self, request):
+        now = timezone.now()
+        token = request.query_params.get("since")
         try:
-            flashcards = json.loads(flashcards_raw)  # Parseamos JSON
-        except:
-            flashcards = {"error": "Invalid AI response", "raw": flashcards_raw}
+            cursor = sync.read_token(token) if token else None
+        except sync.InvalidSyncToken as exc:
+            raise ValidationError({"since": str(exc)})
 
-        return Response({"flashcards": flashcards})
+        page = sync.changes_since(request.user, cursor, now)
+        decks = deck_counters.annotate_deck_counts(page.decks, now)
+
+        return Response({
+            "token": page.token,
+            "full": page.full,
+            "more": page.more,
+            "decks": DeckSerializer(decks, many=True).data,
+            "flashcards": FlashCardSerializer(page.flashcards, many=True).data,
+            "deleted": page.deleted,
+        }, status=status.HTTP_200_OK)
 
 
 # User View Set (Here we will define the api endpoints for our user custom model)
@@ -49,41 +235,124 @@ class PublicUserViewSet(viewsets.ModelViewSet):
 class CustomTokenObtainPairView(TokenObtainPairView):
     serializer_class = CustomTokenObtainPairSerializer
 
-class DeckViewSet(viewsets.ModelViewSet):
+class DeckViewSet(ConditionalListMixin, viewsets.ModelViewSet):
     queryset = Deck.objects.all()
     serializer_class = DeckSerializer
     permission_classes = [IsAuthenticated]
 
     def get_queryset(self):
-        # Only return decks that belong to the authenticated user
-        return Deck.objects.filter(user=self.request.user)
+        # Only return decks that belong to the authenticated user,
+        # with their card counters computed in the same query
+        decks = Deck.objects.filter(user=self.request.user)
+        return deck_counters.annotate_deck_counts(decks, timezone.now())
 
     def perform_create(self, serializer):
         # Automatically set the deck's user to the logged-in user
         serializer.save(user=self.request.user)
 
-    @action(detail=True, methods=["get"], permission_classes=[IsAuthenticated])
+    def get_list_states(self, queryset):
+        # The counters depend on the user's cards and on the clock (due_now)
+        due_now = Q(status__in=deck_counters.DUE_STATUSES, due_date__lte=timezone.now())
+        cards = Flashcard.objects.filter(user=self.request.user).aggregate(
+            last_modified=Max("updated_at"), count=Count("id"), due_now=Count("id", filter=due_now)
+        )
+        return [collection_state(queryset), (cards["last_modified"], cards["count"], cards["due_now"])]
+
+    def perform_destroy(self, instance):
+        with transaction.atomic():
+            sync.record_deck_deletion(self.request.user, instance)
+            super().perform_destroy(instance)
+        invalidate_forecast(self.request.user.id)
+
+    @action(
+        detail=True, methods=["get"], permission_classes=[IsAuthenticated],
+        pagination_class=UpdatedAtCursorPagination,
+    )
     def flashcards(self, request, pk=None):
-        deck = self.get_object()  # ensures deck belongs to user
+        """
+        Paginated flashcards of one deck. Supports ?fields= and answers
+        304 Not Modified while the deck's cards are unchanged.
+        """
+        # Ownership check without the counters annotation of get_queryset()
+        deck = get_object_or_404(Deck.objects.filter(user=request.user), pk=pk)
         flashcards = deck.flashcards.all()  # uses related_name from model
-        serializer = FlashCardSerializer(flashcards, many=True)
-        return Response(serializer.data)
+
+        def build_response():
+            page = self.paginate_queryset(flashcards)
+            context = self.get_serializer_context()
+            serializer = FlashCardSerializer(page, many=True, context=context)
+            return self.get_paginated_response(serializer.data)
+
+        return conditional_list(request, [collection_state(flashcards)], build_response)
+
+    @action(detail=True, methods=["post"], url_path="import", permission_classes=[IsAuthenticated])
+    def import_cards(self, request, pk=None):
+        """
+        Bulk-imports a multipart `file` (CSV, JSON or Anki-style TSV) into the deck.
+        The format comes from `fmt` or the file extension. Valid rows are
+        created; invalid ones are reported as {"row", "errors"}.
+        """
+        deck = get_object_or_404(Deck.objects.filter(user=request.user), pk=pk)
+        uploaded = request.FILES.get("file")
+        if uploaded is None:
+            raise ValidationError({"file": "No file provided."})
+
+        try:
+            fmt = deck_io.detect_format(uploaded.name, request.data.get("fmt") or request.query_params.get("fmt"))
+            report = deck_io.import_flashcards(deck, uploaded, fmt)
+        except deck_io.DeckImportError as exc:
+            raise ValidationError({"file": str(exc)})
+
+        code = status.HTTP_201_CREATED if report["created"] else status.HTTP_400_BAD_REQUEST
+        return Response(report, status=code)
+
+    @action(detail=True, methods=["get"], permission_classes=[IsAuthenticated])
+    def export(self, request, pk=None):
+        """Streams the deck's cards as CSV (default), TSV or JSON (?fmt=)."""
+        deck = get_object_or_404(Deck.objects.filter(user=request.user), pk=pk)
+        fmt = request.query_params.get("fmt", "csv").lower()
+        if fmt not in deck_io.FORMATS:
+            raise ValidationError({"fmt": f"Use one of: {', '.join(deck_io.FORMATS)}."})
+
+        response = StreamingHttpResponse(deck_io.export_rows(deck, fmt), content_type=deck_io.CONTENT_TYPES[fmt])
+        response["Content-Disposition"] = f'attachment; filename="deck-{deck.id}.{fmt}"'
+        return response
 
 
-class FlashCardViewSet(viewsets.ModelViewSet):
+class FlashCardViewSet(ConditionalListMixin, viewsets.ModelViewSet):
     queryset = Flashcard.objects.all()
     serializer_class = FlashCardSerializer
     permission_classes = [IsAuthenticated]
+    pagination_class = UpdatedAtCursorPagination
 
     def get_queryset(self):
         user = self.request.user
-        return Flashcard.objects.filter(deck__user=user)
+        return Flashcard.objects.filter(user=user)
     
     def get_serializer_class(self):
         # 👇 Si la acción es "review", usamos un serializer distinto
         if self.action == "review":
             return FlashcardReviewSerializer
+        if self.action == "review_batch":
+            return FlashcardReviewItemSerializer
         return super().get_serializer_class()
+
+    # 🔄 Any change to the user's cards makes their cached forecast stale
+    # (deck counters follow through model signals, see deck_counters)
+    def perform_create(self, serializer):
+        super().perform_create(serializer)
+        invalidate_forecast(self.request.user.id)
+
+    def perform_update(self, serializer):
+        super().perform_update(serializer)
+        invalidate_forecast(self.request.user.id)
+
+    def perform_destroy(self, instance):
+        flashcard_id = instance.id  # cleared by delete()
+        with transaction.atomic():
+            super().perform_destroy(instance)
+            sync.record_deletions(self.request.user, Tombstone.Kind.FLASHCARD, [flashcard_id])
+        invalidate_forecast(self.request.user.id)
     
     @action(detail=True, methods=["post"], url_path="review")
     def review(self, request, pk=None):
@@ -99,52 +368,100 @@ class FlashCardViewSet(viewsets.ModelViewSet):
         flashcard = self.get_object()
         answer = serializer.validated_data["answer"]
 
-        now = timezone.now()
-
-        # 🔹 Mini algoritmo de repetición espaciada
-        if answer == "again":
-            flashcard.status = "learning"  # 👈 cambia de "new" a "learning"
-            flashcard.interval = 1
-            flashcard.ease_factor = max(Decimal("1.3"), flashcard.ease_factor - Decimal("0.2"))
-            flashcard.lapses += 1
-            flashcard.streak = 0
-            flashcard.due_date = now + timedelta(minutes=10)
-
-        elif answer == "good":
-            flashcard.status = "review"  # 👈 pasa a review
-            flashcard.interval = max(1, int(flashcard.interval * float(flashcard.ease_factor)))
-            flashcard.ease_factor = min(Decimal("2.5"), flashcard.ease_factor + Decimal("0.05"))
-            flashcard.streak += 1
-            flashcard.due_date = now + timedelta(days=flashcard.interval)
-
-        elif answer == "easy":
-            flashcard.status = "review"  # 👈 también pasa a review
-            flashcard.interval = max(1, int(flashcard.interval * float(flashcard.ease_factor) * 1.5))
-            flashcard.ease_factor = min(Decimal("3.0"), flashcard.ease_factor + Decimal("0.15"))
-            flashcard.streak += 1
-            flashcard.due_date = now + timedelta(days=flashcard.interval)
-            
-        flashcard.last_reviewed = now
-        flashcard.save()
+        apply_review(flashcard, answer, timezone.now())
+        save_review(flashcard)
 
         # 👇 Respondemos con la flashcard actualizada
         return Response(FlashCardSerializer(flashcard).data, status=status.HTTP_200_OK)
+
+    @action(detail=False, methods=["post"], url_path="review-batch")
+    def review_batch(self, request):
+        """
+        Applies a whole (offline) study session in one request.
+        Expects a list of {"id", "answer", "reviewed_at"?} items.
+
+        All cards are loaded with a single query, scheduled in memory (in
+        request order, so repeated ids are reviewed repeatedly) and saved
+        with one bulk_update inside a transaction. Each item gets its own
+        "ok" or "error" result.
+        """
+        serializer = FlashcardReviewItemSerializer(data=request.data, many=True)
+        serializer.is_valid(raise_exception=True)
+        items = serializer.validated_data
+
+        ids = {item["data"]["id"] for item in items if item["data"]}
+        cards = self.get_queryset().in_bulk(ids)
+
+        now = timezone.now()
+        results = []
+        reviews = []
+        reviewed = {}
+        old_statuses = {}
+        for item in items:
+            data = item["data"]
+            if data is None:
+                results.append({"status": "error", "errors": item["errors"]})
+                continue
+
+            flashcard = cards.get(data["id"])
+            if flashcard is None:
+                results.append({"id": data["id"], "status": "error", "errors": {"id": ["Flashcard not found."]}})
+                continue
+
+            flashcard.updated_at = now  # bulk_update skips auto_now
+            old_statuses.setdefault(flashcard.id, flashcard.status)
+            reviews.append((flashcard, data["answer"], data.get("reviewed_at", now)))
+            reviewed[flashcard.id] = flashcard
+            results.append({"id": flashcard.id, "status": "ok"})
+
+        # 🔹 Schedules every card in one vectorized call
+        apply_reviews(reviews)
+
+        with transaction.atomic():
+            Flashcard.objects.bulk_update(
+                reviewed.values(),
+                ["status", "interval", "ease_factor", "lapses", "streak", "due_date", "last_reviewed", "updated_at"],
+            )
+            deck_counters.record_changes(
+                (card.deck_id, old_statuses[card.id], card.deck_id, card.status) for card in reviewed.values()
+            )
+        if reviewed:
+            invalidate_forecast(request.user.id)
+
+        for result in results:
+            if result["status"] == "ok":
+                result["flashcard"] = FlashCardSerializer(reviewed[result["id"]]).data
+
+        return Response({"results": results}, status=status.HTTP_200_OK)
     
     @action(detail=False, methods=["get"], url_path="study")
     def study_cards(self, request):
         """
-        Returns only the flashcards that are NEW or due for review.
-        Optionally filter by deck (?deck=<id>)
+        Returns the flashcards that are NEW or due for review, in bounded
+        batches ordered by due_date (new cards first).
+        Optionally filter by deck (?deck=<id>).
+        Pagination: ?limit=<n> and ?cursor=<next cursor from previous batch>.
         """
-        now = timezone.now()
-        user = request.user
-        deck_id = request.query_params.get("deck")
+        queue = due_queue(request.user, timezone.now(), request.query_params.get("deck"))
+        cards, next_cursor = DueQueueKeyset().paginate(queue, request)
+        serializer = FlashCardSerializer(cards, many=True)
+        return Response({"results": serializer.data, "next": next_cursor}, status=status.HTTP_200_OK)
 
-        filters = Q(deck__user=user) & (Q(status="new") | Q(status="learning", due_date__lte=now) | Q(status="review", due_date__lte=now))
-        
-        if deck_id:
-            filters &= Q(deck_id=deck_id)
+    @action(detail=False, methods=["get"], url_path="forecast")
+    def forecast(self, request):
+        """
+        Projected reviews per day for the next N days.
+        ?days=<1..365> (default 30), ?deck=<id>, ?mode=due|simulate.
+        "due" buckets the current due dates; "simulate" also projects the
+        follow-up reviews assuming every answer is "good".
+        """
+        params = ForecastQuerySerializer(data=request.query_params)
+        params.is_valid(raise_exception=True)
 
-        cards = Flashcard.objects.filter(filters)
-        serializer = FlashCardSerializer(cards, many=True)
-        return Response(serializer.data, status=status.HTTP_200_OK)
\ No newline at end of file
+        forecast = get_forecast(
+            request.user,
+            days=params.validated_data["days"],
+            deck_id=params.validated_data.get("deck"),
+            mode=params.validated_data["mode"],
+        )
+        return Response(forecast, status=status.HTTP_200_OK)
\ No newline at end of file
@@ -0,0 +1,27 @@
+"""
+gunicorn settings (procfile: gunicorn -c gunicorn.conf.py ...).
+
+The application is loaded once in the master and the workers are forked
+from it, so they share its code pages and warmed caches (core/boot.py)
+instead of each importing everything again.
+"""
+preload_app = True
+
+
+def when_ready(server):
+    from core import boot
+
+    boot.warm()
+
+
+def pre_fork(server, worker):
+    from django.db import connections
+
+    # A connection opened in the master would be shared by every worker
+    connections.close_all()
+
+
+def post_fork(server, worker):
+    from core import boot
+
+    boot.after_fork()
@@ -0,0 +1,21 @@
+import api from "./axios";
+
+/**
+ * One page of a cursor-paginated list endpoint.
+ * `next` / `previous` are absolute URLs, or null at the ends.
+ */
+export interface Page<T> {
+  next: string | null;
+  previous: string | null;
+  results: T[];
+}
+
+/**
+ * Fetch one page of a cursor-paginated endpoint
+ * @param url - Page URL: the first page (relative to the API base URL) or a `next` link
+ * @returns The page, with the link to the following one
+ */
+export const getPage = async <T>(url: string): Promise<Page<T>> => {
+  const response = await api.get<Page<T>>(url);
+  return response.data;
+};
@@ -8,8 +8,9 @@ import EditFlashCard from "../../components/FlashCardComponents/EditFlashCard";
 const DeckDetail = () => {
   const { deckId } = useParams<{ deckId: string }>();
   const [flashcards, setFlashcards] = useState<FlashcardType[]>([]);
+  const [next, setNext] = useState<string | null>(null);
   const [loading, setLoading] = useState(true);
-  const [visibleCount, setVisibleCount] = useState(12);
+  const loadingMore = useRef(false);
   const observerRef = useRef<HTMLDivElement | null>(null);
 
   // Modal states
@@ -20,12 +21,13 @@ const DeckDetail = () => {
   const location = useLocation();
   const state = location.state as { color?: string; title?: string };
 
-  // ✅ Fetch all flashcards for this deck
+  // ✅ Fetch the first page of flashcards for this deck
   const fetchFlashcards = async () => {
     try {
       if (!deckId) return;
-      const data = await getFlashcardsByDeck(Number(deckId));
-      setFlashcards(data);
+      const page = await getFlashcardsByDeck(Number(deckId));
+      setFlashcards(page.results);
+      setNext(page.next);
     } catch {
       // you could add toast notification here instead of console
     } finally {
@@ -33,6 +35,21 @@ const DeckDetail = () => {
     }
   };
 
+  // ✅ Fetch the following page only when the user scrolls to it
+  const fetchMore = async () => {
+    if (!deckId || !next || loadingMore.current) return;
+    loadingMore.current = true;
+    try {
+      const page = await getFlashcardsByDeck(Number(deckId), next);
+      setFlashcards((prev) => [...prev, ...page.results]);
+      setNext(page.next);
+    } catch {
+      // the sentinel stays visible, so the next scroll retries
+    } finally {
+      loadingMore.current = false;
+    }
+  };
+
   useEffect(() => {
     fetchFlashcards();
   }, [deckId]);
@@ -44,7 +61,7 @@ const DeckDetail = () => {
     const observer = new IntersectionObserver(
       (entries) => {
         if (entries[0].isIntersecting) {
-          setVisibleCount((prev) => Math.min(prev + 12, flashcards.length));
+          fetchMore();
         }
       },
       { threshold: 1 }
@@ -55,7 +72,7 @@ const DeckDetail = () => {
     return () => {
       if (observerRef.current) observer.unobserve(observerRef.current);
     };
-  }, [flashcards]);
+  }, [next]);
 
   return (
     <div className="min-h-screen bg-gradient-to-b from-black via-black to-purple-700 text-white p-6">
@@ -72,7 +89,7 @@ const DeckDetail = () => {
       ) : (
         <>
           <div className="grid grid-cols-1 md:grid-cols-2 lg:grid-cols-3 gap-6">
-            {flashcards.slice(0, visibleCount).map((card, idx) => (
+            {flashcards.map((card, idx) => (
               <div
                 key={card.id}
                 onClick={() => {
@@ -87,7 +104,7 @@ const DeckDetail = () => {
           </div>
 
           {/* Infinite scroll sentinel */}
-          {visibleCount < flashcards.length && (
+          {next && (
             <div ref={observerRef} className="h-10 flex justify-center items-center">
               <p className="text-gray-300">Loading more...</p>
             </div>
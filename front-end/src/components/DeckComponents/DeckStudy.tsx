@@ -1,7 +1,7 @@
 import { useLocation, useParams, useNavigate } from "react-router-dom";
 import { useEffect, useState } from "react";
-import type { Flashcard } from "../../types/flashcard";
-import { getFlashcardsByDeck } from "../../services/flashcardService";
+import type { Deck } from "../../types/deck";
+import { getDeck } from "../../services/deckService";
 
 const DeckStudy = () => {
   const { deckId } = useParams<{ deckId: string }>();
@@ -10,35 +10,19 @@ const DeckStudy = () => {
   // 👇 includes optional congratulation message
   const state = (location.state as { color?: string; title?: string; message?: string }) || {};
 
-  const [flashcards, setFlashcards] = useState<Flashcard[]>([]);
+  const [deck, setDeck] = useState<Deck | null>(null);
   const [loading, setLoading] = useState(true);
 
-  const [newCards, setNewCards] = useState<Flashcard[]>([]);
-  const [dueCards, setDueCards] = useState<Flashcard[]>([]);
-  const [reviewCards, setReviewCards] = useState<Flashcard[]>([]);
-
   const navigate = useNavigate();
 
   useEffect(() => {
     const fetchCards = async () => {
       try {
         if (!deckId) return;
-        const data = await getFlashcardsByDeck(Number(deckId));
-        setFlashcards(data);
-
-        const now = new Date();
-
-        setNewCards(data.filter((c) => c.status === "new"));
-        setDueCards(
-          data.filter((c) => c.due_date && new Date(c.due_date) <= now && c.status !== "new")
-        );
-        setReviewCards(
-          data.filter(
-            (c) => c.status === "review" && (!c.due_date || new Date(c.due_date) > now)
-          )
-        );
+        // The deck's counters come computed by the backend: no need to download its cards
+        setDeck(await getDeck(Number(deckId)));
       } catch (error) {
-        console.error("❌ Error fetching flashcards:", error);
+        console.error("❌ Error fetching deck:", error);
       } finally {
         setLoading(false);
       }
@@ -47,6 +31,11 @@ const DeckStudy = () => {
     fetchCards();
   }, [deckId]);
 
+  const newCount = deck?.new ?? 0;
+  const dueCount = deck?.due_now ?? 0;
+  // Studied cards that are not due yet
+  const reviewCount = Math.max(0, (deck?.total ?? 0) - newCount - dueCount);
+
   if (loading) {
     return (
       <div className="min-h-screen flex items-center justify-center text-white">
@@ -79,19 +68,19 @@ const DeckStudy = () => {
         <div className="grid grid-cols-1 sm:grid-cols-3 gap-6">
           {/* New cards */}
           <div className="bg-black/40 p-6 rounded-xl text-center shadow-lg">
-            <p className="text-4xl font-bold text-blue-400">{newCards.length}</p>
+            <p className="text-4xl font-bold text-blue-400">{newCount}</p>
             <p className="text-gray-300 mt-2 font-bold">New</p>
           </div>
 
           {/* Due cards */}
           <div className="bg-black/40 p-6 rounded-xl text-center shadow-lg">
-            <p className="text-4xl font-bold text-green-400">{dueCards.length}</p>
+            <p className="text-4xl font-bold text-green-400">{dueCount}</p>
             <p className="text-gray-300 mt-2 font-bold">Due</p>
           </div>
 
           {/* Review cards */}
           <div className="bg-black/40 p-6 rounded-xl text-center shadow-lg">
-            <p className="text-4xl font-bold text-yellow-400">{reviewCards.length}</p>
+            <p className="text-4xl font-bold text-yellow-400">{reviewCount}</p>
             <p className="text-gray-300 mt-2 font-bold">Review</p>
           </div>
         </div>
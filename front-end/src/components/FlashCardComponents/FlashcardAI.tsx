@@ -2,20 +2,18 @@
 import React, { useEffect, useState } from "react";
 import { generateFlashcardsAI } from "../../services/aiService";
 import { getDecks } from "../../services/deckService";
-import { createFlashcard } from "../../services/flashcardService";
 import Flashcard from "../FlashCardComponents/Flashcard";
 import type { Deck } from "../../types/deck";
 
 type Suggestion = {
+  id?: number; // presente si el backend la guardó en el mazo
   front: string;
   back: string;
-  _saving?: boolean;
-  _saved?: boolean;
 };
 
 interface FlashcardAIProps {
   onClose?: () => void; // cerrar modal desde MainPanel
-  onSavedAny?: () => void; // callback si se guarda alguna
+  onSavedAny?: () => void; // callback si se guardó alguna
 }
 
 const FlashcardAI: React.FC<FlashcardAIProps> = ({ onClose, onSavedAny }) => {
@@ -44,22 +42,28 @@ const FlashcardAI: React.FC<FlashcardAIProps> = ({ onClose, onSavedAny }) => {
       setError("Escribe un tema o un texto.");
       return;
     }
+    if (!deckId) {
+      setError("Selecciona un mazo antes de generar.");
+      return;
+    }
     setError("");
     setLoadingGen(true);
     try {
-      const ai = await generateFlashcardsAI(text.trim());
+      // El backend guarda las tarjetas en el mazo con un solo insert
+      const ai = await generateFlashcardsAI(text.trim(), 3, Number(deckId));
       const clean: Suggestion[] = Array.isArray(ai)
         ? ai
             .filter(
               (x) =>
                 x && typeof x.front === "string" && typeof x.back === "string"
             )
-            .map((x) => ({ front: x.front, back: x.back }))
+            .map((x) => ({ id: x.id, front: x.front, back: x.back }))
         : [];
       if (clean.length === 0) {
         setError("La IA no devolvió sugerencias válidas.");
       }
       setSuggestions(clean);
+      if (clean.some((s) => s.id !== undefined)) onSavedAny?.();
     } catch (e: any) {
       console.error("❌ Error IA:", e);
       setError(
@@ -72,37 +76,6 @@ const FlashcardAI: React.FC<FlashcardAIProps> = ({ onClose, onSavedAny }) => {
     }
   };
 
-  const handleSave = async (idx: number) => {
-    if (!deckId) {
-      setError("Selecciona un mazo antes de guardar.");
-      return;
-    }
-    setError("");
-    setSuggestions((prev) =>
-      prev.map((s, i) => (i === idx ? { ...s, _saving: true } : s))
-    );
-    try {
-      const s = suggestions[idx];
-      await createFlashcard({
-        deck: Number(deckId),
-        front: s.front,
-        back: s.back,
-      });
-      setSuggestions((prev) =>
-        prev.map((s, i) =>
-          i === idx ? { ...s, _saving: false, _saved: true } : s
-        )
-      );
-      onSavedAny?.();
-    } catch (e) {
-      console.error("❌ Error guardando:", e);
-      setError("No se pudo guardar la flashcard.");
-      setSuggestions((prev) =>
-        prev.map((s, i) => (i === idx ? { ...s, _saving: false } : s))
-      );
-    }
-  };
-
   return (
     <div className="w-full h-full flex flex-col text-white">
       <h2 className="text-2xl font-bold mb-4">Agente IA de Flashcards</h2>
@@ -146,23 +119,11 @@ const FlashcardAI: React.FC<FlashcardAIProps> = ({ onClose, onSavedAny }) => {
           {suggestions.map((card, idx) => (
             <div key={idx} className="flex flex-col items-center">
               <Flashcard card={card} index={idx} />
-              <button
-                onClick={() => handleSave(idx)}
-                disabled={card._saved || card._saving}
-                className={`mt-3 px-3 py-1 rounded text-white ${
-                  card._saved
-                    ? "bg-green-600"
-                    : card._saving
-                    ? "bg-gray-500"
-                    : "bg-blue-600 hover:bg-blue-700"
-                }`}
-              >
-                {card._saved
-                  ? "Guardado ✅"
-                  : card._saving
-                  ? "Guardando..."
-                  : "Guardar"}
-              </button>
+              {card.id !== undefined && (
+                <span className="mt-3 px-3 py-1 rounded text-white bg-green-600">
+                  Guardado ✅
+                </span>
+              )}
             </div>
           ))}
         </div>
@@ -1,12 +1,14 @@
 import { useParams, useNavigate } from "react-router-dom";
-import { useEffect, useState } from "react";
+import { useCallback, useEffect, useRef, useState } from "react";
 import type { Flashcard } from "../../types/flashcard";
 import {
-  getFlashcardsByDeck,
   reviewFlashcard,
   getStudyCards,
 } from "../../services/flashcardService";
 
+// Cards left in the loaded batches when the next batch is requested
+const PREFETCH_AHEAD = 5;
+
 const StudySession = () => {
   const { deckId } = useParams<{ deckId: string }>();
   const navigate = useNavigate();
@@ -15,12 +17,15 @@ const StudySession = () => {
   const [currentIndex, setCurrentIndex] = useState(0);
   const [showBack, setShowBack] = useState(false);
   const [loading, setLoading] = useState(true);
+  const [nextCursor, setNextCursor] = useState<string | null>(null);
+  const loadingMore = useRef<Promise<Flashcard[]> | null>(null);
 
   useEffect(() => {
     const fetchCards = async () => {
       try {
-        const data = await getStudyCards(deckId); // 👈 ahora solo carga las nuevas + due
-        setFlashcards(data);
+        const batch = await getStudyCards(deckId); // 👈 primer lote de nuevas + due
+        setFlashcards(batch.results);
+        setNextCursor(batch.next);
       } catch (error) {
         console.error("❌ Error fetching study cards:", error);
       } finally {
@@ -31,6 +36,29 @@ const StudySession = () => {
     fetchCards();
   }, [deckId]);
 
+  // Appends the next batch of the queue (one request at a time)
+  const loadMore = useCallback((cursor: string): Promise<Flashcard[]> => {
+    if (!loadingMore.current) {
+      loadingMore.current = getStudyCards(deckId, cursor)
+        .then((batch) => {
+          setFlashcards((prev) => [...prev, ...batch.results]);
+          setNextCursor(batch.next);
+          return batch.results;
+        })
+        .finally(() => {
+          loadingMore.current = null;
+        });
+    }
+    return loadingMore.current;
+  }, [deckId]);
+
+  // Fetch the next batch while the last cards of the current one are studied
+  useEffect(() => {
+    if (nextCursor && flashcards.length - currentIndex <= PREFETCH_AHEAD) {
+      loadMore(nextCursor).catch((error) => console.error("❌ Error fetching study cards:", error));
+    }
+  }, [currentIndex, flashcards.length, nextCursor, loadMore]);
+
   if (loading) {
     return (
       <div className="min-h-screen flex items-center justify-center text-white">
@@ -54,7 +82,11 @@ const StudySession = () => {
       await reviewFlashcard(currentCard.id, type);
       setShowBack(false);
 
-      if (currentIndex < flashcards.length - 1) {
+      const hasMore =
+        currentIndex < flashcards.length - 1 ||
+        (nextCursor !== null && (await loadMore(nextCursor)).length > 0);
+
+      if (hasMore) {
         setCurrentIndex((prev) => prev + 1);
       } else {
         // Redirect back to DeckStudy with success message
@@ -74,6 +106,7 @@ const StudySession = () => {
     <div className="min-h-screen bg-gradient-to-b from-black via-black to-purple-700 flex flex-col items-center justify-center text-white p-6">
       <h2 className="text-3xl font-bold mb-8">
         Card {currentIndex + 1} of {flashcards.length}
+        {nextCursor ? "+" : ""}
       </h2>
 
       {/* Flashcard container */}
@@ -1,6 +1,98 @@
 import api from "../api/axios";
+import { tokenStorage } from "./tokenStorage";
 
-export const generateFlashcardsAI = async (text: string) => {
-  const response = await api.post("/ai/flashcards/", { text });
-  return response.data.flashcards;
+type AIJobStatus = "pending" | "running" | "succeeded" | "failed";
+
+interface AIJob {
+  id: string;
+  status: AIJobStatus;
+  deck: number | null;
+  result: { flashcards?: { id?: number; front: string; back: string }[]; saved?: number[]; raw?: string } | null;
+  error: string;
+}
+
+const POLL_INTERVAL_MS = 1000;
+const MAX_POLLS = 120;
+
+const wait = (ms: number) => new Promise((resolve) => setTimeout(resolve, ms));
+
+/**
+ * Generate flashcards with AI.
+ * The backend queues a job (202 + job id); we poll it until it finishes.
+ * @param text - Source text (long texts are split into chunks server-side)
+ * @param count - Number of flashcards to generate (1–50)
+ * @param deckId - Optional deck: the cards are saved into it server-side (they come back with ids)
+ * @returns Generated flashcards
+ */
+export const generateFlashcardsAI = async (text: string, count = 3, deckId?: number) => {
+  const queued = await api.post<{ id: string }>("/ai/flashcards/", { text, count, deck: deckId });
+
+  for (let i = 0; i < MAX_POLLS; i++) {
+    const response = await api.get<AIJob>(`/ai/jobs/${queued.data.id}/`);
+    const job = response.data;
+
+    if (job.status === "succeeded") {
+      return job.result?.flashcards ?? [];
+    }
+    if (job.status === "failed") {
+      throw new Error(job.error || "AI generation failed");
+    }
+    await wait(POLL_INTERVAL_MS);
+  }
+
+  throw new Error("AI generation timed out");
+};
+
+type AIStreamEvent =
+  | { type: "card"; card: { id?: number; front: string; back: string } }
+  | { type: "error"; raw?: string; message?: string }
+  | { type: "done"; count: number; saved: number };
+
+/**
+ * Stream AI flashcards as they are generated (NDJSON).
+ * @param text - Source text
+ * @param onCard - Called for every card as soon as it is complete
+ * @param options - Optional card count and deck to save the cards into
+ * @returns The final "done" event
+ */
+export const streamFlashcardsAI = async (
+  text: string,
+  onCard: (card: { id?: number; front: string; back: string }) => void,
+  options: { count?: number; deckId?: number } = {}
+) => {
+  const response = await fetch(`${import.meta.env.VITE_API_URL}/ai/flashcards/stream/`, {
+    method: "POST",
+    headers: {
+      "Content-Type": "application/json",
+      Accept: "application/x-ndjson",
+      Authorization: `Bearer ${tokenStorage.getAccess()}`,
+    },
+    body: JSON.stringify({ text, count: options.count, deck: options.deckId }),
+  });
+
+  if (!response.ok || !response.body) {
+    throw new Error(`AI stream failed (${response.status})`);
+  }
+
+  const reader = response.body.getReader();
+  const decoder = new TextDecoder();
+  let buffer = "";
+  let done: AIStreamEvent | null = null;
+
+  while (true) {
+    const { value, done: finished } = await reader.read();
+    if (finished) break;
+    buffer += decoder.decode(value, { stream: true });
+
+    const lines = buffer.split("\n");
+    buffer = lines.pop() ?? "";
+    for (const line of lines) {
+      if (!line.trim()) continue;
+      const event = JSON.parse(line) as AIStreamEvent;
+      if (event.type === "card") onCard(event.card);
+      if (event.type === "done") done = event;
+    }
+  }
+
+  return done;
 };
@@ -10,6 +10,16 @@ export const getDecks = async (): Promise<Deck[]> => {
   return response.data;
 };
 
+/**
+ * Fetch one deck with its card counters
+ * @param deckId - The ID of the deck
+ * @returns The deck
+ */
+export const getDeck = async (deckId: number): Promise<Deck> => {
+  const response = await api.get<Deck>(`/decks/${deckId}/`);
+  return response.data;
+};
+
 /**
  * Create a new deck
  * @param payload - Object containing title and color
@@ -41,3 +51,41 @@ export const updateDeck = async (
   const response = await api.put<Deck>(`/decks/${id}/`, payload);
   return response.data;
 };
+
+export type DeckFileFormat = "csv" | "tsv" | "json";
+
+export interface DeckImportReport {
+  created: number;
+  error_count: number;
+  errors: { row: number; errors: Record<string, string[]> }[];
+}
+
+/**
+ * Bulk-import flashcards from a CSV, JSON or Anki-style TSV file
+ * @param deckId - The ID of the target deck
+ * @param file - The file to upload (format inferred from its extension)
+ * @returns How many cards were created and the rows that were rejected
+ */
+export const importDeck = async (deckId: number, file: File): Promise<DeckImportReport> => {
+  const form = new FormData();
+  form.append("file", file);
+  const response = await api.post<DeckImportReport>(`/decks/${deckId}/import/`, form, {
+    // A file with only invalid rows answers 400 with the same report
+    validateStatus: (status) => status === 201 || status === 400,
+  });
+  return response.data;
+};
+
+/**
+ * Download every flashcard of a deck as a file
+ * @param deckId - The ID of the deck to export
+ * @param fmt - csv (default), tsv or json
+ * @returns The exported file as a Blob
+ */
+export const exportDeck = async (deckId: number, fmt: DeckFileFormat = "csv"): Promise<Blob> => {
+  const response = await api.get<Blob>(`/decks/${deckId}/export/`, {
+    params: { fmt },
+    responseType: "blob",
+  });
+  return response.data;
+};
@@ -1,14 +1,28 @@
 import api from "../api/axios";
-import type { Flashcard, FlashcardCreate } from "../types/flashcard";
+import { getPage } from "../api/pagination";
+import type { Page } from "../api/pagination";
+import type {
+  Flashcard,
+  FlashcardCreate,
+  Forecast,
+  ReviewBatchItem,
+  ReviewBatchResult,
+  StudyBatch,
+} from "../types/flashcard";
 
 /**
- * Fetch all flashcards that belong to a specific deck
+ * Fetch one page of the flashcards that belong to a specific deck
  * @param deckId - The ID of the deck
- * @returns List of flashcards
+ * @param next - Optional `next` link of the previous page
+ * @param pageSize - Cards per page (first page only; `next` links keep it)
+ * @returns The page of flashcards and the link to the following one
  */
-export const getFlashcardsByDeck = async (deckId: number): Promise<Flashcard[]> => {
-  const response = await api.get<Flashcard[]>(`/decks/${deckId}/flashcards/`);
-  return response.data;
+export const getFlashcardsByDeck = async (
+  deckId: number,
+  next?: string | null,
+  pageSize = 24
+): Promise<Page<Flashcard>> => {
+  return getPage<Flashcard>(next ?? `/decks/${deckId}/flashcards/?page_size=${pageSize}`);
 };
 
 /**
@@ -49,13 +63,46 @@ export const reviewFlashcard = async (
 };
 
 /**
- * Get study-ready flashcards (new + due)
+ * Review many flashcards in one request (offline / batched study sessions)
+ * @param reviews - Answers with optional ISO `reviewed_at` timestamps
+ * @returns One result per review, in the same order
+ */
+export const reviewFlashcardsBatch = async (
+  reviews: ReviewBatchItem[]
+): Promise<ReviewBatchResult[]> => {
+  const response = await api.post<{ results: ReviewBatchResult[] }>("/flashcards/review-batch/", reviews);
+  return response.data.results;
+};
+
+/**
+ * Get one batch of study-ready flashcards (new + due)
+ * The backend returns bounded batches in study order; pass the `next` cursor
+ * of a batch to get the following one (null once the queue is exhausted).
  * @param deckId - Optional deck ID to filter cards
- * @returns List of flashcards ready to be studied
+ * @param cursor - Optional cursor from the previous batch
+ * @returns The batch and the cursor of the next one
  */
-export const getStudyCards = async (deckId?: string): Promise<Flashcard[]> => {
-  const url = deckId ? `/flashcards/study/?deck=${deckId}` : "/flashcards/study/";
-  const response = await api.get<Flashcard[]>(url);
+export const getStudyCards = async (deckId?: string, cursor?: string | null): Promise<StudyBatch> => {
+  const response = await api.get<StudyBatch>("/flashcards/study/", {
+    params: { deck: deckId, cursor: cursor ?? undefined },
+  });
+  return response.data;
+};
+
+/**
+ * Get the projected number of reviews per day
+ * @param days - Size of the window (1–365)
+ * @param deckId - Optional deck ID to filter cards
+ * @param mode - "due" (current due dates) or "simulate" (also projects follow-up reviews)
+ */
+export const getForecast = async (
+  days = 30,
+  deckId?: number,
+  mode: "due" | "simulate" = "due"
+): Promise<Forecast> => {
+  const response = await api.get<Forecast>("/flashcards/forecast/", {
+    params: { days, deck: deckId, mode },
+  });
   return response.data;
 };
 
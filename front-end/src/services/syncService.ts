@@ -0,0 +1,14 @@
+import api from "../api/axios";
+import type { SyncChanges } from "../types/sync";
+
+/**
+ * Fetch the decks and flashcards changed since the last sync
+ * @param since - Token returned by the previous sync (omit for a full snapshot)
+ * @returns Changes plus the token to use next time
+ */
+export const syncChanges = async (since?: string): Promise<SyncChanges> => {
+  const response = await api.get<SyncChanges>("/sync/", {
+    params: since ? { since } : undefined,
+  });
+  return response.data;
+};
@@ -3,4 +3,9 @@ export interface Deck {
   title: string;
   description?: string | null;
   color: "#EF4444" | "#3B82F6" | "#10B981" | "#F59E0B" | "#9333EA" | "#F43F5E";
+  total?: number;      // All flashcards in the deck
+  new?: number;        // Never studied
+  due_now?: number;    // Learning/review cards due right now
+  learning?: number;
+  lapsed?: number;
 }
\ No newline at end of file
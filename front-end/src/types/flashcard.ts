@@ -25,3 +25,45 @@ export interface FlashcardCreate {
   front: string;    // required
   back: string;     // required
 }
+
+/**
+ * One batch of the study queue (GET /flashcards/study/).
+ * `next` is an opaque cursor for the following batch, or null at the end.
+ */
+export interface StudyBatch {
+  results: Flashcard[];
+  next: string | null;
+}
+
+export type ReviewAnswer = "again" | "good" | "easy";
+
+/**
+ * One answer sent to POST /flashcards/review-batch/.
+ */
+export interface ReviewBatchItem {
+  id: number;
+  answer: ReviewAnswer;
+  reviewed_at?: string;       // ISO datetime, defaults to server time
+}
+
+/**
+ * Per-item outcome of a batch review.
+ */
+export interface ReviewBatchResult {
+  id?: number;
+  status: "ok" | "error";
+  flashcard?: Flashcard;
+  errors?: Record<string, string[]>;
+}
+
+/**
+ * Projected workload (GET /flashcards/forecast/).
+ */
+export interface Forecast {
+  start: string;              // ISO date of the first day
+  days: number;
+  mode: "due" | "simulate";
+  new: number;                // Cards never studied
+  overdue: number;            // Cards due before `start`
+  forecast: { date: string; reviews: number }[];
+}
@@ -0,0 +1,20 @@
+import type { Deck } from "./deck";
+import type { Flashcard } from "./flashcard";
+
+/**
+ * Response of GET /sync/.
+ * When `full` is true the local cache must be replaced, otherwise
+ * upsert `decks`/`flashcards` and drop the `deleted` ids. Full snapshots
+ * come in pages: while `more` is true, sync again with `token` right away.
+ */
+export interface SyncChanges {
+  token: string;              // Send back as `since` on the next sync
+  full: boolean;
+  more: boolean;              // Another page of the snapshot is waiting
+  decks: Deck[];
+  flashcards: Flashcard[];
+  deleted: {
+    deck: number[];
+    flashcard: number[];
+  };
+}